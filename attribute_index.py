@@ -0,0 +1,194 @@
+"""
+数据源元素的属性倒排索引与过滤表达式
+过滤表达式写在数据源名称之后的方括号中，例如：
+    英雄联盟英雄数据[tags=Mage|Assassin&partype!=Mana]
+- 多个条件以 & 连接，全部满足才会选中
+- 一个条件中的多个值以 | 连接，满足任意一个即可
+- != 表示不具有其中任何一个值
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from element_group import Element
+
+
+class AttributeFilterError(ValueError):
+    """过滤表达式不合法，或数据源不支持其中的属性"""
+
+
+def _to_bitset(positions: Iterable[int], size: int) -> int:
+    """将下标序列转换为位图（第i位为1表示包含下标i）"""
+    bits = bytearray((size + 7) // 8)
+    for i in positions:
+        if not 0 <= i < size:
+            raise ValueError(f"Position {i} out of range")
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _to_positions(bitset: int) -> List[int]:
+    """位图中为1的位的下标（升序）"""
+    text = bin(bitset)[:1:-1]
+    positions = []
+    i = text.find("1")
+    while i >= 0:
+        positions.append(i)
+        i = text.find("1", i + 1)
+    return positions
+
+
+class FilterClause:
+    """过滤条件：属性key的值属于（negate为True时不属于）values"""
+
+    __slots__ = ("key", "values", "negate")
+
+    def __init__(self, key: str, values: FrozenSet[str], negate: bool = False):
+        self.key = key
+        self.values = values
+        self.negate = negate
+
+    def __eq__(self, other):
+        if not isinstance(other, FilterClause):
+            return NotImplemented
+        return (self.key, self.values, self.negate) == (
+            other.key,
+            other.values,
+            other.negate,
+        )
+
+    def __repr__(self):
+        operator = "!=" if self.negate else "="
+        return f"FilterClause({self.key}{operator}{'|'.join(sorted(self.values))})"
+
+
+class SourceFilter:
+    """解析后的数据源表达式：数据源名称与过滤条件（无过滤条件时为空元组）"""
+
+    __slots__ = ("name", "clauses")
+
+    def __init__(self, name: str, clauses: Tuple[FilterClause, ...] = ()):
+        self.name = name
+        self.clauses = clauses
+
+
+def _parse_clause(text: str) -> FilterClause:
+    negate = "!=" in text
+    key, separator, values = text.partition("!=" if negate else "=")
+    key = key.strip()
+    value_set = frozenset(value.strip() for value in values.split("|"))
+    if not separator or not key or "" in value_set:
+        raise AttributeFilterError(f"Invalid filter condition: {text.strip()!r}")
+    return FilterClause(key, value_set, negate)
+
+
+def parse_source_expression(expression: str) -> SourceFilter:
+    """
+    解析数据源表达式，不带方括号时为数据源名称本身
+    :raises AttributeFilterError: 表达式不合法
+    """
+    start = expression.find("[")
+    if start < 0:
+        return SourceFilter(expression)
+    if not expression.endswith("]"):
+        raise AttributeFilterError(f"Invalid data source expression: {expression!r}")
+    name = expression[:start].strip()
+    body = expression[start + 1 : -1]
+    if not name or not body.strip():
+        raise AttributeFilterError(f"Invalid data source expression: {expression!r}")
+    return SourceFilter(name, tuple(_parse_clause(part) for part in body.split("&")))
+
+
+class AttributeIndex:
+    """
+    数据源元素属性的倒排索引
+    每个(属性名, 属性值)对应一个位图（Python整数，第i位为1表示第i个元素具有该属性值），
+    过滤时只对位图做与、或、非运算，不遍历元素列表
+    """
+
+    def __init__(self, size: int, bitsets: Dict[str, Dict[str, int]]):
+        self.size = size
+        self._bitsets = bitsets
+        self._all = (1 << size) - 1
+
+    @classmethod
+    def build(cls, attributes: List[Dict[str, List[str]]]) -> "AttributeIndex":
+        """由每个元素的属性（属性名 -> 属性值列表）构建索引"""
+        postings: Dict[str, Dict[str, List[int]]] = {}
+        for i, element_attributes in enumerate(attributes):
+            for key, values in element_attributes.items():
+                key_postings = postings.setdefault(key, {})
+                for value in values:
+                    key_postings.setdefault(value, []).append(i)
+        return cls.from_postings(len(attributes), postings)
+
+    @classmethod
+    def from_postings(
+        cls, size: int, postings: Dict[str, Dict[str, List[int]]]
+    ) -> "AttributeIndex":
+        """由倒排表（属性名 -> 属性值 -> 升序下标列表）构建索引"""
+        return cls(
+            size,
+            {
+                key: {
+                    value: _to_bitset(positions, size)
+                    for value, positions in key_postings.items()
+                }
+                for key, key_postings in postings.items()
+            },
+        )
+
+    def to_postings(self) -> Dict[str, Dict[str, List[int]]]:
+        """导出倒排表，用于写入快照"""
+        return {
+            key: {value: _to_positions(bitset) for value, bitset in values.items()}
+            for key, values in self._bitsets.items()
+        }
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """每个属性的所有取值及具有该取值的元素数量"""
+        return {
+            key: {value: bin(bitset).count("1") for value, bitset in values.items()}
+            for key, values in self._bitsets.items()
+        }
+
+    def select(self, clauses: Iterable[FilterClause]) -> List[int]:
+        """
+        返回满足所有过滤条件的元素下标（升序）
+        :raises AttributeFilterError: 属性不存在
+        """
+        result = self._all
+        for clause in clauses:
+            values = self._bitsets.get(clause.key)
+            if values is None:
+                raise AttributeFilterError(f"Unknown attribute: {clause.key!r}")
+            bits = 0
+            for value in clause.values:
+                bits |= values.get(value, 0)
+            result &= ~bits if clause.negate else bits
+        return _to_positions(result & self._all)
+
+
+class IndexedElements(list):
+    """附带属性索引的元素列表，数据源返回该类型即可支持属性过滤"""
+
+    def __init__(
+        self,
+        elements: Iterable[Element] = (),
+        attribute_index: Optional[AttributeIndex] = None,
+    ):
+        super().__init__(elements)
+        self.attribute_index = attribute_index
+
+
+def select_elements(
+    elements: List[Element], clauses: Tuple[FilterClause, ...]
+) -> List[Element]:
+    """
+    按过滤条件从数据源元素中选出元素（保持原顺序）
+    :raises AttributeFilterError: 数据源没有属性索引或属性不存在
+    """
+    if not clauses:
+        return elements
+    index = getattr(elements, "attribute_index", None)
+    if index is None or index.size != len(elements):
+        raise AttributeFilterError("The data source does not support attribute filters")
+    return [elements[i] for i in index.select(clauses)]
@@ -0,0 +1,58 @@
+"""
+批量创建分组基准测试
+对比逐个调用 POST /group_result 与一次调用 POST /group_results/batch 创建N个分组的耗时
+使用临时的SQLite文件数据库，直接调用接口函数，不经过HTTP
+
+运行：python benchmarks/bench_batch.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+tmpdir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+os.environ["DATABASE_ECHO"] = "False"
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from loguru import logger
+
+import main
+from models import CreateGroupRequest, init_db
+
+
+def make_requests(count):
+    return [
+        CreateGroupRequest(
+            group_name=f"第{i}轮",
+            source_elements=[f"选手{j}" for j in range(20)],
+            group_count=4,
+        )
+        for i in range(count)
+    ]
+
+
+async def main_bench():
+    logger.remove()
+    init_db()
+    print(f"{'count':>6}{'single(ms)':>12}{'batch(ms)':>11}{'speedup':>9}")
+    for count in (1, 10, 50, 100):
+        requests = make_requests(count)
+        start = time.perf_counter()
+        for request in requests:
+            assert (await main.create_group(request)).success
+        single_cost = time.perf_counter() - start
+        start = time.perf_counter()
+        assert (await main.create_groups_batch(requests)).data.created == count
+        batch_cost = time.perf_counter() - start
+        print(
+            f"{count:>6}{single_cost * 1000:>12.1f}{batch_cost * 1000:>11.1f}"
+            f"{single_cost / batch_cost:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main_bench())
+    main.engine.dispose()
+    tmpdir.cleanup()
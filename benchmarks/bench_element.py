@@ -0,0 +1,91 @@
+"""
+Element内存与创建耗时基准测试
+对比旧版Element（普通对象，每次新建）与当前Element（__slots__ + 驻留），
+分别测量create_group中构建元素池、分组结果转换为字符串的耗时，以及元素池占用的内存
+- cold: 驻留表为空（首次出现的值）
+- warm: 驻留表中已有这些值（重复请求同一批元素）
+
+运行：python benchmarks/bench_element.py
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from element_group import Element
+
+
+class LegacyElement:
+    """旧版Element实现"""
+
+    def __init__(self, value: str):
+        if not isinstance(value, str):
+            raise ValueError("The value must be a string")
+        self.value = value
+
+
+def legacy_to_str(elements):
+    if isinstance(elements, LegacyElement):
+        return elements.value
+    result = []
+    for element in elements:
+        if isinstance(element, LegacyElement):
+            result.append(element.value)
+        else:
+            result.append(legacy_to_str(element))
+    return result
+
+
+def best_of(func, repeat=30, setup=None):
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def pool_memory(func, setup=None):
+    if setup:
+        setup()
+    tracemalloc.start()
+    pool = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del pool
+    return size
+
+
+def main():
+    size = 10_000
+    cases = {
+        "unique": [f"成员{i}" for i in range(size)],
+        "repeated": [f"英雄{random.randrange(170)}" for _ in range(size)],
+    }
+    impls = {
+        "legacy": (lambda v: [LegacyElement(x) for x in v], legacy_to_str, None),
+        "cold": (Element.from_strs, Element.to_str, Element._interned.clear),
+        "warm": (Element.from_strs, Element.to_str, None),
+    }
+    print(f"pool size: {size}")
+    print(f"{'case':<10}{'impl':<8}{'build(ms)':>11}{'to_str(ms)':>12}{'pool(KB)':>10}")
+    for case, values in cases.items():
+        for name, (build, to_str, setup) in impls.items():
+            build_cost = best_of(lambda: build(values), setup=setup)
+            pool = build(values)
+            groups = [pool[i::10] for i in range(10)]
+            to_str_cost = best_of(lambda: to_str(groups))
+            mem = pool_memory(lambda: build(values), setup=setup)
+            print(
+                f"{case:<10}{name:<8}{build_cost * 1000:>11.2f}"
+                f"{to_str_cost * 1000:>12.2f}{mem / 1024:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+数据源属性过滤基准测试
+对比按属性选出元素时：
+- 遍历：逐个检查每个元素的属性
+- 倒排索引：AttributeIndex.select（位图运算）
+
+运行：python benchmarks/bench_filter.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from attribute_index import AttributeIndex, parse_source_expression
+
+TAGS = ["Mage", "Assassin", "Fighter", "Tank", "Marksman", "Support"]
+PARTYPES = ["Mana", "Energy", "None", "Fury"]
+EXPRESSION = "s[tags=Mage|Assassin&partype!=Mana]"
+
+
+def best_of(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def scan(attributes, clauses):
+    selected = []
+    for i, element_attributes in enumerate(attributes):
+        for clause in clauses:
+            matched = not clause.values.isdisjoint(
+                element_attributes.get(clause.key, ())
+            )
+            if matched == clause.negate:
+                break
+        else:
+            selected.append(i)
+    return selected
+
+
+def main():
+    clauses = parse_source_expression(EXPRESSION).clauses
+    print(EXPRESSION)
+    print(f"{'size':>10}{'scan(ms)':>12}{'index(ms)':>12}{'selected':>10}")
+    rng = random.Random(1)
+    for size in (170, 10_000, 100_000):
+        attributes = [
+            {"tags": rng.sample(TAGS, 2), "partype": [rng.choice(PARTYPES)]}
+            for _ in range(size)
+        ]
+        index = AttributeIndex.build(attributes)
+        assert scan(attributes, clauses) == index.select(clauses)
+        costs = [
+            best_of(lambda: scan(attributes, clauses)),
+            best_of(lambda: index.select(clauses)),
+        ]
+        print(
+            f"{size:>10}{costs[0] * 1000:>12.3f}{costs[1] * 1000:>12.3f}"
+            f"{len(index.select(clauses)):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+分组算法基准测试
+对比纯Python（random.shuffle）与NumPy（下标随机排列）分组在不同元素数量下的耗时，
+用于确定element_group.NUMPY_GROUPING_THRESHOLD；
+同时对比指定种子时打乱算法版本2与版本3的耗时（见element_group.choose_shuffle_version）
+
+运行：python benchmarks/bench_grouping.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from element_group import NUMPY_GROUPING_THRESHOLD, Element, Group
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    sizes = [100, 1_000, 5_000, 10_000, 20_000, 50_000, 100_000, 1_000_000]
+    cases = [
+        ("equal", dict(mode="equal", group_num=10)),
+        ("size", dict(mode="size", group_num=10, group_size=100)),
+    ]
+    print(f"current threshold: {NUMPY_GROUPING_THRESHOLD}")
+    print(
+        f"{'size':>10}{'mode':>7}{'python(ms)':>12}{'numpy(ms)':>11}{'speedup':>9}"
+        f"{'seed v2(ms)':>13}{'seed v3(ms)':>13}"
+    )
+    for size in sizes:
+        group = Group(Element.from_strs([f"成员{i}" for i in range(size)]))
+        repeat = max(3, min(200, 2_000_000 // size))
+        for name, kwargs in cases:
+            python_cost = best_of(
+                lambda: group.group_elements(engine="python", **kwargs), repeat
+            )
+            numpy_cost = best_of(
+                lambda: group.group_elements(engine="numpy", **kwargs), repeat
+            )
+            seed_costs = [
+                best_of(
+                    lambda: group.group_elements(
+                        seed=1, shuffle_version=version, **kwargs
+                    ),
+                    repeat,
+                )
+                for version in (2, 3)
+            ]
+            print(
+                f"{size:>10}{name:>7}{python_cost * 1000:>12.3f}"
+                f"{numpy_cost * 1000:>11.3f}{python_cost / numpy_cost:>8.2f}x"
+                + "".join(f"{cost * 1000:>13.3f}" for cost in seed_costs)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+按成员查询分组基准测试
+在临时数据库中写入N个分组结果，对比查询包含某个元素的分组：
+- 扫描：对每行的group_result JSON列执行json_each
+- 成员索引：按group_member表的主键范围读取
+同时统计维护成员索引带来的写入耗时与数据库大小变化
+
+运行：python benchmarks/bench_member_search.py [分组数量]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine
+import search
+from models import GroupMode, GroupResult
+from search import search_groups_by_member
+
+NAMES = [f"英雄{i}" for i in range(170)]
+
+
+def best_of(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def fill(engine, count, rng):
+    start = time.perf_counter()
+    with Session(engine) as session:
+        for i in range(count):
+            members = rng.sample(NAMES, 10)
+            session.add(
+                GroupResult(
+                    group_name=f"分组{i}",
+                    group_mode=GroupMode.EQUAL,
+                    source_elements=members,
+                    group_result=[members[:5], members[5:]],
+                )
+            )
+            if i % 1000 == 999:
+                session.commit()
+        session.commit()
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    scan_sql = text(
+        "SELECT id FROM groupresult WHERE is_public AND EXISTS ("
+        "SELECT 1 FROM json_each(groupresult.group_result) AS g, json_each(g.value) AS m "
+        "WHERE m.value = :value) ORDER BY id DESC LIMIT 20"
+    )
+    print(f"{count} groups of 10 members")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = {}
+        queries = {}
+        for indexed in (False, True):
+            path = os.path.join(tmpdir, f"{indexed}.db")
+            engine = create_engine(f"sqlite:///{path}")
+            SQLModel.metadata.create_all(engine)
+            search.MEMBER_INDEX_MAX_ELEMENTS = 100_000 if indexed else 0
+            insert_cost = fill(engine, count, random.Random(1))
+            results[indexed] = (insert_cost, os.path.getsize(path))
+            if indexed:
+                with Session(engine) as session:
+                    # 常见元素只需扫描少量行即可凑满第一页，不存在的元素需要扫描全表
+                    for value in ("英雄7", "提莫"):
+                        queries[value] = (
+                            best_of(
+                                lambda: session.execute(
+                                    scan_sql, {"value": value}
+                                ).all(),
+                                repeat=1,
+                            ),
+                            best_of(
+                                lambda: search_groups_by_member(
+                                    session, value, limit=20
+                                )
+                            ),
+                        )
+            engine.dispose()
+    for indexed, (insert_cost, size) in results.items():
+        print(
+            f"{'member index' if indexed else 'no index':>14}: insert {insert_cost:.2f}s, "
+            f"db {size / 1024 / 1024:.1f} MiB"
+        )
+    for value, (scan, member) in queries.items():
+        print(
+            f"first page of {value}: scan {scan * 1000:.2f}ms, "
+            f"index {member * 1000:.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
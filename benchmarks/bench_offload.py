@@ -0,0 +1,80 @@
+"""
+分组任务进程池卸载基准测试
+1. 对比不同元素数量下在当前进程中分组与交给进程池分组的耗时，用于确定GROUPING_PROCESS_THRESHOLD
+2. 一个大分组任务执行期间，测量同一事件循环中小分组任务的吞吐量
+
+运行：python benchmarks/bench_offload.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from element_group import Element
+from grouping_executor import GroupingScheduler
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(scheduler, pool, **kwargs):
+    return asyncio.run(scheduler.group_elements(pool, **kwargs))
+
+
+async def small_job_throughput(scheduler, big_pool, small_pool):
+    """大任务执行期间，每秒完成的小任务数与大任务耗时（秒）"""
+    done = False
+    completed = 0
+
+    async def small_jobs():
+        nonlocal completed
+        while not done:
+            await scheduler.group_elements(small_pool, group_num=4)
+            completed += 1
+
+    task = asyncio.ensure_future(small_jobs())
+    start = time.perf_counter()
+    await scheduler.group_elements(big_pool, group_num=10, seed=1)
+    elapsed = time.perf_counter() - start
+    done = True
+    await task
+    return completed / elapsed, elapsed
+
+
+def main():
+    inline = GroupingScheduler(max_workers=0)
+    offload = GroupingScheduler(process_threshold=0, max_workers=2)
+    # 预热工作进程
+    run(offload, Element.from_strs(["a", "b"]))
+    print(f"{'size':>10}{'inline(ms)':>12}{'process(ms)':>13}")
+    for size in (1_000, 10_000, 50_000, 100_000, 500_000):
+        pool = Element.from_strs([f"成员{i}" for i in range(size)])
+        repeat = max(3, 100_000 // size)
+        inline_cost = best_of(lambda: run(inline, pool, seed=1), repeat)
+        offload_cost = best_of(lambda: run(offload, pool, seed=1), repeat)
+        print(f"{size:>10}{inline_cost * 1000:>12.1f}{offload_cost * 1000:>13.1f}")
+
+    big_pool = Element.from_strs([f"成员{i}" for i in range(1_000_000)])
+    small_pool = Element.from_strs([f"成员{i}" for i in range(20)])
+    print("small jobs per second while grouping 1,000,000 elements:")
+    scheduler = GroupingScheduler(process_threshold=100_000, max_workers=2)
+    run(scheduler, big_pool[:100_000])
+    for name, current in (("inline", inline), ("process", scheduler)):
+        throughput, elapsed = asyncio.run(
+            small_job_throughput(current, big_pool, small_pool)
+        )
+        print(f"  {name:>8}: {throughput:>8.0f}/s (big job {elapsed:.2f}s)")
+    offload.shutdown()
+    scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
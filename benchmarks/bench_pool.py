@@ -0,0 +1,69 @@
+"""
+元素池构建基准测试
+对比合并自定义元素与数据源元素时：
+- 旧方式：为每个输入创建Element后直接拼接（不去重）
+- PoolBuilder：在字符串上规范化并去重，最后只为元素池创建Element
+
+运行：python benchmarks/bench_pool.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from element_group import Element, PoolBuilder
+
+
+def best_of(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def concat(inputs):
+    all_elements = []
+    for values in inputs:
+        all_elements.extend(Element.from_strs(values))
+    return all_elements
+
+
+def build(inputs, casefold=False):
+    builder = PoolBuilder(casefold=casefold)
+    for values in inputs:
+        builder.add(values)
+    return Element.from_strs(builder.pool)
+
+
+def main():
+    print(
+        f"{'size':>10}{'overlap':>9}{'concat(ms)':>12}{'builder(ms)':>13}"
+        f"{'casefold(ms)':>14}{'pool':>10}"
+    )
+    for size in (10_000, 100_000, 1_000_000):
+        for overlap in (0.0, 0.5):
+            # 两个输入，第二个输入中overlap比例的元素与第一个重复
+            first = [f"成员{i}" for i in range(size // 2)]
+            shift = int(size // 2 * (1 - overlap))
+            second = [f"成员{i + shift}" for i in range(size // 2)]
+            inputs = [first, second]
+            costs = [
+                best_of(lambda: concat(inputs)),
+                best_of(lambda: build(inputs)),
+                best_of(lambda: build(inputs, casefold=True)),
+            ]
+            print(
+                f"{size:>10}{overlap:>9.0%}"
+                + "".join(
+                    f"{cost * 1000:>{width}.2f}"
+                    for cost, width in zip(costs, (12, 13, 14))
+                )
+                + f"{len(build(inputs)):>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
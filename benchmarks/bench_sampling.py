@@ -0,0 +1,65 @@
+"""
+抽样分组基准测试
+按量分组只需要group_num * group_size个元素，对比打乱整个元素池与只抽取所需元素的耗时：
+- 未指定种子：random.shuffle整个元素池 vs random.sample
+- 指定种子：打乱算法版本1（完整排列）vs 版本2（stable_sample）vs 版本3（随机键排序，NumPy向量化）
+- 可迭代数据源：先转为列表再抽样 vs 蓄水池抽样
+
+运行：python benchmarks/bench_sampling.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from element_group import Element, Group, reservoir_sample
+
+
+def best_of(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    kwargs = dict(mode="size", group_num=4, group_size=5)
+    print(f"pick {kwargs['group_num']} groups of {kwargs['group_size']}")
+    print(
+        f"{'size':>10}{'shuffle(ms)':>13}{'sample(ms)':>12}"
+        f"{'seed v1(ms)':>13}{'seed v2(ms)':>13}{'seed v3(ms)':>13}"
+        f"{'list(ms)':>10}{'reservoir(ms)':>15}"
+    )
+    for size in (10_000, 100_000, 1_000_000):
+        pool = Element.from_strs([f"成员{i}" for i in range(size)])
+        group = Group(pool)
+
+        def full_shuffle():
+            working_pool = pool.copy()
+            random.shuffle(working_pool)
+            return working_pool[:20]
+
+        costs = [
+            best_of(full_shuffle),
+            best_of(lambda: group.group_elements(engine="python", **kwargs)),
+            best_of(lambda: group.group_elements(seed=1, shuffle_version=1, **kwargs)),
+            best_of(lambda: group.group_elements(seed=1, shuffle_version=2, **kwargs)),
+            best_of(lambda: group.group_elements(seed=1, shuffle_version=3, **kwargs)),
+            best_of(lambda: random.sample(list(iter(pool)), 20)),
+            best_of(lambda: reservoir_sample(iter(pool), 20)),
+        ]
+        print(
+            f"{size:>10}"
+            + "".join(
+                f"{cost * 1000:>{width}.2f}"
+                for cost, width in zip(costs, (13, 12, 13, 13, 13, 10, 15))
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+SQLite写入基准测试
+多个线程并发写入分组结果，对比默认配置、performance配置（WAL等）
+以及performance配置下启用合并提交（group commit）的吞吐量
+
+运行：python benchmarks/bench_sqlite.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlmodel import Session, SQLModel
+from group_commit import GroupCommitQueue
+from models import GroupResult, create_db_engine
+
+THREADS = 16
+ROWS = 2000
+
+
+def make_row(i):
+    return GroupResult(
+        group_name=f"分组{i}", group_result=[[f"成员{j}" for j in range(10)]] * 4
+    )
+
+
+def run(engine, insert):
+    SQLModel.metadata.create_all(engine)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as executor:
+        list(executor.map(lambda i: insert(make_row(i)), range(ROWS)))
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{THREADS} threads, {ROWS} rows")
+    print(f"{'profile':>22}{'rows/s':>10}{'commits':>9}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, profile, group_commit in (
+            ("default", "default", False),
+            ("performance", "performance", False),
+            ("performance+group", "performance", True),
+        ):
+            engine = create_db_engine(
+                f"sqlite:///{os.path.join(tmpdir, name + '.db')}", profile=profile
+            )
+            writer = GroupCommitQueue(engine)
+            if group_commit:
+                writer.start()
+            cost = run(engine, writer.insert)
+            writer.stop()
+            engine.dispose()
+            print(f"{name:>22}{ROWS / cost:>10.0f}{writer.commits:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+分组结果存储基准测试
+对比JSON与紧凑格式（不压缩/zlib）保存分组结果时的单行大小与SQLite读写耗时
+
+运行：python benchmarks/bench_storage.py
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from compact_storage import decode_groups, encode_groups
+from element_group import Element, Group
+
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_sqlite(payload, decode, rows):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE result (id INTEGER PRIMARY KEY, data BLOB)")
+
+    def write():
+        conn.execute("DELETE FROM result")
+        conn.executemany("INSERT INTO result (data) VALUES (?)", [(payload,)] * rows)
+        conn.commit()
+
+    def read():
+        for (data,) in conn.execute("SELECT data FROM result"):
+            decode(data)
+
+    write_cost = best_of(write, 3) / rows
+    read_cost = best_of(read, 3) / rows
+    conn.close()
+    return write_cost, read_cost
+
+
+def main():
+    names = [f"英雄{i % 160}" for i in range(10_000)]
+    print(f"{'size':>8}{'format':>8}{'bytes':>10}{'write(us)':>11}{'read(us)':>10}")
+    for size in (10, 100, 1_000, 10_000):
+        groups = Group(Element.from_strs(names[:size])).group_elements(
+            mode="equal", group_num=10
+        )
+        result = Element.to_str(groups)
+        rows = max(10, 100_000 // size)
+        formats = [
+            ("json", json.dumps(result, ensure_ascii=False), json.loads),
+            ("none", encode_groups(result, "none"), decode_groups),
+            ("zlib", encode_groups(result, "zlib"), decode_groups),
+        ]
+        for name, payload, decode in formats:
+            write_cost, read_cost = bench_sqlite(payload, decode, rows)
+            size_bytes = len(payload.encode() if isinstance(payload, str) else payload)
+            print(
+                f"{size:>8}{name:>8}{size_bytes:>10}"
+                f"{write_cost * 1e6:>11.1f}{read_cost * 1e6:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+流式输出基准测试
+对比按种子保存的分组结果完整序列化为一个JSON响应与按NDJSON逐组输出时的峰值内存与首字节时间
+
+运行：python benchmarks/bench_stream.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from loguru import logger
+
+from main import GeneralResponse, build_cached_result, group_result_data, iter_ndjson
+from models import GroupMode, GroupResult
+
+
+def measure(func):
+    # tracemalloc会显著拖慢执行，耗时与内存分开测量
+    start = time.perf_counter()
+    first_byte = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024, first_byte * 1000, elapsed * 1000
+
+
+def main():
+    logger.remove()
+    print(
+        f"{'size':>10}{'mode':>8}{'peak(MiB)':>11}{'first byte(ms)':>16}{'total(ms)':>11}"
+    )
+    for size in (10_000, 100_000, 500_000):
+        row = GroupResult(
+            id=1,
+            group_name="流式",
+            group_mode=GroupMode.EQUAL,
+            group_count=size // 10,
+            source_elements=[f"成员{i}" for i in range(size)],
+            seed=1,
+            shuffle_version=1,
+        )
+
+        def full():
+            start = time.perf_counter()
+            build_cached_result(row).body
+            return time.perf_counter() - start
+
+        def stream():
+            start = time.perf_counter()
+            header = GeneralResponse(
+                success=True, message="", message_zh_CN="", data=group_result_data(row)
+            )
+            chunks = iter_ndjson(header, row.iter_group_result())
+            next(chunks)
+            next(chunks)
+            first_byte = time.perf_counter() - start
+            for _ in chunks:
+                pass
+            return first_byte
+
+        for name, func in (("full", full), ("ndjson", stream)):
+            peak, first_byte, total = measure(func)
+            print(f"{size:>10}{name:>8}{peak:>11.1f}{first_byte:>16.1f}{total:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
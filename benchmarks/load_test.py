@@ -0,0 +1,162 @@
+"""
+接口压测
+启动uvicorn服务（使用临时数据库），用多个keep-alive连接并发请求各接口，统计每秒请求数与延迟
+对比同步版本时，可将旧版本代码检出到其他目录并通过--app-dir指定，例如：
+    git worktree add /tmp/sync-app <commit>
+    python benchmarks/load_test.py --app-dir /tmp/sync-app
+
+运行：python benchmarks/load_test.py [--app-dir DIR] [--connections 200] [--duration 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+PORT = 8765
+
+
+async def request(reader, writer, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else b""
+    head = (
+        f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n"
+    )
+    writer.write(head.encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+def create_body(i):
+    return {
+        "group_name": f"load-{i}",
+        "source_elements": [f"member-{j}" for j in range(30)],
+        "group_count": 5,
+    }
+
+
+async def wait_for_server(timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", PORT)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not start")
+
+
+async def run_scenario(name, make_request, connections, duration):
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+        while time.monotonic() < deadline:
+            method, path, body = make_request()
+            start = time.perf_counter()
+            if await request(reader, writer, method, path, body) != 200:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+        writer.close()
+
+    start = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(connections)))
+    elapsed = time.monotonic() - start
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(
+        f"{name:>14}{len(latencies) / elapsed:>10.0f}{p50:>10.1f}{p99:>10.1f}"
+        f"{errors:>8}"
+    )
+
+
+async def run(connections, duration):
+    await wait_for_server()
+    reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+    for i in range(200):
+        await request(reader, writer, "POST", "/group_result", create_body(i))
+    writer.close()
+    counter = iter(range(10**9))
+    scenarios = {
+        "group_result": lambda: (
+            "GET",
+            f"/group_result?group_id={random.randint(1, 200)}",
+            None,
+        ),
+        "latest_groups": lambda: ("GET", "/latest_groups", None),
+        "create_group": lambda: (
+            "POST",
+            "/group_result",
+            create_body(next(counter)),
+        ),
+        "mixed": lambda: random.choice(
+            [scenarios["group_result"]] * 6
+            + [scenarios["latest_groups"]] * 3
+            + [scenarios["create_group"]]
+        )(),
+    }
+    print(f"{connections} connections, {duration}s per scenario")
+    print(f"{'scenario':>14}{'req/s':>10}{'p50(ms)':>10}{'p99(ms)':>10}{'errors':>8}")
+    for name, make_request in scenarios.items():
+        await run_scenario(name, make_request, connections, duration)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--app-dir", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=5)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(tmpdir, 'load.db')}",
+            SNAPSHOT_DIR="",
+            LOG_LEVEL="WARNING",
+        )
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "main:app",
+                "--port",
+                str(PORT),
+                "--log-level",
+                "warning",
+                "--no-access-log",
+            ],
+            cwd=args.app_dir,
+            env=env,
+        )
+        try:
+            asyncio.run(run(args.connections, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
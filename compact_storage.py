@@ -0,0 +1,143 @@
+"""
+分组结果的紧凑二进制编码
+格式：头部 magic(4s) + 格式版本(B) + 压缩方式(B) + 下标类型(c)，随后为（可能经过压缩的）正文：
+    字符串表大小(I) + 分组数量(I)
+    + 字符串表中每个字符串的字符长度(array('I'))
+    + 每组元素数量(array('I'))
+    + 所有组的元素在字符串表中的下标(array(下标类型))
+    + 字符串表拼接后的UTF-8文本
+所有数字均为小端序
+"""
+
+import struct
+import sys
+import zlib
+from array import array
+from typing import List
+
+try:
+    import zstandard
+except ImportError:  # zstd为可选依赖
+    zstandard = None
+
+PACKED_MAGIC = b"GTGR"
+PACKED_FORMAT_VERSION = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSIONS = {
+    "none": COMPRESSION_NONE,
+    "zlib": COMPRESSION_ZLIB,
+    "zstd": COMPRESSION_ZSTD,
+}
+
+_HEADER = struct.Struct("<4sBBc")
+_COUNTS = struct.Struct("<II")
+
+
+def _to_little_endian(values: array) -> bytes:
+    if sys.byteorder != "little" and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little" and values.itemsize > 1:
+        values.byteswap()
+    return values
+
+
+def _index_typecode(table_size: int) -> str:
+    """根据字符串表大小选择最小的下标类型"""
+    if table_size <= 0xFF:
+        return "B"
+    if table_size <= 0xFFFF:
+        return "H"
+    return "I"
+
+
+def encode_groups(groups: List[List[str]], compression: str = "zlib") -> bytes:
+    """将分组结果编码为紧凑的二进制格式，重复的字符串只保存一次"""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Invalid compression: {compression}")
+    if compression == "zstd" and zstandard is None:
+        raise RuntimeError("zstandard is required for zstd compression")
+    table = {}
+    for group in groups:
+        for value in group:
+            if value not in table:
+                table[value] = len(table)
+    typecode = _index_typecode(len(table))
+    indices = array(typecode, [table[value] for group in groups for value in group])
+    body = b"".join(
+        (
+            _COUNTS.pack(len(table), len(groups)),
+            _to_little_endian(array("I", [len(value) for value in table])),
+            _to_little_endian(array("I", [len(group) for group in groups])),
+            _to_little_endian(indices),
+            "".join(table).encode("utf-8"),
+        )
+    )
+    if compression == "zlib":
+        body = zlib.compress(body)
+    elif compression == "zstd":
+        body = zstandard.ZstdCompressor().compress(body)
+    header = _HEADER.pack(
+        PACKED_MAGIC,
+        PACKED_FORMAT_VERSION,
+        COMPRESSIONS[compression],
+        typecode.encode("ascii"),
+    )
+    return header + body
+
+
+def decode_groups(data: bytes) -> List[List[str]]:
+    """解码encode_groups生成的二进制数据"""
+    magic, version, compression, typecode = _HEADER.unpack_from(data)
+    if magic != PACKED_MAGIC or version != PACKED_FORMAT_VERSION:
+        raise ValueError("Invalid packed group result")
+    body = data[_HEADER.size :]
+    if compression == COMPRESSION_ZLIB:
+        body = zlib.decompress(body)
+    elif compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required for zstd compression")
+        body = zstandard.ZstdDecompressor().decompress(body)
+    elif compression != COMPRESSION_NONE:
+        raise ValueError(f"Invalid compression: {compression}")
+    typecode = typecode.decode("ascii")
+
+    table_size, group_count = _COUNTS.unpack_from(body)
+    offset = _COUNTS.size
+    lengths = _from_little_endian("I", body[offset : offset + table_size * 4])
+    offset += table_size * 4
+    group_lengths = _from_little_endian("I", body[offset : offset + group_count * 4])
+    offset += group_count * 4
+    index_size = array(typecode).itemsize * sum(group_lengths)
+    indices = _from_little_endian(typecode, body[offset : offset + index_size])
+    offset += index_size
+    text = body[offset:].decode("utf-8")
+
+    table = []
+    start = 0
+    for length in lengths:
+        table.append(text[start : start + length])
+        start += length
+    groups = []
+    start = 0
+    for length in group_lengths:
+        groups.append([table[i] for i in indices[start : start + length]])
+        start += length
+    return groups
+
+
+if __name__ == "__main__":
+    # 将已有的JSON分组结果迁移为紧凑格式：python compact_storage.py [zlib|zstd|none]
+    from models import engine, pack_existing_results
+
+    compression = sys.argv[1] if len(sys.argv) > 1 else "zlib"
+    print(f"Packed {pack_existing_results(engine, compression=compression)} rows")
@@ -1,65 +1,681 @@
 from abc import ABC, abstractmethod
+import asyncio
+import json
+import os
+import random
+import struct
+import sys
+import threading
+from array import array
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from attribute_index import AttributeIndex, IndexedElements
 from element_group import Element
-from typing import List
-from functools import lru_cache
-from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
 from loguru import logger
 
+# 数据源元素缓存的默认有效期（秒），可通过环境变量覆盖
+ELEMENT_CACHE_TTL = float(os.getenv("ELEMENT_CACHE_TTL", "3600"))
+# 刷新失败后，旧数据再次尝试刷新前的等待时间（秒）
+ELEMENT_CACHE_RETRY_INTERVAL = 30.0
+# 后台刷新数据源版本的周期（秒）
+VERSION_REFRESH_INTERVAL = float(os.getenv("VERSION_REFRESH_INTERVAL", "3600"))
+# 数据源快照目录，为空时不读写快照
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+# 共享HTTP连接池大小，同时也是并发获取数据源的最大线程数
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+
+# 所有数据源共用的HTTP会话，复用keep-alive连接
+http_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+http_session.mount("http://", _adapter)
+http_session.mount("https://", _adapter)
+
+_fetch_executor = ThreadPoolExecutor(
+    max_workers=HTTP_POOL_SIZE, thread_name_prefix="element-source"
+)
+
+# 单次HTTP请求的默认超时（秒），分别为连接超时和读取超时
+HTTP_TIMEOUT = (
+    float(os.getenv("HTTP_CONNECT_TIMEOUT", "3")),
+    float(os.getenv("HTTP_READ_TIMEOUT", "10")),
+)
+# 失败后的最大重试次数
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+# 重试退避的基础时间（秒），实际等待时间为带随机抖动的指数退避
+HTTP_RETRY_BACKOFF = 0.2
+# 单次获取（含所有重试）的总时间预算（秒）
+HTTP_RETRY_BUDGET = float(os.getenv("HTTP_RETRY_BUDGET", "15"))
+
+
+class CircuitOpenError(requests.RequestException):
+    """熔断器处于打开状态，请求被直接拒绝"""
+
+
+class CircuitBreaker:
+    """
+    熔断器
+    - closed: 正常放行请求，连续失败达到阈值后进入open
+    - open: 直接拒绝请求，经过recovery_timeout后进入half_open
+    - half_open: 只放行一个探测请求，成功则恢复closed，失败则重新open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._total_failures = 0
+        self._total_rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = self.HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """判断当前是否允许发起请求"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self._total_rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._total_failures += 1
+            if (
+                self._state == self.HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit breaker opened: {self.name}")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def reset(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def status(self) -> dict:
+        """熔断器状态，用于监控"""
+        with self._lock:
+            state = self._current_state()
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._failures,
+                "total_failures": self._total_failures,
+                "total_rejected": self._total_rejected,
+                "retry_after": (
+                    max(0.0, self._opened_at + self.recovery_timeout - time.monotonic())
+                    if state == self.OPEN
+                    else 0.0
+                ),
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """获取（不存在则创建）指定名称的熔断器"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def get_circuit_breaker_states() -> Dict[str, dict]:
+    """获取所有熔断器的状态"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.status() for breaker in breakers}
+
+
+def fetch_json(
+    url: str,
+    breaker: CircuitBreaker,
+    timeout=HTTP_TIMEOUT,
+    max_retries: int = HTTP_MAX_RETRIES,
+    budget: float = HTTP_RETRY_BUDGET,
+):
+    """
+    带超时、有限重试（指数退避+随机抖动）与熔断的JSON请求
+    所有重试共享budget秒的时间预算，预算不足时不再重试
+    :raises requests.RequestException: 请求最终失败或熔断器打开
+    """
+    deadline = time.monotonic() + budget
+    attempt = 0
+    while True:
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Circuit breaker is open: {breaker.name}")
+        try:
+            response = http_session.get(url, timeout=timeout)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            breaker.record_failure()
+            backoff = random.uniform(0, HTTP_RETRY_BACKOFF * (2**attempt))
+            attempt += 1
+            if attempt > max_retries or time.monotonic() + backoff >= deadline:
+                if isinstance(e, requests.RequestException):
+                    raise
+                raise requests.RequestException(f"Invalid JSON from {url}: {e}")
+            logger.warning(f"Request {url} failed ({e}), retry #{attempt}")
+            time.sleep(backoff)
+        else:
+            breaker.record_success()
+            return data
+
+
+# 快照文件格式：
+# 头部 magic(4s) + 格式版本(H) + 数据版本字节数(H) + 元素数量(I)
+# 格式版本2在头部之后增加属性倒排表的字节数(I)
+# 随后依次为数据版本(UTF-8)、属性倒排表(JSON，仅版本2)、每个元素的字符长度(array('I'))、
+# 所有元素拼接后的UTF-8文本
+SNAPSHOT_MAGIC = b"GTES"
+SNAPSHOT_FORMAT_VERSION = 2
+_SNAPSHOT_HEADER = struct.Struct("<4sHHI")
+_SNAPSHOT_POSTINGS_SIZE = struct.Struct("<I")
+
+
+def write_snapshot(
+    path: str,
+    version: str,
+    values: List[str],
+    postings: Optional[Dict[str, Dict[str, List[int]]]] = None,
+):
+    """将元素值列表（及属性倒排表）以紧凑的二进制格式原子写入快照文件"""
+    version_bytes = version.encode("utf-8")
+    postings_bytes = (
+        json.dumps(postings, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if postings is not None
+        else b""
+    )
+    lengths = array("I", (len(value) for value in values))
+    if sys.byteorder != "little":
+        lengths.byteswap()
+    # 先完成编码，编码失败（如孤立的代理字符）时不会留下不完整的临时文件
+    text_bytes = "".join(values).encode("utf-8")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            _SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, len(version_bytes), len(values)
+            )
+        )
+        f.write(_SNAPSHOT_POSTINGS_SIZE.pack(len(postings_bytes)))
+        f.write(version_bytes)
+        f.write(postings_bytes)
+        f.write(lengths.tobytes())
+        f.write(text_bytes)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(
+    path: str,
+) -> Optional[Tuple[str, List[str], Optional[Dict[str, Dict[str, List[int]]]]]]:
+    """
+    读取快照文件，返回(数据版本, 元素值列表, 属性倒排表)，没有属性倒排表时为None；
+    文件不存在或格式不符时返回None
+    """
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        magic, format_version, version_len, count = _SNAPSHOT_HEADER.unpack_from(raw)
+        if magic != SNAPSHOT_MAGIC or format_version not in (1, 2):
+            return None
+        offset = _SNAPSHOT_HEADER.size
+        postings_len = 0
+        if format_version >= 2:
+            (postings_len,) = _SNAPSHOT_POSTINGS_SIZE.unpack_from(raw, offset)
+            offset += _SNAPSHOT_POSTINGS_SIZE.size
+        version = raw[offset : offset + version_len].decode("utf-8")
+        offset += version_len
+        postings = (
+            json.loads(raw[offset : offset + postings_len]) if postings_len else None
+        )
+        offset += postings_len
+        lengths = array("I")
+        lengths.frombytes(raw[offset : offset + count * lengths.itemsize])
+        if sys.byteorder != "little":
+            lengths.byteswap()
+        offset += count * lengths.itemsize
+        text = raw[offset:].decode("utf-8")
+    except (OSError, struct.error, UnicodeDecodeError, ValueError) as e:
+        if not isinstance(e, FileNotFoundError):
+            logger.warning(f"Invalid snapshot {path}: {e}")
+        return None
+    values = []
+    start = 0
+    for length in lengths:
+        values.append(text[start : start + length])
+        start += length
+    if len(values) != count or start != len(text):
+        logger.warning(f"Invalid snapshot {path}: length mismatch")
+        return None
+    return version, values, postings
+
 
 class ElementSource(ABC):
     display_name: str = "未命名数据源"
+    # 该数据源的缓存有效期（秒），为None时使用ELEMENT_CACHE_TTL
+    cache_ttl: Optional[float] = None
+    # 该数据源单次请求的超时（秒）与最大重试次数
+    timeout = HTTP_TIMEOUT
+    max_retries: int = HTTP_MAX_RETRIES
+
+    @classmethod
+    def breaker(cls) -> CircuitBreaker:
+        """该数据源对应的熔断器"""
+        return get_circuit_breaker(cls.display_name)
+
+    @classmethod
+    def snapshot_version(cls) -> str:
+        """数据版本，与快照中记录的版本不一致时快照视为过期"""
+        return ""
+
+    @classmethod
+    def refresh_version(cls):
+        """由后台线程定期调用，用于更新数据版本等元信息"""
+        pass
 
     @abstractmethod
     def get_elements(self) -> List[Element]:
-        """从数据源获取Element列表的抽象方法"""
+        """
+        从数据源获取Element列表的抽象方法
+        返回附带属性索引的IndexedElements时，该数据源支持按属性过滤
+        """
         pass
 
 
-@lru_cache(maxsize=1, typed=False)
-def get_newest_lol_api_version():
-    """获取最新的LOL API版本，结果缓存1天"""
+LOL_FALLBACK_API_VERSION = "14.24.1"
+
+
+def get_newest_lol_api_version(
+    default: Optional[str] = LOL_FALLBACK_API_VERSION,
+) -> Optional[str]:
+    """获取最新的LOL API版本，失败时返回default"""
     try:
         url = "https://ddragon.leagueoflegends.com/api/versions.json"
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()[0]
-    except requests.RequestException as e:
+        return fetch_json(url, get_circuit_breaker("LOL API版本"))[0]
+    except (requests.RequestException, LookupError, TypeError) as e:
         logger.error(f"获取最新API版本失败: {e}")
-        return "14.24.1"
+        return default
 
 
 class LolHeroSource(ElementSource):
     display_name = "英雄联盟英雄数据"
-    api_version: str = get_newest_lol_api_version()
+    base_url: str = "https://ddragon.leagueoflegends.com"
+    # 当前使用的API版本，由后台线程定期刷新；为None时在首次获取数据前同步解析
+    api_version: Optional[str] = None
+
+    @classmethod
+    def resolve_api_version(cls) -> str:
+        if cls.api_version is None:
+            cls.api_version = get_newest_lol_api_version()
+        return cls.api_version
+
+    @classmethod
+    def snapshot_version(cls) -> str:
+        return cls.api_version or ""
+
+    @classmethod
+    def refresh_version(cls):
+        """更新API版本，版本变化后已缓存的旧版本数据视为过期"""
+        version = get_newest_lol_api_version(default=None)
+        if version and version != cls.api_version:
+            logger.info(f"LOL API version updated: {cls.api_version} -> {version}")
+            cls.api_version = version
+        element_cache.expire_outdated(cls)
+
+    @staticmethod
+    def champion_attributes(champion_data: dict) -> Dict[str, List[str]]:
+        """英雄的可过滤属性：英文ID、定位（tags）、资源类型（partype）与操作难度"""
+        attributes = {"tags": list(champion_data.get("tags", []))}
+        for key in ("id", "partype"):
+            if champion_data.get(key):
+                attributes[key] = [champion_data[key]]
+        difficulty = champion_data.get("info", {}).get("difficulty")
+        if difficulty is not None:
+            attributes["difficulty"] = [str(difficulty)]
+        return attributes
 
     @classmethod
     def get_elements(cls) -> List[Element]:
-        """从英雄联盟API获取所有英雄名字"""
+        """从英雄联盟API获取所有英雄名字，并按英雄属性建立索引"""
         # 官方API地址
-        url = f"https://ddragon.leagueoflegends.com/cdn/{cls.api_version}/data/zh_CN/champion.json"
+        api_version = cls.resolve_api_version()
+        url = f"{cls.base_url}/cdn/{api_version}/data/zh_CN/champion.json"
 
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
+            data = fetch_json(
+                url, cls.breaker(), timeout=cls.timeout, max_retries=cls.max_retries
+            )
 
-            # 提取所有英雄名字
-            heroes = [
-                Element(f"{champion_data['name']} {champion_data['title']}")
-                for champion_data in data["data"].values()
-            ]
-            return heroes
+            # 提取所有英雄名字与属性
+            champions = list(data["data"].values())
+            return IndexedElements(
+                Element.from_strs(
+                    f"{champion_data['name']} {champion_data['title']}"
+                    for champion_data in champions
+                ),
+                AttributeIndex.build(
+                    [cls.champion_attributes(champion) for champion in champions]
+                ),
+            )
 
         except requests.RequestException as e:
             logger.error(f"Get elements from {cls.display_name} failed: {e}")
             return []
 
 
+class _CacheEntry:
+    __slots__ = ("elements", "expires_at", "version", "index")
+
+    def __init__(
+        self,
+        elements: List[Element],
+        expires_at: float,
+        version: str = "",
+        index: Optional[AttributeIndex] = None,
+    ):
+        self.elements = elements
+        self.expires_at = expires_at
+        self.version = version
+        self.index = index
+
+    def copy_elements(self) -> IndexedElements:
+        return IndexedElements(self.elements, self.index)
+
+
+class ElementCache:
+    """
+    数据源元素缓存
+    - 缓存未过期时直接返回缓存内容
+    - 缓存过期后继续返回旧数据，同时只启动一个后台线程刷新（stale-while-revalidate）
+    - 缓存缺失时，并发请求合并为一次获取
+    - 指定snapshot_dir时，每次成功获取后写入快照，启动时可从快照预热
+    """
+
+    def __init__(self, default_ttl: float = ELEMENT_CACHE_TTL, snapshot_dir: str = ""):
+        self.default_ttl = default_ttl
+        self.snapshot_dir = snapshot_dir
+        self._entries: Dict[type, _CacheEntry] = {}
+        self._inflight: Dict[type, Future] = {}
+        self._lock = threading.Lock()
+
+    def _ttl_of(self, source) -> float:
+        ttl = getattr(source, "cache_ttl", None)
+        return self.default_ttl if ttl is None else ttl
+
+    def _lookup_locked(self, source) -> Optional[List[Element]]:
+        """读取缓存（需持有锁），过期时启动后台刷新，缺失时返回None"""
+        entry = self._entries.get(source)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry.expires_at and source not in self._inflight:
+            future = Future()
+            self._inflight[source] = future
+            threading.Thread(
+                target=self._refresh,
+                args=(source, future),
+                name=f"refresh-{source.display_name}",
+                daemon=True,
+            ).start()
+        return entry.copy_elements()
+
+    def get_nowait(self, source) -> Optional[List[Element]]:
+        """
+        只从缓存获取数据源的元素列表（返回附带属性索引的副本），
+        缓存缺失时返回None，不会阻塞
+        """
+        with self._lock:
+            return self._lookup_locked(source)
+
+    def get(self, source) -> List[Element]:
+        """获取数据源的元素列表（返回附带属性索引的副本）"""
+        with self._lock:
+            elements = self._lookup_locked(source)
+            if elements is not None:
+                return elements
+            future = self._inflight.get(source)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[source] = future
+        if leader:
+            self._refresh(source, future)
+        return future.result().copy_elements()
+
+    def _snapshot_path(self, source) -> Optional[str]:
+        name = getattr(source, "__name__", None)
+        if not self.snapshot_dir or not isinstance(name, str):
+            return None
+        return os.path.join(self.snapshot_dir, f"{name}.snap")
+
+    def _save_snapshot(
+        self,
+        source,
+        version: str,
+        elements: List[Element],
+        index: Optional[AttributeIndex] = None,
+    ):
+        path = self._snapshot_path(source)
+        if path is None:
+            return
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            write_snapshot(
+                path,
+                version,
+                [element.value for element in elements],
+                index.to_postings() if index is not None else None,
+            )
+        except Exception as e:
+            # 快照只用于预热，任何写入失败都不影响本次刷新
+            logger.warning(f"Save snapshot of {source.display_name} failed: {e}")
+
+    def load_snapshot(self, source) -> bool:
+        """
+        从快照预热数据源缓存
+        快照版本与数据源当前版本一致时按正常TTL缓存，否则视为已过期：
+        仍可立即对外提供，同时首次访问会触发后台刷新
+        """
+        path = self._snapshot_path(source)
+        snapshot = read_snapshot(path) if path else None
+        if snapshot is None:
+            return False
+        version, values, postings = snapshot
+        elements = Element.from_strs(values)
+        index = None
+        if postings is not None:
+            try:
+                index = AttributeIndex.from_postings(len(elements), postings)
+            except (AttributeError, TypeError, ValueError) as e:
+                logger.warning(f"Invalid attribute index in snapshot {path}: {e}")
+        expires_at = time.monotonic()
+        # 数据源版本尚未解析时先按有效快照处理，解析后由expire_outdated校验
+        current_version = source.snapshot_version()
+        if not current_version or version == current_version:
+            expires_at += self._ttl_of(source)
+        with self._lock:
+            if source not in self._entries:
+                self._entries[source] = _CacheEntry(
+                    elements, expires_at, version, index
+                )
+        logger.info(
+            f"Loaded snapshot of {source.display_name}: "
+            f"{len(elements)} elements, version {version!r}"
+        )
+        return True
+
+    def _refresh(self, source, future: Future):
+        """
+        从数据源获取数据并写入缓存，结果（缓存项）通过future通知等待者
+        无论刷新过程中是否出现异常，future都会被解决并从_inflight中移除
+        """
+        entry: Optional[_CacheEntry] = None
+        try:
+            entry = self._fetch_entry(source)
+        except Exception as e:
+            logger.error(f"Refresh elements of {source.display_name} failed: {e}")
+        finally:
+            with self._lock:
+                if self._inflight.get(source) is future:
+                    del self._inflight[source]
+                if entry is None:
+                    entry = self._entries.get(source) or _CacheEntry([], 0.0)
+            future.set_result(entry)
+
+    def _fetch_entry(self, source) -> _CacheEntry:
+        """从数据源获取数据并写入缓存，返回新的缓存项（获取失败时为旧缓存项或空缓存项）"""
+        elements: List[Element] = []
+        version = ""
+        try:
+            version = source.snapshot_version()
+            elements = source.get_elements()
+            # 版本可能在获取数据时才解析出来
+            version = version or source.snapshot_version()
+        except Exception as e:
+            logger.error(f"Refresh elements of {source.display_name} failed: {e}")
+        index = getattr(elements, "attribute_index", None)
+        if index is not None and index.size != len(elements):
+            logger.warning(f"Attribute index of {source.display_name} size mismatch")
+            index = None
+        if elements:
+            self._save_snapshot(source, version, elements, index)
+        with self._lock:
+            entry = self._entries.get(source)
+            if elements:
+                entry = _CacheEntry(
+                    list(elements),
+                    time.monotonic() + self._ttl_of(source),
+                    version,
+                    index,
+                )
+                self._entries[source] = entry
+            elif entry is not None:
+                # 获取失败时保留旧数据继续对外提供，并推迟下一次刷新
+                entry.expires_at = time.monotonic() + min(
+                    self._ttl_of(source), ELEMENT_CACHE_RETRY_INTERVAL
+                )
+            else:
+                entry = _CacheEntry([], 0.0)
+        return entry
+
+    def expire_outdated(self, source):
+        """缓存数据的版本与数据源当前版本不一致时将其标记为过期（仍可作为旧数据使用）"""
+        current_version = source.snapshot_version()
+        with self._lock:
+            entry = self._entries.get(source)
+            if (
+                entry is not None
+                and current_version
+                and entry.version != current_version
+            ):
+                entry.expires_at = 0.0
+
+    def invalidate(self, source=None):
+        """使指定数据源（或全部数据源）的缓存失效"""
+        with self._lock:
+            if source is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(source, None)
+
+
+element_cache = ElementCache(snapshot_dir=SNAPSHOT_DIR)
+
+
 def get_all_sources():
     return {cls.display_name: cls for cls in ElementSource.__subclasses__()}
 
 
+def load_source_snapshots() -> int:
+    """从快照预热所有数据源缓存，返回成功加载的数据源数量"""
+    return sum(
+        element_cache.load_snapshot(source) for source in get_all_sources().values()
+    )
+
+
+class _VersionRefresher:
+    """后台线程，按周期调用所有数据源的refresh_version"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _run(self):
+        while True:
+            for source in get_all_sources().values():
+                try:
+                    source.refresh_version()
+                except Exception as e:
+                    logger.error(
+                        f"Refresh version of {source.display_name} failed: {e}"
+                    )
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="version-refresher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+version_refresher = _VersionRefresher(VERSION_REFRESH_INTERVAL)
+
+
 def get_source_by_display_name(display_name: str):
     sources = get_all_sources()
     return sources.get(display_name)
@@ -68,7 +684,57 @@ def get_source_by_display_name(display_name: str):
 def get_elements_from_source(display_name: str):
     source = get_source_by_display_name(display_name)
     if source:
-        return source.get_elements()
+        return element_cache.get(source)
     else:
         logger.error(f"No data source found: {display_name}")
         return []
+
+
+def get_elements_by_source(display_names: List[str]) -> Dict[str, List[Element]]:
+    """
+    并发获取多个数据源的元素，返回数据源名称到元素列表的映射
+    重复的名称只获取一次，总耗时取决于最慢的单个数据源
+    """
+    names = list(dict.fromkeys(display_names))
+    if len(names) <= 1:
+        return {name: get_elements_from_source(name) for name in names}
+    return dict(zip(names, _fetch_executor.map(get_elements_from_source, names)))
+
+
+async def get_elements_by_source_async(
+    display_names: List[str],
+) -> Dict[str, List[Element]]:
+    """
+    get_elements_by_source 的异步版本
+    缓存命中的数据源直接返回；缓存缺失的数据源在获取线程池中并发获取，
+    等待期间不占用事件循环与请求线程
+    """
+    names = list(dict.fromkeys(display_names))
+    result: Dict[str, List[Element]] = {}
+    missing = []
+    for name in names:
+        source = get_source_by_display_name(name)
+        elements = element_cache.get_nowait(source) if source else None
+        if elements is None:
+            missing.append(name)
+        else:
+            result[name] = elements
+    if missing:
+        loop = asyncio.get_running_loop()
+        fetched = await asyncio.gather(
+            *(
+                loop.run_in_executor(_fetch_executor, get_elements_from_source, name)
+                for name in missing
+            )
+        )
+        result.update(zip(missing, fetched))
+    return {name: result[name] for name in names}
+
+
+def get_elements_from_sources(display_names: List[str]) -> List[Element]:
+    """
+    并发获取多个数据源的元素并按传入顺序合并
+    总耗时取决于最慢的单个数据源，而不是所有数据源耗时之和
+    """
+    elements_by_source = get_elements_by_source(display_names)
+    return [e for elements in elements_by_source.values() for e in elements]
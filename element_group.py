@@ -1,38 +1,328 @@
-from typing import List, Optional, Union
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+import heapq
+import itertools
+import math
 import random
+import threading
+import time
+import unicodedata
 from collections import OrderedDict
 
+try:
+    import numpy as np
+except ImportError:  # NumPy为可选依赖，未安装时只使用纯Python分组
+    np = None
+
+# 元素数量达到该值时，自动使用NumPy分组（见benchmarks/bench_grouping.py）
+NUMPY_GROUPING_THRESHOLD = 1000
+
+# 指定种子时使用的打乱算法版本，算法的任何改动都必须递增版本号，
+# 以保证按旧版本保存的分组结果重新计算后完全一致
+SHUFFLE_VERSION = 3
+_MASK64 = (1 << 64) - 1
+_GAMMA64 = 0x9E3779B97F4A7C15
+
+
+def stable_permutation(n: int, seed: int, version: int = SHUFFLE_VERSION) -> List[int]:
+    """
+    根据种子生成0..n-1的随机排列，结果只取决于(n, seed, version)，
+    与Python、NumPy版本无关
+    版本1：SplitMix64随机数 + Lemire无偏区间映射 + Fisher-Yates洗牌（从后向前）
+    版本2：同版本1的随机数，Fisher-Yates从前向后，见stable_sample
+    版本3：按每个位置的SplitMix64随机键排序，见stable_sample
+    """
+    if version in (2, 3):
+        return stable_sample(n, n, seed, version)
+    if version != 1:
+        raise ValueError(f"Unsupported shuffle version: {version}")
+    state = seed & _MASK64
+    indices = list(range(n))
+    for i in range(n - 1, 0, -1):
+        bound = i + 1
+        while True:
+            # SplitMix64
+            state = (state + 0x9E3779B97F4A7C15) & _MASK64
+            z = state
+            z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+            z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+            z ^= z >> 31
+            # Lemire：取乘积高64位作为结果，低64位落入偏差区间时重新生成
+            m = z * bound
+            if (m & _MASK64) >= (1 << 64) % bound:
+                j = m >> 64
+                break
+        indices[i], indices[j] = indices[j], indices[i]
+    return indices
+
+
+def stable_sample(
+    n: int, k: int, seed: int, version: int = SHUFFLE_VERSION
+) -> List[int]:
+    """
+    根据种子从0..n-1中无放回地抽取k个下标，结果等于stable_permutation(n, seed, version)的前k个
+    版本2从前向后执行Fisher-Yates，只记录被交换过的位置，耗时与内存只与k有关；
+    版本1从后向前洗牌，只能先生成完整排列；
+    版本3为每个位置计算随机键，可使用NumPy向量化计算，耗时与n有关
+    """
+    k = min(k, n)
+    if version == 1:
+        return stable_permutation(n, seed, version)[:k]
+    if version == 3:
+        if np is not None and n >= NUMPY_GROUPING_THRESHOLD:
+            return _key_sample_numpy(n, k, seed)
+        return _key_sample_python(n, k, seed)
+    if version != 2:
+        raise ValueError(f"Unsupported shuffle version: {version}")
+    state = seed & _MASK64
+    # 稀疏表示的下标数组：未出现的位置i上的值为i
+    swapped: Dict[int, int] = {}
+    result = []
+    for i in range(k):
+        bound = n - i
+        while True:
+            # SplitMix64
+            state = (state + 0x9E3779B97F4A7C15) & _MASK64
+            z = state
+            z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+            z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+            z ^= z >> 31
+            # Lemire：取乘积高64位作为结果，低64位落入偏差区间时重新生成
+            m = z * bound
+            if (m & _MASK64) >= (1 << 64) % bound:
+                j = i + (m >> 64)
+                break
+        result.append(swapped.get(j, j))
+        # 位置i已确定，将其原值换到位置j
+        swapped[j] = swapped.pop(i, i)
+    return result
+
+
+def _key_sample_python(n: int, k: int, seed: int) -> List[int]:
+    """
+    版本3的纯Python实现：位置i的随机键为SplitMix64第i+1次输出，
+    按随机键升序取前k个位置（SplitMix64的输出互不相同，不存在相同的键）
+    """
+    state = seed & _MASK64
+    keys = []
+    for _ in range(n):
+        state = (state + _GAMMA64) & _MASK64
+        z = state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+        keys.append(z ^ (z >> 31))
+    if k < n:
+        return heapq.nsmallest(k, range(n), key=keys.__getitem__)
+    return sorted(range(n), key=keys.__getitem__)
+
+
+def _key_sample_numpy(n: int, k: int, seed: int) -> List[int]:
+    """版本3的NumPy实现，结果与_key_sample_python完全一致（uint64运算按2^64取模）"""
+    if k <= 0:
+        return []
+    z = np.arange(1, n + 1, dtype=np.uint64) * np.uint64(_GAMMA64)
+    z += np.uint64(seed & _MASK64)
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(0xBF58476D1CE4E5B9)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    if k < n:
+        # 只对最小的k个随机键排序
+        selected = np.argpartition(z, k - 1)[:k]
+        return selected[np.argsort(z[selected])].tolist()
+    return np.argsort(z).tolist()
+
+
+def choose_shuffle_version(n: int, k: int) -> int:
+    """
+    为新的按种子分组选择打乱算法版本，分组结果记录所选版本，重新计算时使用相同版本
+    版本3的耗时与n有关，安装了NumPy且需要抽取较多元素时最快；
+    只抽取少量元素或未安装NumPy时版本2更快（耗时只与k有关）
+    """
+    if np is not None and n >= NUMPY_GROUPING_THRESHOLD and k * 32 >= n:
+        return 3
+    return 2
+
+
+def reservoir_sample(
+    iterable: Iterable, k: int, rng: Optional[random.Random] = None
+) -> list:
+    """
+    从长度未知的可迭代对象中等概率无放回地抽取k个元素（Li的Algorithm L），
+    只保存k个元素，并按几何分布跳过不会被选中的元素
+    返回结果的顺序是随机的
+    """
+    if k <= 0:
+        return []
+    rng = rng or random
+    iterator = iter(iterable)
+    reservoir = list(itertools.islice(iterator, k))
+    if len(reservoir) < k:
+        rng.shuffle(reservoir)
+        return reservoir
+    w = math.exp(math.log(rng.random()) / k)
+    while True:
+        # 跳过的元素数量服从几何分布
+        skip = int(math.log(rng.random()) / math.log(1 - w))
+        try:
+            item = next(itertools.islice(iterator, skip, None))
+        except StopIteration:
+            break
+        reservoir[rng.randrange(k)] = item
+        w *= math.exp(math.log(rng.random()) / k)
+    rng.shuffle(reservoir)
+    return reservoir
+
 
 class Element:
-    def __init__(self, value: str):
-        if not isinstance(value, str):
-            raise ValueError("The value must be a string")
-        self.value = value
+    """
+    分组元素
+    相同值的Element通过驻留表共享同一个对象，按值比较相等并可哈希
+    """
+
+    __slots__ = ("value",)
+
+    # 驻留表：值 -> Element，超过上限后清空（只影响对象复用，不影响相等性）
+    _interned: Dict[str, "Element"] = {}
+    _INTERN_MAX_SIZE = 1 << 17
+
+    def __new__(cls, value: str):
+        element = cls._interned.get(value) if isinstance(value, str) else None
+        if element is None:
+            if not isinstance(value, str):
+                raise ValueError("The value must be a string")
+            element = object.__new__(cls)
+            element.value = value
+            if len(cls._interned) >= cls._INTERN_MAX_SIZE:
+                cls._interned.clear()
+            element = cls._interned.setdefault(value, element)
+        return element
 
     def __repr__(self):
         return f"Element({self.value})"
 
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if isinstance(other, Element):
+            return self.value == other.value
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __reduce__(self):
+        return (self.__class__, (self.value,))
+
+    @classmethod
+    def from_strs(cls, values: Iterable[str]) -> List["Element"]:
+        """
+        批量将字符串转换为Element列表
+        :param values: 字符串序列
+        :return: Element列表
+        """
+        interned = cls._interned
+        get = interned.get
+        new = object.__new__
+        result = []
+        append = result.append
+        try:
+            for value in values:
+                element = get(value)
+                if element is None:
+                    if not isinstance(value, str):
+                        raise ValueError("The value must be a string")
+                    element = new(cls)
+                    element.value = value
+                    interned[value] = element
+                append(element)
+        except TypeError:
+            raise ValueError("The value must be a string")
+        if len(interned) > cls._INTERN_MAX_SIZE:
+            interned.clear()
+        return result
+
     @classmethod
     def to_str(cls, elements) -> Union[List[str], str]:
         """
         将Element对象或Element列表转换为字符串或字符串列表
+        使用显式栈代替递归遍历嵌套列表，字符串直接复用Element中的值
         :param elements: 可以是单个Element对象或Element列表
         :return: 对应的字符串或字符串列表
         """
         if isinstance(elements, Element):
             return elements.value
-        elif isinstance(elements, list):
-            result = []
-            for element in elements:
+        if not isinstance(elements, list):
+            raise ValueError("Input must be an Element or a list of Elements")
+        result = []
+        # 栈中保存(源列表, 结果列表)
+        stack = [(elements, result)]
+        while stack:
+            source, target = stack.pop()
+            append = target.append
+            for element in source:
                 if isinstance(element, Element):
-                    result.append(element.value)
+                    append(element.value)
                 elif isinstance(element, list):
-                    result.append(cls.to_str(element))
+                    sub_result = []
+                    append(sub_result)
+                    stack.append((element, sub_result))
                 else:
                     raise ValueError("Invalid element type")
-            return result
-        else:
-            raise ValueError("Input must be an Element or a list of Elements")
+        return result
+
+
+class PoolBuilder:
+    """
+    元素池构建器：将多个字符串序列合并为一个元素池，只遍历一次
+    - 每个字符串先进行NFKC规范化并去除首尾空白，结果为空的字符串被丢弃
+    - 按哈希去重并保留首次出现的顺序，casefold为True时忽略大小写差异
+      （保留首次出现的写法）
+    - dedupe为False时不做规范化与去重，按原样合并
+    全程只处理字符串，最后再由调用方为元素池创建Element
+    """
+
+    def __init__(self, dedupe: bool = True, casefold: bool = False):
+        self.dedupe = dedupe
+        self.casefold = casefold
+        self.pool: List[str] = []
+        # 因为为空或重复而被丢弃的数量
+        self.dropped = 0
+        self._seen = set()
+
+    def add(self, values: Iterable[str]) -> int:
+        """加入一批字符串，返回实际加入元素池的数量"""
+        pool = self.pool
+        before = len(pool)
+        if not self.dedupe:
+            pool.extend(values)
+            return len(pool) - before
+        seen = self._seen
+        casefold = self.casefold
+        is_normalized = unicodedata.is_normalized
+        normalize = unicodedata.normalize
+        dropped = 0
+        for value in values:
+            if not is_normalized("NFKC", value):
+                value = normalize("NFKC", value)
+            value = value.strip()
+            key = value.casefold() if casefold else value
+            if not value or key in seen:
+                dropped += 1
+                continue
+            seen.add(key)
+            pool.append(value)
+        self.dropped += dropped
+        return len(pool) - before
 
 
 class Group:
@@ -57,6 +347,9 @@ class Group:
         group_num: int = 2,
         group_size: int = None,
         randomize: bool = True,
+        engine: str = "auto",
+        seed: Optional[int] = None,
+        shuffle_version: int = SHUFFLE_VERSION,
     ):
         """
         分组方法
@@ -64,27 +357,85 @@ class Group:
         :param group_num: 分组数量，默认2组
         :param group_size: 每组元素数量，仅在按量分组模式下有效
         :param randomize: 是否随机分组，默认为True
+        :param engine: 打乱算法，可选"python"、"numpy"或"auto"(元素数量超过
+            NUMPY_GROUPING_THRESHOLD且已安装NumPy时使用"numpy")
+        :param seed: 随机种子，指定时使用stable_sample，相同种子与元素池的
+            分组结果在任何版本中都完全一致（此时忽略engine，
+            版本3在安装了NumPy时自动向量化计算）
+        :param shuffle_version: 指定种子时使用的打乱算法版本
         :return: 分组结果列表
         """
         if not self.pool:
             return []
 
+        bounds = self._group_bounds(len(self.pool), mode, group_num, group_size)
+        # 按量分组只需要前count个位置的元素
+        count = bounds[-1][1] if bounds else 0
+        if randomize and seed is not None:
+            pool = self.pool
+            order = stable_sample(len(pool), count, seed, shuffle_version)
+            return [[pool[i] for i in order[start:end]] for start, end in bounds]
+        if randomize and self._use_numpy(engine):
+            shuffled = self._numpy_shuffle(count)
+            return [shuffled[start:end] for start, end in bounds]
+        if randomize and count < len(self.pool):
+            # 无放回抽样，耗时只与抽取数量有关，无需复制并打乱整个元素池
+            sampled = random.sample(self.pool, count)
+            return [sampled[start:end] for start, end in bounds]
+
         # 新增：如果需要随机分组，先打乱元素顺序
         working_pool = self.pool.copy()
         if randomize:
             random.shuffle(working_pool)
+        return [working_pool[start:end] for start, end in bounds]
 
+    def iter_groups(
+        self,
+        mode: str = "equal",
+        group_num: int = 2,
+        group_size: int = None,
+        randomize: bool = True,
+        seed: Optional[int] = None,
+        shuffle_version: int = SHUFFLE_VERSION,
+    ) -> Iterator[List[Element]]:
+        """
+        逐组生成分组结果，参数含义同group_elements
+        只保存打乱后的下标，每次生成一组，不会同时构造所有分组，适合流式输出
+        指定种子时结果与group_elements完全一致；分组参数在调用时立即校验
+        """
+        if not self.pool:
+            return iter(())
+        bounds = self._group_bounds(len(self.pool), mode, group_num, group_size)
+        count = bounds[-1][1] if bounds else 0
+        if randomize and seed is not None:
+            order = stable_sample(len(self.pool), count, seed, shuffle_version)
+        elif randomize:
+            order = random.sample(range(len(self.pool)), count)
+        else:
+            order = range(len(self.pool))
+        return self._iter_bounds(self.pool, order, bounds)
+
+    @staticmethod
+    def _iter_bounds(pool, order, bounds) -> Iterator[List[Element]]:
+        for start, end in bounds:
+            yield [pool[i] for i in order[start:end]]
+
+    @staticmethod
+    def _group_bounds(
+        pool_size: int, mode: str, group_num: int, group_size: Optional[int]
+    ) -> List[Tuple[int, int]]:
+        """计算每组在打乱后元素池中的起止位置"""
         if mode == "equal":
             # 均等分组
-            per_group = len(working_pool) // group_num
-            remainder = len(working_pool) % group_num
-            groups = []
+            per_group = pool_size // group_num
+            remainder = pool_size % group_num
+            bounds = []
             start = 0
             for i in range(group_num):
                 end = start + per_group + (1 if i < remainder else 0)
-                groups.append(working_pool[start:end])
+                bounds.append((start, end))
                 start = end
-            return groups
+            return bounds
 
         elif mode == "size" and group_size:
             # 按量分组
@@ -92,18 +443,44 @@ class Group:
                 raise ValueError(
                     "The number of elements per group must be greater than 0"
                 )
-            groups = []
-            for i in range(0, len(working_pool), group_size):
-                if len(groups) >= group_num:  # 达到指定组数后停止
+            bounds = []
+            for i in range(0, pool_size, group_size):
+                if len(bounds) >= group_num:  # 达到指定组数后停止
                     break
-                groups.append(working_pool[i : i + group_size])
-            return groups
+                bounds.append((i, min(i + group_size, pool_size)))
+            return bounds
 
         else:
             raise ValueError(
                 "Invalid grouping mode or parameter, grouping mode must be 'equal' or 'size'"
             )
 
+    def _use_numpy(self, engine: str) -> bool:
+        if engine == "python":
+            return False
+        if engine == "numpy":
+            if np is None:
+                raise RuntimeError("NumPy is required for the numpy grouping engine")
+            return True
+        if engine == "auto":
+            return np is not None and len(self.pool) >= NUMPY_GROUPING_THRESHOLD
+        raise ValueError("Invalid grouping engine, must be 'auto', 'python' or 'numpy'")
+
+    def _numpy_shuffle(self, count: int) -> List[Element]:
+        """
+        使用NumPy随机排列下标，只取前count个位置，最后一次性生成Element列表
+        只需要部分元素时无放回抽取count个下标，不排列整个元素池
+        随机数种子取自random模块，random.seed同样可以固定结果
+        """
+        rng = np.random.default_rng(random.getrandbits(64))
+        if count < len(self.pool):
+            pool = self.pool
+            return [pool[i] for i in rng.choice(len(pool), count, replace=False)]
+        indices = rng.permutation(len(self.pool))
+        pool = np.empty(len(self.pool), dtype=object)
+        pool[:] = self.pool
+        return pool[indices].tolist()
+
 
 class HotElementsCache:
     def __init__(self, max_size: int = 10):
@@ -143,3 +520,106 @@ class HotElementsCache:
     def clear(self):
         """清空缓存"""
         self.cache.clear()
+
+
+class HotElementsSketch:
+    """
+    按时间衰减频率排序的热点元素统计（Space-Saving）
+    - 只保留有限数量的计数器，内存占用与更新总量无关
+    - 计数按指数衰减，half_life秒前的一次出现只相当于现在的半次
+    - 每次更新为常数级的字典操作；计数器数量达到2倍容量时批量裁剪到容量，
+      被裁剪计数的最大值作为后续新元素的计数下限，保证估计值不会偏低
+    - 线程安全
+    """
+
+    # 前向衰减的权重超过该值时重新选取基准时间，避免浮点溢出
+    _RESCALE_THRESHOLD = 2.0**64
+
+    def __init__(
+        self,
+        capacity: int = 1000,
+        half_life: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """初始化热点元素统计
+        :param capacity: 保留的计数器数量
+        :param half_life: 衰减半衰期（秒）
+        :param clock: 时钟函数，便于测试
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be greater than 0")
+        if half_life <= 0:
+            raise ValueError("half_life must be greater than 0")
+        self.capacity = capacity
+        self.half_life = half_life
+        self._clock = clock
+        self._landmark = clock()
+        self._floor = 0.0
+        self._counters: Dict[Element, float] = {}
+        self._lock = threading.Lock()
+
+    def _weight(self) -> float:
+        """当前时刻一次出现的权重（前向衰减：越新的出现权重越大）"""
+        weight = 2.0 ** ((self._clock() - self._landmark) / self.half_life)
+        if weight > self._RESCALE_THRESHOLD:
+            for element in self._counters:
+                self._counters[element] /= weight
+            self._floor /= weight
+            self._landmark = self._clock()
+            weight = 1.0
+        return weight
+
+    def _prune(self):
+        """裁剪到capacity个计数器"""
+        ranked = sorted(self._counters.items(), key=lambda item: item[1], reverse=True)
+        self._floor = max(self._floor, ranked[self.capacity][1])
+        self._counters = dict(ranked[: self.capacity])
+
+    def add_element(self, element: Element, count: int = 1):
+        """记录元素出现count次"""
+        self.add_elements((element,), count)
+
+    def add_elements(self, elements: Iterable[Element], count: int = 1):
+        """批量记录元素出现，每个元素count次"""
+        with self._lock:
+            weight = self._weight() * count
+            counters = self._counters
+            for element in elements:
+                if not isinstance(element, Element):
+                    raise TypeError("Only Element objects can be added")
+                score = counters.get(element)
+                if score is None:
+                    if len(counters) >= 2 * self.capacity:
+                        self._prune()
+                        counters = self._counters
+                    score = self._floor
+                counters[element] = score + weight
+
+    def replace_scores(self, scores: Iterable[Tuple[Element, float]]):
+        """用给定的当前衰减计数替换全部统计，用于从外部汇总结果恢复"""
+        with self._lock:
+            self._landmark = self._clock()
+            self._floor = 0.0
+            self._counters = {}
+            for element, score in scores:
+                self._counters[element] = self._counters.get(element, 0.0) + score
+            if len(self._counters) > 2 * self.capacity:
+                self._prune()
+
+    def get_hot_scores(self, k: int = 10) -> List[Tuple[Element, float]]:
+        """获取衰减频率最高的k个元素及其当前衰减计数"""
+        with self._lock:
+            weight = self._weight()
+            ranked = heapq.nlargest(k, self._counters.items(), key=lambda item: item[1])
+        return [(element, score / weight) for element, score in ranked]
+
+    def get_hot_elements(self, k: int = 10) -> List[Element]:
+        """获取衰减频率最高的k个元素"""
+        return [element for element, _ in self.get_hot_scores(k)]
+
+    def clear(self):
+        """清空统计"""
+        with self._lock:
+            self._counters = {}
+            self._floor = 0.0
+            self._landmark = self._clock()
@@ -0,0 +1,111 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+from loguru import logger
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from models import GroupResult
+
+
+class GroupCommitQueue:
+    """
+    分组结果写入队列（write-behind）
+    - submit() 将待写入的行放入队列，返回的Future在写入后得到分配的ID
+    - 后台线程每次取出队列中已有的行（最多max_batch行，最多额外等待max_delay秒凑批），
+      在同一个事务中写入，多个并发请求共用一次提交
+    - 整批写入失败时逐行重试，只有写入失败的行对应的Future得到异常
+    - 后台线程未运行时submit()直接同步写入
+    """
+
+    def __init__(self, engine: Engine, max_batch: int = 64, max_delay: float = 0.0):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: "queue.Queue[Optional[Tuple[GroupResult, Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # 已提交的事务数与写入的行数，用于观察合并效果
+        self.commits = 0
+        self.rows = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, row: GroupResult) -> Future:
+        """提交一行待写入的分组结果"""
+        future = Future()
+        with self._lock:
+            if self.running:
+                self._queue.put((row, future))
+                return future
+        self._write([(row, future)])
+        return future
+
+    def insert(self, row: GroupResult, timeout: Optional[float] = None) -> int:
+        """写入一行分组结果并等待完成，返回分配的ID"""
+        return self.submit(row).result(timeout)
+
+    def _write(self, batch: List[Tuple[GroupResult, Future]]):
+        original_ids = [row.id for row, _ in batch]
+        try:
+            with Session(self.engine, expire_on_commit=False) as session:
+                session.add_all([row for row, _ in batch])
+                session.commit()
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            logger.warning(
+                f"Group commit of {len(batch)} rows failed, retrying one by one: {e}"
+            )
+            for (row, future), original_id in zip(batch, original_ids):
+                # 回滚后恢复flush前的ID，重新写入
+                row.id = original_id
+                self._write([(row, future)])
+            return
+        self.commits += 1
+        self.rows += len(batch)
+        for row, future in batch:
+            future.set_result(row.id)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(
+                        timeout=max(0.0, deadline - time.monotonic())
+                    )
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="group-commit-writer", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """停止后台线程，队列中已提交的行会先全部写入"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._queue.put(None)
+        thread.join(timeout)
@@ -0,0 +1,197 @@
+import asyncio
+import multiprocessing
+import os
+import random
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from loguru import logger
+from element_group import SHUFFLE_VERSION, Element, Group, stable_sample
+
+# 元素数量达到该值的分组任务交给进程池执行（见benchmarks/bench_offload.py）
+GROUPING_PROCESS_THRESHOLD = int(os.getenv("GROUPING_PROCESS_THRESHOLD", "100000"))
+# 进程池大小，默认保留一个CPU给当前进程；为0时所有分组都在当前进程中执行
+GROUPING_PROCESS_WORKERS = int(
+    os.getenv("GROUPING_PROCESS_WORKERS", str(max((os.cpu_count() or 1) - 1, 0)))
+)
+# 同时在进程池中执行的最大任务数，超出的任务排队等待
+GROUPING_MAX_CONCURRENCY = int(
+    os.getenv("GROUPING_MAX_CONCURRENCY", str(max(GROUPING_PROCESS_WORKERS, 1)))
+)
+
+
+def _permute(n: int, count: int, seed: Optional[int], shuffle_version: int) -> bytes:
+    """
+    在工作进程中从0..n-1中随机抽取count个下标，以uint32数组的字节形式返回
+    指定种子时与Group.group_elements使用相同的stable_sample，结果完全一致
+    """
+    if seed is not None:
+        indices = stable_sample(n, count, seed, shuffle_version)
+    else:
+        indices = random.sample(range(n), count)
+    return array("I", indices).tobytes()
+
+
+class GroupingScheduler:
+    """
+    按元素数量调度分组任务
+    - 元素数量小于process_threshold时在线程池中直接执行
+    - 大任务只将元素数量与种子交给进程池生成下标排列（元素池本身无需序列化），
+      当前进程按下标取出元素，打乱期间不占用当前进程的GIL
+    - 最多max_concurrency个任务同时在进程池中执行，其余任务在事件循环中排队等待，
+      排队与等待进程池期间不占用线程池中的线程
+    - 进程池异常退出时重建进程池，并在当前进程中完成该任务
+    """
+
+    def __init__(
+        self,
+        process_threshold: int = GROUPING_PROCESS_THRESHOLD,
+        max_workers: int = GROUPING_PROCESS_WORKERS,
+        max_concurrency: int = GROUPING_MAX_CONCURRENCY,
+    ):
+        self.process_threshold = process_threshold
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # 在首次使用时为当前事件循环创建
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.inline_total = 0
+        self.offloaded_total = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # 使用spawn启动工作进程，避免fork复制当前进程中的线程与锁
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._slots_loop = loop
+        return self._slots
+
+    def _group_inline(
+        self,
+        elements: List[Element],
+        mode: str,
+        group_num: int,
+        group_size: Optional[int],
+        seed: Optional[int],
+        shuffle_version: int = SHUFFLE_VERSION,
+    ) -> List[List[str]]:
+        result = Group(pool=elements).group_elements(
+            mode=mode,
+            group_num=group_num,
+            group_size=group_size,
+            seed=seed,
+            shuffle_version=shuffle_version,
+        )
+        return Element.to_str(result)
+
+    @staticmethod
+    def _take(
+        elements: List[Element], packed: bytes, bounds: List[Tuple[int, int]]
+    ) -> List[List[str]]:
+        """按进程池生成的下标排列取出每组元素"""
+        indices = array("I")
+        indices.frombytes(packed)
+        return [
+            [elements[i].value for i in indices[start:end]] for start, end in bounds
+        ]
+
+    async def group_elements(
+        self,
+        elements: List[Element],
+        mode: str = "equal",
+        group_num: int = 2,
+        group_size: Optional[int] = None,
+        seed: Optional[int] = None,
+        shuffle_version: int = SHUFFLE_VERSION,
+    ) -> List[List[str]]:
+        """随机分组并返回字符串形式的分组结果，参数含义同Group.group_elements"""
+        if self.max_workers <= 0 or len(elements) < self.process_threshold:
+            with self._lock:
+                self.inline_total += 1
+            return await run_in_threadpool(
+                self._group_inline,
+                elements,
+                mode,
+                group_num,
+                group_size,
+                seed,
+                shuffle_version,
+            )
+
+        # 先在当前进程中校验分组参数
+        bounds = Group._group_bounds(len(elements), mode, group_num, group_size)
+        count = bounds[-1][1] if bounds else 0
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        slots = self._get_slots()
+        try:
+            await slots.acquire()
+        finally:
+            with self._lock:
+                self.queued -= 1
+        with self._lock:
+            self.running += 1
+        try:
+            executor = self._get_executor()
+            packed = await asyncio.get_running_loop().run_in_executor(
+                executor, _permute, len(elements), count, seed, shuffle_version
+            )
+        except BrokenProcessPool as e:
+            logger.error(f"Grouping process pool broken, grouping inline: {e}")
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False)
+            return await run_in_threadpool(
+                self._group_inline,
+                elements,
+                mode,
+                group_num,
+                group_size,
+                seed,
+                shuffle_version,
+            )
+        finally:
+            slots.release()
+            with self._lock:
+                self.running -= 1
+                self.offloaded_total += 1
+        return await run_in_threadpool(self._take, elements, packed, bounds)
+
+    def status(self) -> dict:
+        """当前排队与执行中的任务数，以及累计的任务数"""
+        with self._lock:
+            return {
+                "queued": self.queued,
+                "running": self.running,
+                "max_queued": self.max_queued,
+                "inline_total": self.inline_total,
+                "offloaded_total": self.offloaded_total,
+                "process_threshold": self.process_threshold,
+                "max_workers": self.max_workers,
+                "max_concurrency": self.max_concurrency,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
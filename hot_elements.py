@@ -0,0 +1,135 @@
+import threading
+import time
+from typing import Dict, Iterable, Optional
+from loguru import logger
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, delete, select
+from element_group import Element, HotElementsSketch
+from models import HotElementStat
+
+# 衰减计数低于该值的统计行会被清理
+HOT_ELEMENT_PRUNE_SCORE = 0.01
+# 单条INSERT语句写入的最大行数，避免超过SQLite的参数数量限制
+FLUSH_BATCH_SIZE = 300
+
+
+class HotElementsRecorder:
+    """
+    热点元素统计的持久化与多进程汇总
+    - record() 只更新内存中的统计与写缓冲区，不进行任何IO
+    - 后台线程每隔flush_interval秒将缓冲区批量合并进hot_element_stats表，
+      再读取所有进程汇总后的前capacity个元素刷新本地统计
+    - 启动时从表中恢复统计，关闭时写入剩余缓冲
+    """
+
+    def __init__(
+        self, sketch: HotElementsSketch, engine: Engine, flush_interval: float = 5.0
+    ):
+        self.sketch = sketch
+        self.engine = engine
+        self.flush_interval = flush_interval
+        self._buffer: Dict[Element, int] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def record(self, elements: Iterable[Element]):
+        """记录一批元素各出现一次"""
+        elements = list(elements)
+        with self._lock:
+            self.sketch.add_elements(elements)
+            buffer = self._buffer
+            for element in elements:
+                buffer[element] = buffer.get(element, 0) + 1
+
+    def _decayed_score(self, now: float):
+        return HotElementStat.score * func.decay_factor(
+            now - HotElementStat.updated_at, self.sketch.half_life
+        )
+
+    def load(self):
+        """从数据库读取所有进程汇总后的统计，替换本地统计（保留尚未写入的缓冲）"""
+        now = time.time()
+        score = self._decayed_score(now).label("decayed")
+        statement = (
+            select(HotElementStat.value, score)
+            .order_by(score.desc())
+            .limit(self.sketch.capacity)
+        )
+        with Session(self.engine) as session:
+            rows = session.exec(statement).all()
+        with self._lock:
+            pending = [
+                (element, float(count)) for element, count in self._buffer.items()
+            ]
+            self.sketch.replace_scores(
+                [(Element(value), decayed) for value, decayed in rows] + pending
+            )
+
+    def flush(self):
+        """将缓冲区合并进数据库，并清理衰减到可以忽略的统计"""
+        with self._lock:
+            buffer, self._buffer = self._buffer, {}
+        if not buffer:
+            return
+        now = time.time()
+        table = HotElementStat.__table__
+        rows = [
+            {"value": element.value, "score": float(count), "updated_at": now}
+            for element, count in buffer.items()
+        ]
+        try:
+            with Session(self.engine) as session:
+                for i in range(0, len(rows), FLUSH_BATCH_SIZE):
+                    statement = insert(table).values(rows[i : i + FLUSH_BATCH_SIZE])
+                    statement = statement.on_conflict_do_update(
+                        index_elements=[table.c.value],
+                        set_={
+                            "score": self._decayed_score(now)
+                            + statement.excluded.score,
+                            "updated_at": now,
+                        },
+                    )
+                    session.exec(statement)
+                session.exec(
+                    delete(HotElementStat).where(
+                        self._decayed_score(now) < HOT_ELEMENT_PRUNE_SCORE
+                    )
+                )
+                session.commit()
+        except Exception:
+            # 写入失败时放回缓冲区，下次重试
+            with self._lock:
+                for element, count in buffer.items():
+                    self._buffer[element] = self._buffer.get(element, 0) + count
+            raise
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                self.load()
+            except Exception as e:
+                logger.error(f"Flush hot elements failed: {e}")
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="hot-elements-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """停止后台线程并写入剩余缓冲"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Flush hot elements failed: {e}")
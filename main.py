@@ -1,21 +1,152 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager, contextmanager
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import json
+import random
+import sys
+import time
+from fastapi import FastAPI, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 from models import *
 from sqlmodel import Session, select
 from element_group import *
+from attribute_index import (
+    AttributeFilterError,
+    parse_source_expression,
+    select_elements,
+)
+from compact_storage import encode_groups
+from pool_templates import (
+    POOL_TEMPLATE_MAX_ELEMENTS,
+    PoolTemplateNotFoundError,
+    PoolTemplateStore,
+    template_elements_of,
+)
+from group_commit import GroupCommitQueue
+from grouping_executor import GroupingScheduler
+from hot_elements import HotElementsRecorder
+from response_cache import (
+    CachedResult,
+    LatestGroupsCache,
+    ResultCache,
+    check_password,
+)
+from search import init_search_index, search_groups_by_member, search_groups_by_name
 from datasources import (
     get_all_sources,
-    get_source_by_display_name,
-    get_elements_from_source,
+    get_circuit_breaker_states,
+    get_elements_by_source_async,
+    load_source_snapshots,
+    version_refresher,
 )
 import os
 
 DEBUG = os.getenv("DEBUG", "False")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG" if DEBUG.lower() == "true" else "INFO")
+
+# 热点元素统计的计数器数量、衰减半衰期（秒）与写入数据库的周期（秒）
+HOT_ELEMENTS_CAPACITY = int(os.getenv("HOT_ELEMENTS_CAPACITY", "1000"))
+HOT_ELEMENTS_HALF_LIFE = float(os.getenv("HOT_ELEMENTS_HALF_LIFE", "3600"))
+HOT_ELEMENTS_FLUSH_INTERVAL = float(os.getenv("HOT_ELEMENTS_FLUSH_INTERVAL", "5"))
+
+hot_element_cache = HotElementsSketch(
+    capacity=HOT_ELEMENTS_CAPACITY, half_life=HOT_ELEMENTS_HALF_LIFE
+)
+# 多个工作进程通过数据库汇总热点元素统计
+hot_element_recorder = HotElementsRecorder(
+    hot_element_cache, engine, flush_interval=HOT_ELEMENTS_FLUSH_INTERVAL
+)
+
+# 首页最新分组缓存的有效期（秒），用于感知其他工作进程创建的分组
+LATEST_GROUPS_CACHE_TTL = float(os.getenv("LATEST_GROUPS_CACHE_TTL", "5"))
+latest_groups_cache = LatestGroupsCache(size=100, ttl=LATEST_GROUPS_CACHE_TTL)
+
+# 分组结果读取缓存的容量
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "1024"))
+result_cache = ResultCache(max_size=RESULT_CACHE_SIZE)
+
+# 分组结果保存方式：full(保存完整结果)、seed(只保存种子，读取时重新计算)、
+# compact(紧凑二进制格式)、auto(元素数量达到SEED_STORAGE_THRESHOLD时按种子保存)
+GROUP_STORAGE_MODE = os.getenv("GROUP_STORAGE_MODE", "auto")
+SEED_STORAGE_THRESHOLD = int(os.getenv("SEED_STORAGE_THRESHOLD", "1000"))
+# compact格式使用的压缩方式：zlib、zstd(需安装zstandard)或none
+GROUP_RESULT_COMPRESSION = os.getenv("GROUP_RESULT_COMPRESSION", "zlib")
+
+# 单次批量创建的最大分组数量
+GROUP_BATCH_MAX_SIZE = int(os.getenv("GROUP_BATCH_MAX_SIZE", "100"))
+
+# 是否将并发创建的分组合并提交，以及每次合并的最大行数与凑批的最长等待时间（秒）
+GROUP_COMMIT = os.getenv("GROUP_COMMIT", "False").lower() == "true"
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "64"))
+GROUP_COMMIT_MAX_DELAY = float(os.getenv("GROUP_COMMIT_MAX_DELAY", "0.002"))
+group_commit_queue = GroupCommitQueue(
+    engine, max_batch=GROUP_COMMIT_MAX_BATCH, max_delay=GROUP_COMMIT_MAX_DELAY
+)
+
+# 流式返回分组结果时每次发送的最小字节数
+STREAM_CHUNK_SIZE = 64 * 1024
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# 元素池模板（按内容哈希寻址）
+pool_template_store = PoolTemplateStore(engine)
+
+# 按元素数量将大分组任务交给进程池执行
+grouping_scheduler = GroupingScheduler()
+
+# 启动各阶段耗时（秒）
+startup_report = {}
+
 
-hot_element_cache = HotElementsCache(max_size=10)
+@contextmanager
+def startup_stage(name: str):
+    """记录一个启动阶段的耗时"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_report[name] = time.perf_counter() - start
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup_report.clear()
+    with startup_stage("configure_logging"):
+        logger.remove()
+        logger.add(sys.stderr, level=LOG_LEVEL)
+    with startup_stage("init_db"):
+        init_db()
+    with startup_stage("init_search_index"):
+        init_search_index(engine)
+    with startup_stage("load_hot_elements"):
+        hot_element_recorder.load()
+        hot_element_recorder.start()
+    with startup_stage("load_snapshots"):
+        # 从本地快照预热数据源缓存，冷启动时无需先请求上游
+        load_source_snapshots()
+    with startup_stage("start_version_refresher"):
+        # 数据源版本在后台解析并定期刷新
+        version_refresher.start()
+    if GROUP_COMMIT:
+        with startup_stage("start_group_commit"):
+            group_commit_queue.start()
+    logger.info(
+        "Startup finished: "
+        + ", ".join(
+            f"{name}={cost * 1000:.1f}ms" for name, cost in startup_report.items()
+        )
+    )
+    yield
+    group_commit_queue.stop()
+    grouping_scheduler.shutdown()
+    version_refresher.stop(timeout=1)
+    hot_element_recorder.stop(timeout=1)
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 # 添加CORS中间件
 app.add_middleware(
@@ -27,31 +158,66 @@ app.add_middleware(
 )
 
 
+def as_stored_datetime(value: datetime) -> datetime:
+    """转换为数据库中保存的格式（UTC，不带时区），使缓存与查询得到的时间格式一致"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def to_brief_response(group) -> BriefGroupResultResponse:
+    return BriefGroupResultResponse(
+        id=group.id,
+        group_name=group.group_name,
+        is_public=group.is_public,
+        created_at=as_stored_datetime(group.created_at),
+    )
+
+
+def query_latest_groups(
+    before_id: Optional[int], limit: int
+) -> List[BriefGroupResultResponse]:
+    with Session(engine) as session:
+        # 首页一次性查询整个缓存容量，后续请求直接命中缓存
+        page_size = max(limit, latest_groups_cache.size) if before_id is None else limit
+        version = latest_groups_cache.version
+        statement = select(
+            GroupResult.id,
+            GroupResult.group_name,
+            GroupResult.is_public,
+            GroupResult.created_at,
+        )
+        if before_id is not None:
+            statement = statement.where(GroupResult.id < before_id)
+        statement = statement.order_by(GroupResult.id.desc()).limit(page_size)
+        data = [to_brief_response(group) for group in session.exec(statement)]
+    if before_id is None:
+        latest_groups_cache.set(data, version)
+    return data[:limit]
+
+
 @app.get("/latest_groups", response_model=GeneralResponse)
-def get_latest_groups():
+async def get_latest_groups(
+    before_id: Optional[int] = None, limit: int = Query(default=10, ge=1, le=100)
+):
     """
-    获取最新的 10 个分组信息，用于首页展示
+    获取最新的分组信息，用于首页展示
+    分页时将上一页返回的 next_before_id 作为 before_id 传入
+    首页（不指定 before_id）直接从内存缓存返回，不占用线程池
     """
     try:
-        with Session(engine) as session:
-            statement = select(GroupResult).order_by(GroupResult.id.desc()).limit(10)
-            groups = session.exec(statement).all()
-            data = []
-            for group in groups:
-                data.append(
-                    BriefGroupResultResponse(
-                        id=group.id,
-                        group_name=group.group_name,
-                        is_public=group.is_public,
-                        created_at=group.created_at,
-                    )
-                )
-            return GeneralResponse(
-                success=True,
-                message="Latest groups fetched successfully",
-                message_zh_CN="成功获取最新分组",
-                data=GetLatestGroupsResponse(groups=data),
-            )
+        data = latest_groups_cache.get(limit) if before_id is None else None
+        if data is None:
+            data = await run_in_threadpool(query_latest_groups, before_id, limit)
+        return GeneralResponse(
+            success=True,
+            message="Latest groups fetched successfully",
+            message_zh_CN="成功获取最新分组",
+            data=GetLatestGroupsResponse(
+                groups=data,
+                next_before_id=data[-1].id if len(data) == limit else None,
+            ),
+        )
     except Exception as e:
         logger.error(f"Error fetching latest groups: {e}")
         return GeneralResponse(
@@ -62,112 +228,643 @@ def get_latest_groups():
         )
 
 
+def validate_create_request(group: CreateGroupRequest) -> Optional[GeneralResponse]:
+    """校验创建分组请求，不合法时返回失败响应"""
+    # 校验分组名称长度
+    if len(group.group_name) > 20:
+        return GeneralResponse(
+            success=False,
+            message="Group name exceeds 20 characters limit",
+            message_zh_CN="分组名称超过20字限制",
+            data=None,
+        )
+
+    # 验证数据源表达式是否合法、数据源是否存在
+    if group.data_source:
+        all_sources = get_all_sources()
+        for source in group.data_source:
+            try:
+                source_name = parse_source_expression(source).name
+            except AttributeFilterError as e:
+                return filter_error_response(e)
+            if source_name not in all_sources:
+                return GeneralResponse(
+                    success=False,
+                    message=f"Data source '{source_name}' is not exist",
+                    message_zh_CN=f"数据源 '{source_name}' 不存在",
+                    data=None,
+                )
+    return None
+
+
+def filter_error_response(error: AttributeFilterError) -> GeneralResponse:
+    return GeneralResponse(
+        success=False,
+        message=f"Invalid data source filter: {error}",
+        message_zh_CN=f"数据源过滤条件不合法: {error}",
+        data=None,
+    )
+
+
+def pool_template_not_found_response(
+    error: PoolTemplateNotFoundError,
+) -> GeneralResponse:
+    return GeneralResponse(
+        success=False,
+        message=f"Pool template '{error}' is not exist",
+        message_zh_CN=f"元素池模板 '{error}' 不存在",
+        data=None,
+    )
+
+
+def source_names(group: CreateGroupRequest) -> List[str]:
+    """请求中的数据源表达式对应的数据源名称（需已通过校验）"""
+    return [parse_source_expression(source).name for source in group.data_source or []]
+
+
+def collect_elements(
+    group: CreateGroupRequest,
+    elements_by_source: Dict[str, List[Element]],
+    template_elements: Optional[Sequence[str]] = None,
+) -> Tuple[List[Element], int]:
+    """
+    合并请求中的元素池模板、自定义元素与已获取的数据源元素（规范化并去重），
+    返回元素池与被丢弃的元素数量
+    elements_by_source按数据源名称索引，带过滤条件的数据源通过属性索引选出元素
+    :raises AttributeFilterError: 数据源不支持过滤条件中的属性
+    """
+    builder = PoolBuilder(dedupe=group.dedupe, casefold=group.casefold)
+    source_count = builder.add(template_elements or ())
+    source_count += builder.add(group.source_elements or [])
+    for source in dict.fromkeys(group.data_source or []):
+        source_filter = parse_source_expression(source)
+        elements = select_elements(
+            elements_by_source[source_filter.name], source_filter.clauses
+        )
+        builder.add(Element.to_str(elements))
+    all_elements = Element.from_strs(builder.pool)
+    # 如果公开，则将自定义元素计入热门元素统计
+    if source_count and group.is_public:
+        hot_element_recorder.record(all_elements[:source_count])
+    return all_elements, builder.dropped
+
+
+class PendingGroupResult:
+    """已构造、尚未分组的分组结果行，以及分组与保存所需的元素池"""
+
+    __slots__ = ("row", "elements", "template_elements", "storage_mode", "dropped")
+
+    def __init__(
+        self,
+        row: GroupResult,
+        elements: List[Element],
+        template_elements: Optional[Sequence[str]],
+        storage_mode: str,
+        dropped: int = 0,
+    ):
+        self.row = row
+        self.elements = elements
+        self.template_elements = template_elements
+        self.storage_mode = storage_mode
+        self.dropped = dropped
+
+
+def choose_storage_mode(
+    all_elements: List[Element],
+    group_mode: GroupMode,
+    group_count: int,
+    group_size: Optional[int],
+    seed: Optional[int],
+    stream: bool = False,
+) -> Tuple[str, Optional[int], Optional[int]]:
+    """
+    选择分组结果的存储方式，返回存储方式、使用的种子与打乱算法版本（未使用种子时为None）
+    stream为True时只按种子保存
+    """
+    # full: 保存完整结果；seed: 只保存种子与元素池，读取时重新计算；
+    # compact: 以紧凑二进制格式保存结果
+    storage_mode = "seed" if stream else GROUP_STORAGE_MODE
+    if storage_mode == "auto":
+        storage_mode = "seed" if len(all_elements) >= SEED_STORAGE_THRESHOLD else "full"
+    if seed is None and storage_mode == "seed":
+        seed = random.getrandbits(63)
+    if seed is None:
+        return storage_mode, None, None
+    # 使用种子时（包括stream）在写入前校验分组参数，
+    # 并按元素数量与需要抽取的数量选择最快的打乱算法版本
+    bounds = Group._group_bounds(
+        len(all_elements), group_mode.value, group_count, group_size
+    )
+    count = bounds[-1][1] if bounds else 0
+    return storage_mode, seed, choose_shuffle_version(len(all_elements), count)
+
+
+def store_group_result(
+    pending: PendingGroupResult, group_result: Optional[List[List[str]]]
+):
+    """按存储方式将分组结果写入分组结果行，元素池与声明的元素池不同时一并保存元素池"""
+    group_result_row = pending.row
+    if pending.storage_mode == "full":
+        group_result_row.group_result = group_result
+    elif pending.storage_mode == "compact":
+        group_result_row.group_result_packed = encode_groups(
+            group_result, GROUP_RESULT_COMPRESSION
+        )
+    # 元素池与声明的元素池（模板与source_elements）不同时
+    # （合并了数据源或经过规范化去重）需要保存元素池，
+    # 用于按种子重新计算以及重新分组（见GroupResult.stored_pool）
+    pool_values = Element.to_str(pending.elements)
+    if pool_values != group_result_row.base_pool(pending.template_elements):
+        group_result_row.pool_elements = pool_values
+
+
+def prepare_group_result_row(
+    group: CreateGroupRequest,
+    elements_by_source: Dict[str, List[Element]],
+    stream: bool = False,
+) -> PendingGroupResult:
+    """
+    合并元素池并构造待分组的分组结果行，由complete_group_result_row完成分组
+    :raises PoolTemplateNotFoundError: 引用的元素池模板不存在
+    """
+    template_elements = template_elements_of(pool_template_store, group.pool_template)
+    all_elements, dropped = collect_elements(
+        group, elements_by_source, template_elements
+    )
+    group_mode = group.group_mode
+    if isinstance(group_mode, str):
+        group_mode = GroupMode(group_mode)
+    if group_mode == GroupMode.SIZE:
+        group_size = group.group_size
+    else:
+        group_size = None
+    storage_mode, seed, shuffle_version = choose_storage_mode(
+        all_elements, group_mode, group.group_count, group_size, group.seed, stream
+    )
+    group_result_row = GroupResult(
+        group_name=group.group_name,
+        group_mode=group_mode,
+        group_size=group_size,
+        is_public=group.is_public,
+        private_password=None if group.is_public else group.private_password,
+        source_elements=group.source_elements,
+        group_count=group.group_count,
+        data_source=group.data_source,
+        seed=seed,
+        shuffle_version=shuffle_version,
+        pool_template=group.pool_template,
+    )
+    return PendingGroupResult(
+        group_result_row, all_elements, template_elements, storage_mode, dropped
+    )
+
+
+def prepare_reroll_row(
+    parent: GroupResult, reroll: RerollGroupRequest, stream: bool = False
+) -> Optional[PendingGroupResult]:
+    """
+    使用原分组结果保存的元素池构造待分组的分组结果行，不获取数据源也不重新校验元素，
+    原分组结果无法还原元素池时返回None
+    :raises PoolTemplateNotFoundError: 引用的元素池模板不存在
+    """
+    template_elements = template_elements_of(pool_template_store, parent.pool_template)
+    pool = parent.stored_pool(template_elements)
+    if pool is None:
+        return None
+    all_elements = Element.from_strs(pool)
+    group_mode = GroupMode(parent.group_mode)
+    group_size = parent.group_size
+    if reroll.group_size is not None:
+        group_mode = GroupMode.SIZE
+        group_size = reroll.group_size
+    group_count = (
+        reroll.group_count if reroll.group_count is not None else parent.group_count
+    )
+    storage_mode, seed, shuffle_version = choose_storage_mode(
+        all_elements, group_mode, group_count, group_size, reroll.seed, stream
+    )
+    group_result_row = GroupResult(
+        group_name=parent.group_name,
+        group_mode=group_mode,
+        group_size=group_size,
+        is_public=parent.is_public,
+        private_password=parent.private_password,
+        source_elements=parent.source_elements,
+        group_count=group_count,
+        data_source=parent.data_source,
+        seed=seed,
+        shuffle_version=shuffle_version,
+        pool_template=parent.pool_template,
+        parent_id=parent.id,
+    )
+    return PendingGroupResult(
+        group_result_row, all_elements, template_elements, storage_mode
+    )
+
+
+async def complete_group_result_row(
+    pending: PendingGroupResult, stream: bool = False
+) -> Optional[List[List[str]]]:
+    """
+    执行分组并写入分组结果行，返回分组结果
+    分组在事件循环中排队等待进程池（见GroupingScheduler），不占用线程池中的线程
+    stream为True时不执行分组（返回None），由调用方通过GroupResult.iter_group_result逐组生成
+    """
+    group_result = None
+    if not stream:
+        row = pending.row
+        group_result = await grouping_scheduler.group_elements(
+            pending.elements,
+            mode=GroupMode(row.group_mode).value,
+            group_num=row.group_count,
+            group_size=row.group_size,
+            seed=row.seed,
+            shuffle_version=row.shuffle_version or SHUFFLE_VERSION,
+        )
+    await run_in_threadpool(store_group_result, pending, group_result)
+    return group_result
+
+
+def to_group_result_response(
+    group_result_row: GroupResult, group_result: List[List[str]], dropped: int = 0
+) -> GroupResultResponse:
+    return GroupResultResponse(
+        id=group_result_row.id,
+        group_name=group_result_row.group_name,
+        group_mode=group_result_row.group_mode,
+        is_public=group_result_row.is_public,
+        source_elements=group_result_row.source_elements,
+        data_source=group_result_row.data_source,
+        group_count=group_result_row.group_count,
+        group_result=group_result,
+        created_at=group_result_row.created_at,
+        seed=group_result_row.seed,
+        pool_template=group_result_row.pool_template,
+        parent_id=group_result_row.parent_id,
+        dropped_elements=dropped,
+    )
+
+
+async def save_group_result(group_result_row: GroupResult) -> int:
+    """写入分组结果行并返回ID，启用合并提交时在事件循环中等待写入完成"""
+    if group_commit_queue.running:
+        return await asyncio.wrap_future(group_commit_queue.submit(group_result_row))
+    return await run_in_threadpool(group_commit_queue.insert, group_result_row)
+
+
+def iter_ndjson(
+    header: GeneralResponse, groups: Iterable[List[str]]
+) -> Iterator[bytes]:
+    """
+    生成NDJSON格式的分组结果：第一行为不含分组结果的响应，之后每行为一组
+    第一组立即发送，之后的分组累积到STREAM_CHUNK_SIZE字节再发送
+    """
+    yield header.model_dump_json().encode("utf-8") + b"\n"
+    buffer = []
+    size = 0
+    first = True
+    for group in groups:
+        line = json.dumps(group, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        buffer.append(line)
+        size += len(line) + 1
+        if first or size >= STREAM_CHUNK_SIZE:
+            yield b"\n".join(buffer) + b"\n"
+            buffer = []
+            size = 0
+            first = False
+    if buffer:
+        yield b"\n".join(buffer) + b"\n"
+
+
+async def created_group_response(
+    group_result_row: GroupResult,
+    group_result: Optional[List[List[str]]],
+    dropped: int,
+    stream: bool,
+) -> Union[GeneralResponse, StreamingResponse]:
+    """已写入的分组结果的创建响应，stream为True时以NDJSON格式逐组返回"""
+    if not stream:
+        return GeneralResponse(
+            success=True,
+            message="Group created successfully",
+            message_zh_CN="分组创建成功",
+            data=to_group_result_response(group_result_row, group_result, dropped),
+        )
+    header = GeneralResponse(
+        success=True,
+        message="Group created successfully",
+        message_zh_CN="分组创建成功",
+        data=to_group_result_response(group_result_row, [], dropped).model_dump(
+            mode="json", exclude={"group_result"}
+        ),
+    )
+    template_elements = await run_in_threadpool(
+        template_elements_of, pool_template_store, group_result_row.pool_template
+    )
+    return StreamingResponse(
+        iter_ndjson(header, group_result_row.iter_group_result(template_elements)),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
 @app.post("/group_result", response_model=GeneralResponse)
-def create_group(group: CreateGroupRequest):
+async def create_group(group: CreateGroupRequest, stream: bool = False):
     """
     创建一个新分组
+    - 缓存缺失的数据源在独立的获取线程池中并发获取，合并元素池在线程池中执行
+    - 分组交给GroupingScheduler：小分组在线程池中执行，大分组在事件循环中排队
+      等待进程池，排队期间不占用线程（见complete_group_result_row）
+    - 写入数据库在线程池中执行；启用GROUP_COMMIT时在事件循环中等待合并提交，
+      不占用线程（见save_group_result）
+    stream=true 时以NDJSON格式逐组返回分组结果（第一行为不含分组结果的响应），
+    此时分组结果按种子保存，不会在内存中同时构造所有分组
     """
     try:
-        # 校验分组名称长度
-        if len(group.group_name) > 20:
+        error = validate_create_request(group)
+        if error is not None:
+            return error
+        # 多个数据源并发获取
+        elements_by_source = await get_elements_by_source_async(source_names(group))
+        pending = await run_in_threadpool(
+            prepare_group_result_row, group, elements_by_source, stream
+        )
+        group_result = await complete_group_result_row(pending, stream)
+        group_result_row = pending.row
+        await save_group_result(group_result_row)
+        latest_groups_cache.push(to_brief_response(group_result_row))
+        logger.info(f"Group created successfully: {group_result_row.id}")
+        return await created_group_response(
+            group_result_row, group_result, pending.dropped, stream
+        )
+    except AttributeFilterError as e:
+        return filter_error_response(e)
+    except PoolTemplateNotFoundError as e:
+        return pool_template_not_found_response(e)
+    except Exception as e:
+        logger.error(f"Error creating group: {e}")
+        return GeneralResponse(
+            success=False,
+            message="Failed to create group",
+            message_zh_CN="分组创建失败",
+            data=None,
+        )
+
+
+@app.post("/group_result/{group_id}/reroll", response_model=GeneralResponse)
+async def reroll_group(
+    group_id: int, reroll: Optional[RerollGroupRequest] = None, stream: bool = False
+):
+    """
+    使用已有分组结果的元素池重新分组
+    不获取数据源、不重新校验元素，新的分组结果通过parent_id关联原分组结果，
+    名称、公开状态与密码沿用原分组结果，私有分组需要提供密码
+    stream=true 时与创建分组相同，以NDJSON格式逐组返回
+    """
+    reroll = reroll or RerollGroupRequest()
+    try:
+        parent = await run_in_threadpool(load_group_result, group_id)
+        if parent is None:
             return GeneralResponse(
                 success=False,
-                message="Group name exceeds 20 characters limit",
-                message_zh_CN="分组名称超过20字限制",
+                message="Result not found",
+                message_zh_CN="未找到分组结果",
                 data=None,
             )
-
-        # 验证数据源是否存在
-        if group.data_source:
-            all_sources = get_all_sources()
-            for source in group.data_source:
-                if source not in all_sources:
-                    return GeneralResponse(
-                        success=False,
-                        message=f"Data source '{source}' is not exist",
-                        message_zh_CN=f"数据源 '{source}' 不存在",
-                        data=None,
-                    )
-        with Session(engine) as session:
-            group_name = group.group_name
-            group_mode = group.group_mode
-            if isinstance(group_mode, str):
-                group_mode = GroupMode(group_mode)
-            if group_mode == GroupMode.SIZE:
-                group_size = group.group_size
-            else:
-                group_size = None
-            group_count = group.group_count
-            is_public = group.is_public
-            if is_public:
-                private_password = None
-            else:
-                private_password = group.private_password
-            source_elements = group.source_elements
-            data_source = group.data_source
-            all_elements = []
-            if source_elements:
-                for element in source_elements:
-                    all_elements.append(Element(value=element))
-                # 如果公开，则将元素添加到热门元素缓存中
-                if is_public:
-                    for element in source_elements:
-                        hot_element_cache.add_element(Element(element))
-            if data_source:
-                for source in data_source:
-                    source_class = get_source_by_display_name(source)
-                    if source_class:
-                        elements = get_elements_from_source(source)
-                        all_elements.extend(elements)
-            group_instance = Group(pool=all_elements)
-            result = group_instance.group_elements(
-                mode=group_mode.value,
-                group_num=group_count,
-                group_size=group_size,
-                randomize=True,
-            )
-            group_result_row = GroupResult(
-                group_name=group_name,
-                group_mode=group_mode,
-                group_size=group_size,
-                is_public=is_public,
-                private_password=private_password,
-                source_elements=source_elements,
-                group_count=group_count,
-                data_source=data_source,
-                group_result=Element.to_str(result),
+        if not check_password(
+            parent.is_public, parent.private_password, reroll.password
+        ):
+            return GeneralResponse(
+                success=False,
+                message="Invalid password",
+                message_zh_CN="密码错误",
+                data=None,
             )
-            session.add(group_result_row)
-            session.commit()
-            logger.info(f"Group created successfully: {group_result_row.id}")
+        pending = await run_in_threadpool(prepare_reroll_row, parent, reroll, stream)
+        if pending is None:
             return GeneralResponse(
-                success=True,
-                message="Group created successfully",
-                message_zh_CN="分组创建成功",
-                data=GroupResultResponse(
-                    id=group_result_row.id,
-                    group_name=group_name,
-                    group_mode=group_mode,
-                    is_public=is_public,
-                    source_elements=source_elements,
-                    data_source=data_source,
-                    group_count=group_count,
-                    group_result=Element.to_str(result),
-                    created_at=group_result_row.created_at,
-                ),
+                success=False,
+                message="The element pool of this result is not stored",
+                message_zh_CN="该分组结果未保存完整的元素池，无法重新分组",
+                data=None,
             )
+        group_result = await complete_group_result_row(pending, stream)
+        group_result_row = pending.row
+        await save_group_result(group_result_row)
+        latest_groups_cache.push(to_brief_response(group_result_row))
+        logger.info(f"Group rerolled successfully: {group_id} -> {group_result_row.id}")
+        return await created_group_response(group_result_row, group_result, 0, stream)
+    except PoolTemplateNotFoundError as e:
+        return pool_template_not_found_response(e)
     except Exception as e:
-        logger.error(f"Error creating group: {e}")
+        logger.error(f"Error rerolling group: {e}")
         return GeneralResponse(
             success=False,
-            message="Failed to create group",
-            message_zh_CN="分组创建失败",
+            message="Failed to reroll group",
+            message_zh_CN="重新分组失败",
             data=None,
         )
 
 
+def batch_error_response(error: Exception) -> GeneralResponse:
+    """批量创建中单个分组失败时的结果"""
+    if isinstance(error, AttributeFilterError):
+        return filter_error_response(error)
+    if isinstance(error, PoolTemplateNotFoundError):
+        return pool_template_not_found_response(error)
+    logger.error(f"Error creating group in batch: {error}")
+    return GeneralResponse(
+        success=False,
+        message="Failed to create group",
+        message_zh_CN="分组创建失败",
+        data=None,
+    )
+
+
+def prepare_groups_batch(
+    groups: List[CreateGroupRequest],
+    results: List[Optional[GeneralResponse]],
+    elements_by_source: Dict[str, List[Element]],
+) -> List[Tuple[int, PendingGroupResult]]:
+    """为通过校验的请求构造待分组的分组结果行，失败的请求填充results"""
+    pending = []
+    for index, group in enumerate(groups):
+        if results[index] is not None:
+            continue
+        try:
+            pending.append((index, prepare_group_result_row(group, elements_by_source)))
+        except Exception as e:
+            results[index] = batch_error_response(e)
+    return pending
+
+
+def save_groups_batch(
+    created: List[Tuple[int, PendingGroupResult, List[List[str]]]],
+    results: List[Optional[GeneralResponse]],
+) -> int:
+    """在同一个事务中写入已分组的分组结果行并填充results，返回创建的数量"""
+    with Session(engine, expire_on_commit=False) as session:
+        session.add_all([pending.row for _, pending, _ in created])
+        session.commit()
+    for index, pending, group_result in created:
+        latest_groups_cache.push(to_brief_response(pending.row))
+        results[index] = GeneralResponse(
+            success=True,
+            message="Group created successfully",
+            message_zh_CN="分组创建成功",
+            data=to_group_result_response(pending.row, group_result, pending.dropped),
+        )
+    return len(created)
+
+
+@app.post("/group_results/batch", response_model=GeneralResponse)
+async def create_groups_batch(groups: List[CreateGroupRequest]):
+    """
+    批量创建分组
+    整批请求中每个数据源只获取一次，所有分组在同一个事务中写入
+    data.results 与请求顺序一致，每一项为该分组的创建结果
+    """
+    if not groups or len(groups) > GROUP_BATCH_MAX_SIZE:
+        return GeneralResponse(
+            success=False,
+            message=f"Batch size must be between 1 and {GROUP_BATCH_MAX_SIZE}",
+            message_zh_CN=f"批量创建的分组数量必须在1到{GROUP_BATCH_MAX_SIZE}之间",
+            data=None,
+        )
+    try:
+        results: List[Optional[GeneralResponse]] = [
+            validate_create_request(group) for group in groups
+        ]
+        elements_by_source = await get_elements_by_source_async(
+            [
+                source
+                for group, error in zip(groups, results)
+                if error is None
+                for source in source_names(group)
+            ]
+        )
+        created = []
+        for index, pending in await run_in_threadpool(
+            prepare_groups_batch, groups, results, elements_by_source
+        ):
+            try:
+                group_result = await complete_group_result_row(pending)
+                created.append((index, pending, group_result))
+            except Exception as e:
+                results[index] = batch_error_response(e)
+        created_count = await run_in_threadpool(save_groups_batch, created, results)
+        logger.info(f"Batch created {created_count}/{len(groups)} groups")
+        return GeneralResponse(
+            success=True,
+            message="Batch processed successfully",
+            message_zh_CN="批量创建完成",
+            data=CreateGroupsBatchResponse(created=created_count, results=results),
+        )
+    except Exception as e:
+        logger.error(f"Error creating groups in batch: {e}")
+        return GeneralResponse(
+            success=False,
+            message="Failed to create groups",
+            message_zh_CN="批量创建分组失败",
+            data=None,
+        )
+
+
+def group_result_data(group_result: GroupResult) -> dict:
+    """分组结果响应中除分组结果外的字段，公开结果不包含密码"""
+    exclude = {"pool_elements", "group_result_packed", "group_result"}
+    if group_result.is_public:
+        exclude.add("private_password")
+    return group_result.model_dump(mode="json", exclude=exclude)
+
+
+def build_cached_result(group_result: GroupResult) -> CachedResult:
+    """序列化分组结果响应"""
+    data = group_result_data(group_result)
+    data["group_result"] = group_result.resolve_group_result(
+        template_elements_of(pool_template_store, group_result.pool_template)
+    )
+    response = GeneralResponse(
+        success=True,
+        message="Result fetched successfully",
+        message_zh_CN="成功获取分组结果",
+        data=data,
+    )
+    return CachedResult(
+        is_public=group_result.is_public,
+        private_password=group_result.private_password,
+        body=response.model_dump_json().encode("utf-8"),
+    )
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def load_cached_result(group_id: int) -> Optional[CachedResult]:
+    """从数据库读取分组结果并放入缓存，不存在时返回None"""
+    with Session(engine) as session:
+        group_result = session.get(GroupResult, group_id)
+        if group_result is None:
+            return None
+        cached = build_cached_result(group_result)
+    result_cache.put(group_id, cached)
+    return cached
+
+
+def load_group_result(group_id: int) -> Optional[GroupResult]:
+    with Session(engine) as session:
+        return session.get(GroupResult, group_id)
+
+
+async def stream_group_result(
+    group_id: int, password: Optional[str]
+) -> Union[GeneralResponse, StreamingResponse]:
+    """以NDJSON格式逐组返回分组结果，不经过结果缓存"""
+    group_result = await run_in_threadpool(load_group_result, group_id)
+    if group_result is None:
+        return GeneralResponse(
+            success=False,
+            message="Result not found",
+            message_zh_CN="未找到分组结果",
+            data=None,
+        )
+    if not check_password(
+        group_result.is_public, group_result.private_password, password
+    ):
+        return GeneralResponse(
+            success=False,
+            message="Invalid password",
+            message_zh_CN="密码错误",
+            data=None,
+        )
+    header = GeneralResponse(
+        success=True,
+        message="Result fetched successfully",
+        message_zh_CN="成功获取分组结果",
+        data=group_result_data(group_result),
+    )
+    template_elements = await run_in_threadpool(
+        template_elements_of, pool_template_store, group_result.pool_template
+    )
+    return StreamingResponse(
+        iter_ndjson(header, group_result.iter_group_result(template_elements)),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
 @app.get("/group_result", response_model=GeneralResponse)
-def get_group_result(group_id: int, password: Optional[str] = None):
+async def get_group_result(
+    request: Request,
+    group_id: int,
+    password: Optional[str] = None,
+    stream: bool = False,
+):
     """
     根据 Group ID 获取分组结果
     如果分组结果不存在，则返回失败
@@ -177,53 +874,100 @@ def get_group_result(group_id: int, password: Optional[str] = None):
     如果输入了密码，则判断密码是否正确
     如果密码正确，则返回分组结果
     如果密码不正确，则返回失败
+    分组结果创建后不再变化，响应带有 ETag，客户端携带 If-None-Match 时可能返回 304
+    stream=true 时以NDJSON格式逐组返回（第一行为不含分组结果的响应）
     """
-    with Session(engine) as session:
-        statement = select(GroupResult).where(GroupResult.id == group_id)
-        group_result = session.exec(statement).first()
-        if group_result:
-            if group_result.is_public:
-                return GeneralResponse(
-                    success=True,
-                    message="Result fetched successfully",
-                    message_zh_CN="成功获取分组结果",
-                    data=group_result.model_dump(exclude={"private_password"}),
-                )
-            else:
-                if password == group_result.private_password:
-                    return GeneralResponse(
-                        success=True,
-                        message="Result fetched successfully",
-                        message_zh_CN="成功获取分组结果",
-                        data=group_result.model_dump(),
-                    )
-                else:
-                    return GeneralResponse(
-                        success=False,
-                        message="Invalid password",
-                        message_zh_CN="密码错误",
-                        data=None,
-                    )
-        else:
+    if stream:
+        return await stream_group_result(group_id, password)
+    cached = result_cache.get(group_id)
+    if cached is None:
+        cached = await run_in_threadpool(load_cached_result, group_id)
+        if cached is None:
             return GeneralResponse(
                 success=False,
                 message="Result not found",
                 message_zh_CN="未找到分组结果",
                 data=None,
             )
+    if not cached.check_password(password):
+        return GeneralResponse(
+            success=False,
+            message="Invalid password",
+            message_zh_CN="密码错误",
+            data=None,
+        )
+    headers = {
+        "ETag": cached.etag,
+        "Cache-Control": (
+            "public, max-age=86400" if cached.is_public else "private, no-cache"
+        ),
+    }
+    if etag_matches(request, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+@app.post("/pool_templates", response_model=GeneralResponse)
+async def create_pool_template(template: CreatePoolTemplateRequest):
+    """
+    上传元素池模板，返回其内容哈希
+    创建分组时通过 pool_template 引用该哈希，无需重复发送元素列表；相同内容只保存一份
+    """
+    if not 0 < len(template.elements) <= POOL_TEMPLATE_MAX_ELEMENTS:
+        return GeneralResponse(
+            success=False,
+            message=f"Pool template size must be between 1 and {POOL_TEMPLATE_MAX_ELEMENTS}",
+            message_zh_CN=f"元素池模板的元素数量必须在1到{POOL_TEMPLATE_MAX_ELEMENTS}之间",
+            data=None,
+        )
+    try:
+        template_hash = await run_in_threadpool(
+            pool_template_store.put, template.elements
+        )
+        return GeneralResponse(
+            success=True,
+            message="Pool template saved successfully",
+            message_zh_CN="元素池模板保存成功",
+            data=PoolTemplateResponse(hash=template_hash, size=len(template.elements)),
+        )
+    except Exception as e:
+        logger.error(f"Error saving pool template: {e}")
+        return GeneralResponse(
+            success=False,
+            message="Failed to save pool template",
+            message_zh_CN="元素池模板保存失败",
+            data=None,
+        )
+
+
+@app.get("/pool_templates/{template_hash}", response_model=GeneralResponse)
+async def get_pool_template(template_hash: str):
+    """
+    获取元素池模板中的元素，可用于判断模板是否已上传
+    """
+    try:
+        elements = await run_in_threadpool(pool_template_store.get, template_hash)
+    except PoolTemplateNotFoundError as e:
+        return pool_template_not_found_response(e)
+    return GeneralResponse(
+        success=True,
+        message="Pool template fetched successfully",
+        message_zh_CN="成功获取元素池模板",
+        data=list(elements),
+    )
 
 
 @app.get("/hot_elements", response_model=GeneralResponse)
-def get_hot_elements():
+async def get_hot_elements(k: int = Query(default=10, ge=1, le=100)):
     """
-    获取热门元素
+    获取按衰减频率排序的前 k 个热门元素
     """
     try:
         return GeneralResponse(
             success=True,
             message="Hot elements fetched successfully",
             message_zh_CN="成功获取热门元素",
-            data=Element.to_str(hot_element_cache.get_hot_elements()),
+            data=Element.to_str(hot_element_cache.get_hot_elements(k)),
         )
     except Exception as e:
         logger.error(f"Error fetching hot elements: {e}")
@@ -236,7 +980,7 @@ def get_hot_elements():
 
 
 @app.get("/data_sources", response_model=GeneralResponse)
-def get_data_sources():
+async def get_data_sources():
     """
     获取所有数据源
     """
@@ -248,44 +992,136 @@ def get_data_sources():
     )
 
 
+@app.get("/data_sources/status", response_model=GeneralResponse)
+async def get_data_sources_status():
+    """
+    获取数据源熔断器状态，用于监控
+    """
+    return GeneralResponse(
+        success=True,
+        message="Data source status fetched successfully",
+        message_zh_CN="成功获取数据源状态",
+        data=get_circuit_breaker_states(),
+    )
+
+
+@app.get("/data_sources/attributes", response_model=GeneralResponse)
+async def get_data_source_attributes(data_source: str):
+    """
+    获取数据源可用于过滤的属性，以及每个属性值对应的元素数量
+    """
+    if data_source not in get_all_sources():
+        return GeneralResponse(
+            success=False,
+            message=f"Data source '{data_source}' is not exist",
+            message_zh_CN=f"数据源 '{data_source}' 不存在",
+            data=None,
+        )
+    elements = (await get_elements_by_source_async([data_source]))[data_source]
+    index = getattr(elements, "attribute_index", None)
+    return GeneralResponse(
+        success=True,
+        message="Data source attributes fetched successfully",
+        message_zh_CN="成功获取数据源属性",
+        data=index.summary() if index is not None else {},
+    )
+
+
+@app.get("/grouping/status", response_model=GeneralResponse)
+async def get_grouping_status():
+    """
+    获取分组任务调度状态（排队与执行中的进程池任务数等），用于监控
+    """
+    return GeneralResponse(
+        success=True,
+        message="Grouping status fetched successfully",
+        message_zh_CN="成功获取分组任务状态",
+        data=grouping_scheduler.status(),
+    )
+
+
+def query_groups(
+    query: str, limit: int, offset: int, public_only: bool
+) -> Tuple[List[BriefGroupResultResponse], bool]:
+    """按ID或名称查询分组，返回当前页与是否还有更多结果"""
+    with Session(engine) as session:
+        # 尝试将查询字符串转换为整数（用于ID搜索）
+        try:
+            query_id = int(query)
+            # 按ID搜索
+            statement = select(
+                GroupResult.id,
+                GroupResult.group_name,
+                GroupResult.is_public,
+                GroupResult.created_at,
+            ).where(GroupResult.id == query_id)
+            if public_only:
+                statement = statement.where(GroupResult.is_public == True)
+            groups, has_more = session.exec(statement).all(), False
+        except ValueError:
+            # 按名称搜索
+            groups, has_more = search_groups_by_name(
+                session, query, limit=limit, offset=offset, public_only=public_only
+            )
+        return [to_brief_response(group) for group in groups], has_more
+
+
+def query_groups_by_member(
+    value: str, limit: int, before_id: Optional[int]
+) -> Tuple[List[BriefGroupResultResponse], bool]:
+    """查询包含指定元素的公开分组，返回当前页与是否还有更多结果"""
+    with Session(engine) as session:
+        groups, has_more = search_groups_by_member(
+            session, value, limit=limit, before_id=before_id
+        )
+        return [to_brief_response(group) for group in groups], has_more
+
+
 @app.get("/search_groups", response_model=GeneralResponse)
-def search_groups(query: str):
+async def search_groups(
+    query: str,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    public_only: bool = False,
+    mode: SearchMode = SearchMode.NAME,
+):
     """
     根据搜索字符串查询分组
-    支持通过ID或分组名称进行搜索
+    - mode=name（默认）：通过ID或分组名称进行搜索，名称搜索按相关度排序
+    - mode=member：查询包含该元素的分组，只返回公开分组，按ID倒序
+    分页时将上一页返回的 next_cursor 作为 cursor 传入
     """
     try:
-        with Session(engine) as session:
-            # 尝试将查询字符串转换为整数（用于ID搜索）
-            try:
-                query_id = int(query)
-                # 按ID搜索
-                statement = select(GroupResult).where(GroupResult.id == query_id)
-            except ValueError:
-                # 按名称搜索
-                statement = select(GroupResult).where(
-                    GroupResult.group_name.contains(query)
-                )
-
-            groups = session.exec(statement).all()
-
-            data = []
-            for group in groups:
-                data.append(
-                    BriefGroupResultResponse(
-                        id=group.id,
-                        group_name=group.group_name,
-                        is_public=group.is_public,
-                        created_at=group.created_at,
-                    )
-                )
-
-            return GeneralResponse(
-                success=True,
-                message="Search completed successfully",
-                message_zh_CN="搜索完成",
-                data=GetLatestGroupsResponse(groups=data),
+        position = int(cursor) if cursor else None
+        if position is not None and position < 0:
+            raise ValueError
+    except ValueError:
+        return GeneralResponse(
+            success=False,
+            message="Invalid cursor",
+            message_zh_CN="无效的分页游标",
+            data=None,
+        )
+    try:
+        if mode == SearchMode.MEMBER:
+            # 游标为上一页最后一个分组的ID
+            data, has_more = await run_in_threadpool(
+                query_groups_by_member, query, limit, position
+            )
+            next_cursor = str(data[-1].id) if has_more else None
+        else:
+            # 游标为已返回的结果数量
+            offset = position or 0
+            data, has_more = await run_in_threadpool(
+                query_groups, query, limit, offset, public_only
             )
+            next_cursor = str(offset + len(data)) if has_more else None
+        return GeneralResponse(
+            success=True,
+            message="Search completed successfully",
+            message_zh_CN="搜索完成",
+            data=SearchGroupsResponse(groups=data, next_cursor=next_cursor),
+        )
     except Exception as e:
         logger.error(f"Error searching groups: {e}")
         return GeneralResponse(
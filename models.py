@@ -1,14 +1,84 @@
-from sqlmodel import create_engine, SQLModel, Field
-from sqlalchemy import JSON
-from typing import Optional, List, Any
+from sqlmodel import create_engine, SQLModel, Field, Session, select
+from sqlalchemy import JSON, LargeBinary, event, inspect, text
+from sqlalchemy.engine import Engine, make_url
+import sqlite3
+from typing import Optional, List, Any, Iterator, Sequence
 from datetime import datetime, timezone
 import os
 from enum import Enum
 from pydantic import ValidationError, model_validator, FieldValidationInfo
+from element_group import Group, PoolBuilder
+from compact_storage import decode_groups, encode_groups
+
+# 创建SQLite数据库引擎（不会立即连接数据库）
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///database.db")
+DATABASE_ECHO = (
+    os.getenv("DATABASE_ECHO", os.getenv("DEBUG", "False")).lower() == "true"
+)
+# 数据库配置：performance 为SQLite文件数据库启用WAL、连接池等优化；default 使用默认设置
+DATABASE_PROFILE = os.getenv("DATABASE_PROFILE", "performance")
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "10"))
+# 等待写锁的最长时间（毫秒）
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))
+# 每个连接的页缓存大小（KiB）
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "16384"))
+# 内存映射读取的最大字节数
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """为新建的SQLite连接设置性能相关的PRAGMA"""
+    cursor = dbapi_connection.cursor()
+    # WAL模式下读写互不阻塞，synchronous=NORMAL只在checkpoint时fsync
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def create_db_engine(
+    url: str = DATABASE_URL, profile: str = DATABASE_PROFILE, echo: bool = DATABASE_ECHO
+) -> Engine:
+    """按配置创建数据库引擎，内存数据库与非SQLite数据库不应用performance配置"""
+    database = make_url(url)
+    if (
+        profile != "performance"
+        or database.get_backend_name() != "sqlite"
+        or database.database in (None, "", ":memory:")
+    ):
+        return create_engine(url, echo=echo)
+    new_engine = create_engine(
+        url,
+        echo=echo,
+        pool_size=DATABASE_POOL_SIZE,
+        max_overflow=DATABASE_POOL_SIZE,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": SQLITE_BUSY_TIMEOUT / 1000,
+        },
+    )
+    event.listen(new_engine, "connect", apply_sqlite_pragmas)
+    return new_engine
+
+
+engine = create_db_engine()
+
 
-# 创建SQLite数据库引擎
-DATABASE_URL = "sqlite:///database.db"
-engine = create_engine(DATABASE_URL, echo=True)
+def _decay_factor(elapsed: float, half_life: float) -> float:
+    return 2.0 ** (-elapsed / half_life)
+
+
+@event.listens_for(Engine, "connect")
+def register_sqlite_functions(dbapi_connection, connection_record):
+    """为SQLite连接注册自定义SQL函数"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        # decay_factor(经过秒数, 半衰期秒数)：指数衰减系数
+        dbapi_connection.create_function(
+            "decay_factor", 2, _decay_factor, deterministic=True
+        )
 
 
 class GroupMode(Enum):
@@ -16,6 +86,13 @@ class GroupMode(Enum):
     SIZE = "size"
 
 
+class SearchMode(Enum):
+    # 按分组ID或名称搜索
+    NAME = "name"
+    # 按元素值搜索包含该元素的公开分组
+    MEMBER = "member"
+
+
 class GroupResult(SQLModel, table=True):
     """
     分组结果 Model
@@ -44,6 +121,106 @@ class GroupResult(SQLModel, table=True):
     group_result: List[List[str]] = Field(
         default=[], sa_type=JSON, description="分组结果"
     )
+    seed: Optional[int] = Field(
+        default=None, description="随机种子，为空表示分组时未使用固定种子"
+    )
+    shuffle_version: Optional[int] = Field(default=None, description="打乱算法版本")
+    pool_elements: Optional[List[str]] = Field(
+        default=None,
+        sa_type=JSON,
+        description="分组时的完整元素池，为空表示与base_pool()相同",
+    )
+    pool_template: Optional[str] = Field(
+        default=None, description="元素池模板的内容哈希，见pool_templates"
+    )
+    group_result_packed: Optional[bytes] = Field(
+        default=None,
+        sa_type=LargeBinary,
+        description="紧凑格式保存的分组结果，见compact_storage",
+    )
+    parent_id: Optional[int] = Field(
+        default=None, description="重新分组时原分组结果的ID"
+    )
+
+    def needs_pool(self) -> bool:
+        """是否按种子保存，需要根据元素池重新计算分组结果"""
+        return (
+            self.group_result_packed is None
+            and not self.group_result
+            and self.seed is not None
+        )
+
+    def base_pool(self, template_elements: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        分组时声明的元素池：元素池模板中的元素加上source_elements
+        引用了元素池模板时必须传入模板中的元素
+        """
+        if self.pool_template is None:
+            return self.source_elements or []
+        if template_elements is None:
+            raise ValueError(
+                f"Elements of pool template {self.pool_template} are required"
+            )
+        return list(template_elements) + (self.source_elements or [])
+
+    def stored_pool(
+        self, template_elements: Optional[Sequence[str]] = None
+    ) -> Optional[List[str]]:
+        """
+        分组时使用的完整元素池（顺序可能与分组时不同），无法还原时返回None
+        - 保存了元素池（与声明的元素池不同）时直接返回
+        - 按种子保存：元素池即声明的元素池
+        - 均等分组：所有分组合并后即为完整元素池
+        - 按量分组可能只抽取了部分元素：旧版本只在按种子保存时记录元素池，
+          未使用数据源时按默认方式规范化并去重声明的元素池，使用了数据源时无法还原
+        """
+        if self.pool_elements is not None:
+            return self.pool_elements
+        if self.needs_pool():
+            return self.base_pool(template_elements)
+        if GroupMode(self.group_mode) == GroupMode.EQUAL:
+            return [value for group in self.resolve_group_result() for value in group]
+        if not self.data_source:
+            builder = PoolBuilder()
+            builder.add(self.base_pool(template_elements))
+            return builder.pool
+        return None
+
+    def resolve_group_result(
+        self, template_elements: Optional[Sequence[str]] = None
+    ) -> List[List[str]]:
+        """
+        获取分组结果
+        按种子保存的结果（group_result为空且seed不为空）根据元素池与分组参数重新计算
+        """
+        if self.group_result_packed is not None:
+            return decode_groups(self.group_result_packed)
+        if self.group_result or self.seed is None:
+            return self.group_result
+        return list(self.iter_group_result(template_elements))
+
+    def iter_group_result(
+        self, template_elements: Optional[Sequence[str]] = None
+    ) -> Iterator[List[str]]:
+        """
+        逐组获取分组结果
+        按种子保存的结果逐组重新计算，不会同时构造所有分组
+        """
+        if not self.needs_pool():
+            yield from self.resolve_group_result()
+            return
+        pool = self.pool_elements
+        if pool is None:
+            pool = self.base_pool(template_elements)
+        # 打乱只依赖下标，直接对字符串元素池分组，无需为每个元素构造Element
+        yield from Group(pool).iter_groups(
+            mode=GroupMode(self.group_mode).value,
+            group_num=self.group_count,
+            group_size=self.group_size,
+            seed=self.seed,
+            # 未记录版本时按引入种子时的版本1处理
+            shuffle_version=self.shuffle_version or 1,
+        )
 
     @model_validator(mode="after")
     def validate_private_password(self) -> "GroupResult":
@@ -61,6 +238,44 @@ class GroupResult(SQLModel, table=True):
         table_name = "grouping_results"
 
 
+class PoolTemplate(SQLModel, table=True):
+    """
+    元素池模板 Model，按元素列表的内容哈希寻址，相同内容只保存一份
+    """
+
+    hash: str = Field(
+        primary_key=True, description="元素列表的SHA-256，见pool_templates"
+    )
+    elements: List[str] = Field(default=[], sa_type=JSON, description="元素列表")
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), description="创建时间"
+    )
+
+
+class GroupMember(SQLModel, table=True):
+    """
+    分组成员倒排索引 Model：元素值 -> 包含该元素的公开分组ID
+    由search模块在写入分组结果时同步维护
+    """
+
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    value: str = Field(primary_key=True, description="元素值")
+    group_id: int = Field(primary_key=True, description="分组ID")
+
+
+class HotElementStat(SQLModel, table=True):
+    """
+    热点元素统计 Model，由所有工作进程共同写入
+    """
+
+    value: str = Field(primary_key=True, description="元素值")
+    score: float = Field(default=0.0, description="截至updated_at的衰减计数")
+    updated_at: float = Field(
+        default=0.0, description="score对应的时间（Unix时间戳，秒）"
+    )
+
+
 class CreateGroupRequest(SQLModel, table=False):
     """
     创建分组请求 Model
@@ -71,13 +286,25 @@ class CreateGroupRequest(SQLModel, table=False):
     private_password: Optional[str] = None
     source_elements: Optional[List[str]] = None
     data_source: Optional[List[str]] = None
+    # 元素池模板的内容哈希（POST /pool_templates 返回），模板中的元素与source_elements合并
+    pool_template: Optional[str] = Field(
+        default=None, schema_extra={"pattern": r"^[0-9a-f]{64}$"}
+    )
     group_mode: GroupMode = Field(default=GroupMode.EQUAL)
     group_count: int = Field(default=2)
     group_size: Optional[int] = None
+    seed: Optional[int] = Field(default=None, ge=0, le=2**63 - 1)
+    # 合并元素时规范化并去重，casefold为True时去重忽略大小写
+    dedupe: bool = True
+    casefold: bool = False
 
     @model_validator(mode="before")
     def check_at_least_one_source(cls, data: dict) -> dict:
-        if not data.get("source_elements") and not data.get("data_source"):
+        if (
+            not data.get("source_elements")
+            and not data.get("data_source")
+            and not data.get("pool_template")
+        ):
             raise ValueError("Need at least one source")
         return data
 
@@ -88,6 +315,18 @@ class CreateGroupRequest(SQLModel, table=False):
         return self
 
 
+class RerollGroupRequest(SQLModel, table=False):
+    """
+    重新分组请求 Model
+    未指定的分组参数沿用原分组结果；指定group_size时按量分组
+    """
+
+    password: Optional[str] = None
+    group_count: Optional[int] = Field(default=None, ge=1)
+    group_size: Optional[int] = Field(default=None, ge=1)
+    seed: Optional[int] = Field(default=None, ge=0, le=2**63 - 1)
+
+
 class GroupResultResponse(SQLModel, table=False):
     """
     完整分组结果展示响应 Model
@@ -102,6 +341,11 @@ class GroupResultResponse(SQLModel, table=False):
     group_count: int
     group_result: List[List[str]]
     created_at: datetime
+    seed: Optional[int] = None
+    pool_template: Optional[str] = None
+    parent_id: Optional[int] = None
+    dropped_elements: int = 0
+
 
 class BriefGroupResultResponse(SQLModel, table=False):
     """
@@ -113,12 +357,23 @@ class BriefGroupResultResponse(SQLModel, table=False):
     is_public: bool
     created_at: datetime
 
+
 class GetLatestGroupsResponse(SQLModel, table=False):
     """
     获取最新分组响应 Model
     """
 
     groups: List[BriefGroupResultResponse]
+    next_before_id: Optional[int] = None
+
+
+class SearchGroupsResponse(SQLModel, table=False):
+    """
+    搜索分组响应 Model
+    """
+
+    groups: List[BriefGroupResultResponse]
+    next_cursor: Optional[str] = None
 
 
 class GetHotElementsResponse(SQLModel, table=False):
@@ -148,6 +403,80 @@ class GeneralResponse(SQLModel, table=False):
     data: Any
 
 
-# 创建数据库表（如果不存在）
-if not os.path.exists("database.db"):
+class CreatePoolTemplateRequest(SQLModel, table=False):
+    """
+    上传元素池模板请求 Model
+    """
+
+    elements: List[str]
+
+
+class PoolTemplateResponse(SQLModel, table=False):
+    """
+    元素池模板响应 Model
+    """
+
+    hash: str
+    size: int
+
+
+class CreateGroupsBatchResponse(SQLModel, table=False):
+    """
+    批量创建分组响应 Model
+    """
+
+    created: int
+    results: List[GeneralResponse]
+
+
+def migrate_db(engine=engine):
+    """为已有的表补充Model中新增的列（新增列均可为空）"""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(
+                        text(
+                            f"ALTER TABLE {table.name} "
+                            f"ADD COLUMN {column.name} {column_type}"
+                        )
+                    )
+
+
+def pack_existing_results(
+    engine=engine, compression: str = "zlib", batch_size: int = 500
+) -> int:
+    """将已有的JSON分组结果转换为紧凑格式，返回转换的行数"""
+    packed = 0
+    last_id = 0
+    while True:
+        with Session(engine) as session:
+            rows = session.exec(
+                select(GroupResult)
+                .where(GroupResult.id > last_id)
+                .order_by(GroupResult.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return packed
+            for row in rows:
+                if row.group_result and row.group_result_packed is None:
+                    row.group_result_packed = encode_groups(
+                        row.group_result, compression
+                    )
+                    row.group_result = []
+                    session.add(row)
+                    packed += 1
+            last_id = rows[-1].id
+            session.commit()
+
+
+def init_db():
+    """创建数据库表（如果不存在），并为已有的表补充新增的列"""
     SQLModel.metadata.create_all(engine)
+    migrate_db(engine)
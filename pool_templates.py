@@ -0,0 +1,116 @@
+"""
+元素池模板
+客户端上传一次元素列表，之后创建分组时只需引用其内容哈希：
+    hash = SHA-256(UTF-8编码的紧凑JSON数组，不转义非ASCII字符)
+即 json.dumps(elements, ensure_ascii=False, separators=(",", ":")) 的SHA-256，
+客户端可在本地计算哈希，通过 GET /pool_templates/{hash} 判断是否需要上传
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from models import PoolTemplate
+
+# 单个模板的最大元素数量
+POOL_TEMPLATE_MAX_ELEMENTS = int(os.getenv("POOL_TEMPLATE_MAX_ELEMENTS", "100000"))
+# 内存中缓存的模板元素总数上限
+POOL_TEMPLATE_CACHE_ELEMENTS = int(os.getenv("POOL_TEMPLATE_CACHE_ELEMENTS", "1000000"))
+
+
+class PoolTemplateNotFoundError(LookupError):
+    """引用的元素池模板不存在"""
+
+
+def pool_hash(elements: Sequence[str]) -> str:
+    """元素列表的内容哈希"""
+    encoded = json.dumps(list(elements), ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class PoolTemplateStore:
+    """
+    元素池模板存储
+    - 模板按内容哈希写入pool_template表，相同内容只保存一份
+    - 最近使用的模板缓存在内存中（LRU），缓存的元素总数不超过max_elements，
+      超过上限的单个模板不缓存
+    - 模板写入后不再修改，缓存无需失效
+    """
+
+    def __init__(
+        self, engine: Engine, max_elements: int = POOL_TEMPLATE_CACHE_ELEMENTS
+    ):
+        self.engine = engine
+        self.max_elements = max_elements
+        self._cache: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+        self._cached_elements = 0
+        self._lock = threading.Lock()
+
+    def _get_cached(self, template_hash: str) -> Optional[Tuple[str, ...]]:
+        with self._lock:
+            elements = self._cache.get(template_hash)
+            if elements is not None:
+                self._cache.move_to_end(template_hash)
+            return elements
+
+    def _cache_put(self, template_hash: str, elements: Tuple[str, ...]):
+        if len(elements) > self.max_elements:
+            return
+        with self._lock:
+            if template_hash in self._cache:
+                self._cache.move_to_end(template_hash)
+                return
+            self._cache[template_hash] = elements
+            self._cached_elements += len(elements)
+            while self._cached_elements > self.max_elements:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_elements -= len(evicted)
+
+    def put(self, elements: Sequence[str]) -> str:
+        """保存模板（已存在时不重复写入），返回内容哈希"""
+        template_hash = pool_hash(elements)
+        if self._get_cached(template_hash) is not None:
+            return template_hash
+        elements = tuple(elements)
+        table = PoolTemplate.__table__
+        with Session(self.engine) as session:
+            session.exec(
+                insert(table)
+                .values(hash=template_hash, elements=list(elements))
+                .on_conflict_do_nothing(index_elements=[table.c.hash])
+            )
+            session.commit()
+        self._cache_put(template_hash, elements)
+        return template_hash
+
+    def get(self, template_hash: str) -> Tuple[str, ...]:
+        """
+        获取模板中的元素
+        :raises PoolTemplateNotFoundError: 模板不存在
+        """
+        elements = self._get_cached(template_hash)
+        if elements is not None:
+            return elements
+        with Session(self.engine) as session:
+            stored = session.exec(
+                select(PoolTemplate.elements).where(PoolTemplate.hash == template_hash)
+            ).first()
+        if stored is None:
+            raise PoolTemplateNotFoundError(template_hash)
+        elements = tuple(stored)
+        self._cache_put(template_hash, elements)
+        return elements
+
+
+def template_elements_of(
+    store: PoolTemplateStore, template_hash: Optional[str]
+) -> Optional[Tuple[str, ...]]:
+    """引用的模板中的元素，未引用模板时返回None"""
+    if template_hash is None:
+        return None
+    return store.get(template_hash)
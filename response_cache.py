@@ -0,0 +1,149 @@
+import bisect
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from operator import attrgetter
+from typing import Any, Callable, List, Optional
+
+
+class LatestGroupsCache:
+    """
+    首页最新分组缓存
+    - 保存最新的size条分组摘要，按ID倒序（key返回分组摘要的ID）
+    - 本进程创建新分组时按ID原地插入，无需重新查询数据库；
+      并发创建时ID较小的分组可能后插入，已在缓存中的ID不会重复插入
+    - 其他工作进程创建的分组无法感知，因此缓存最多保留ttl秒
+    """
+
+    def __init__(
+        self,
+        size: int = 100,
+        ttl: float = 5.0,
+        key: Callable[[Any], int] = attrgetter("id"),
+    ):
+        if size <= 0:
+            raise ValueError("size must be greater than 0")
+        self.size = size
+        self.ttl = ttl
+        self.key = key
+        self._groups: Optional[List[Any]] = None
+        # 与_groups一一对应的ID相反数（升序），用于二分查找插入位置
+        self._keys: List[int] = []
+        self._expires_at = 0.0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """缓存版本，每次写入或失效时递增"""
+        with self._lock:
+            return self._version
+
+    def get(self, limit: int) -> Optional[List[Any]]:
+        """获取最新的limit条分组摘要，缓存未命中时返回None"""
+        if limit > self.size:
+            return None
+        with self._lock:
+            if self._groups is None or time.monotonic() >= self._expires_at:
+                return None
+            return self._groups[:limit]
+
+    def set(self, groups: List[Any], version: int) -> bool:
+        """
+        写入从数据库查询到的分组摘要
+        :param version: 查询前读取的缓存版本，期间缓存有变化时放弃写入，避免覆盖新数据
+        """
+        with self._lock:
+            if version != self._version:
+                return False
+            self._groups = list(groups[: self.size])
+            self._keys = [-self.key(group) for group in self._groups]
+            self._expires_at = time.monotonic() + self.ttl
+            self._version += 1
+            return True
+
+    def push(self, group: Any):
+        """新分组创建后按ID倒序插入缓存，ID已在缓存中时忽略"""
+        key = -self.key(group)
+        with self._lock:
+            if self._groups is not None:
+                index = bisect.bisect_left(self._keys, key)
+                if index < len(self._keys) and self._keys[index] == key:
+                    return
+                self._groups.insert(index, group)
+                self._keys.insert(index, key)
+                del self._groups[self.size :]
+                del self._keys[self.size :]
+            self._version += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._groups = None
+            self._keys = []
+            self._version += 1
+
+
+def check_password(
+    is_public: bool, private_password: Optional[str], password: Optional[str]
+) -> bool:
+    """公开结果无需密码；私有结果需要密码完全一致"""
+    if is_public:
+        return True
+    if password is None or private_password is None:
+        return False
+    return hmac.compare_digest(
+        password.encode("utf-8"), private_password.encode("utf-8")
+    )
+
+
+class CachedResult:
+    """序列化后的分组结果响应"""
+
+    __slots__ = ("is_public", "private_password", "body", "etag")
+
+    def __init__(self, is_public: bool, private_password: Optional[str], body: bytes):
+        self.is_public = is_public
+        self.private_password = private_password
+        self.body = body
+        self.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+
+    def check_password(self, password: Optional[str]) -> bool:
+        return check_password(self.is_public, self.private_password, password)
+
+
+class ResultCache:
+    """
+    分组结果读取缓存（LRU）
+    分组结果创建后不再修改，因此缓存序列化后的响应体，重复读取无需访问数据库
+    私有结果同样缓存，但调用方必须先通过CachedResult.check_password校验密码
+    """
+
+    def __init__(self, max_size: int = 1024):
+        if max_size <= 0:
+            raise ValueError("max_size must be greater than 0")
+        self.max_size = max_size
+        self._cache: "OrderedDict[int, CachedResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, group_id: int) -> Optional[CachedResult]:
+        with self._lock:
+            result = self._cache.get(group_id)
+            if result is not None:
+                self._cache.move_to_end(group_id)
+            return result
+
+    def put(self, group_id: int, result: CachedResult):
+        with self._lock:
+            self._cache[group_id] = result
+            self._cache.move_to_end(group_id)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, group_id: Optional[int] = None):
+        with self._lock:
+            if group_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(group_id, None)
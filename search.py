@@ -0,0 +1,256 @@
+import os
+import unicodedata
+from typing import List, Optional, Sequence, Tuple
+from loguru import logger
+from sqlalchemy import column, event, table, text
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from models import GroupMember, GroupMode, GroupResult, PoolTemplate
+
+# 分组名称全文索引表（FTS5，trigram分词，支持中文子串匹配）
+GROUP_NAME_FTS = f"{GroupResult.__tablename__}_fts"
+# trigram分词至少需要3个字符，更短的查询使用LIKE
+FTS_MIN_QUERY_LENGTH = 3
+
+group_name_fts = table(GROUP_NAME_FTS, column("rowid"), column("rank"))
+
+# 已成功建立全文索引的数据库引擎
+_fts_engines = set()
+
+# 元素数量超过该值的分组不写入成员索引，为0时不维护成员索引
+MEMBER_INDEX_MAX_ELEMENTS = int(os.getenv("MEMBER_INDEX_MAX_ELEMENTS", "100000"))
+
+
+def init_search_index(engine: Engine) -> bool:
+    """
+    创建分组名称全文索引及同步触发器，首次创建时为已有数据建立索引
+    SQLite不支持FTS5或trigram分词时返回False，搜索退化为LIKE
+    """
+    source = GroupResult.__tablename__
+    try:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"),
+                {"name": GROUP_NAME_FTS},
+            ).first()
+            conn.execute(
+                text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {GROUP_NAME_FTS} USING fts5("
+                    f"group_name, content='{source}', content_rowid='id', "
+                    "tokenize='trigram')"
+                )
+            )
+            conn.execute(
+                text(
+                    f"CREATE TRIGGER IF NOT EXISTS {GROUP_NAME_FTS}_ai "
+                    f"AFTER INSERT ON {source} BEGIN "
+                    f"INSERT INTO {GROUP_NAME_FTS}(rowid, group_name) "
+                    "VALUES (new.id, new.group_name); END"
+                )
+            )
+            conn.execute(
+                text(
+                    f"CREATE TRIGGER IF NOT EXISTS {GROUP_NAME_FTS}_ad "
+                    f"AFTER DELETE ON {source} BEGIN "
+                    f"INSERT INTO {GROUP_NAME_FTS}({GROUP_NAME_FTS}, rowid, group_name) "
+                    "VALUES ('delete', old.id, old.group_name); END"
+                )
+            )
+            conn.execute(
+                text(
+                    f"CREATE TRIGGER IF NOT EXISTS {GROUP_NAME_FTS}_au "
+                    f"AFTER UPDATE OF group_name ON {source} BEGIN "
+                    f"INSERT INTO {GROUP_NAME_FTS}({GROUP_NAME_FTS}, rowid, group_name) "
+                    "VALUES ('delete', old.id, old.group_name); "
+                    f"INSERT INTO {GROUP_NAME_FTS}(rowid, group_name) "
+                    "VALUES (new.id, new.group_name); END"
+                )
+            )
+            if not exists:
+                conn.execute(
+                    text(
+                        f"INSERT INTO {GROUP_NAME_FTS}({GROUP_NAME_FTS}) "
+                        "VALUES ('rebuild')"
+                    )
+                )
+    except Exception as e:
+        logger.warning(f"Full-text search index is unavailable: {e}")
+        _fts_engines.discard(engine)
+        return False
+    _fts_engines.add(engine)
+    return True
+
+
+def _fts_phrase(query: str) -> str:
+    """将查询字符串转换为FTS5短语，避免被解析为查询语法"""
+    return '"' + query.replace('"', '""') + '"'
+
+
+def search_groups_by_name(
+    session: Session,
+    query: str,
+    limit: int = 20,
+    offset: int = 0,
+    public_only: bool = False,
+) -> Tuple[List[Tuple], bool]:
+    """
+    按分组名称搜索
+    有全文索引且查询长度足够时按相关度排序，否则使用LIKE并按时间倒序
+    :return: ((id, group_name, is_public, created_at)列表, 是否还有更多结果)
+    """
+    statement = select(
+        GroupResult.id,
+        GroupResult.group_name,
+        GroupResult.is_public,
+        GroupResult.created_at,
+    )
+    if session.get_bind() in _fts_engines and len(query) >= FTS_MIN_QUERY_LENGTH:
+        statement = (
+            statement.join(group_name_fts, group_name_fts.c.rowid == GroupResult.id)
+            .where(
+                text(f"{GROUP_NAME_FTS} MATCH :query").bindparams(
+                    query=_fts_phrase(query)
+                )
+            )
+            .order_by(group_name_fts.c.rank, GroupResult.id.desc())
+        )
+    else:
+        statement = statement.where(GroupResult.group_name.contains(query)).order_by(
+            GroupResult.id.desc()
+        )
+    if public_only:
+        statement = statement.where(GroupResult.is_public == True)
+    rows = session.exec(statement.offset(offset).limit(limit + 1)).all()
+    return list(rows[:limit]), len(rows) > limit
+
+
+def group_members(
+    group_result: GroupResult, template_elements: Optional[Sequence[str]] = None
+) -> List[str]:
+    """
+    分组结果中的所有元素值（去重并保持首次出现的顺序）
+    按种子保存且引用了元素池模板的分组需要传入模板中的元素
+    """
+    if (
+        group_result.needs_pool()
+        and GroupMode(group_result.group_mode) == GroupMode.EQUAL
+    ):
+        # 按种子保存的均等分组包含元素池中的所有元素，无需重新计算分组
+        pool = group_result.pool_elements
+        values = pool if pool is not None else group_result.base_pool(template_elements)
+    else:
+        values = (
+            value
+            for group in group_result.iter_group_result(template_elements)
+            for value in group
+        )
+    return list(dict.fromkeys(values))
+
+
+def member_rows(group_result: GroupResult, session: Session) -> List[dict]:
+    """分组结果对应的成员索引行，私有分组与超过元素数量上限的分组没有索引行"""
+    if not group_result.is_public or MEMBER_INDEX_MAX_ELEMENTS <= 0:
+        return []
+    template_elements = None
+    if (
+        group_result.pool_template is not None
+        and group_result.needs_pool()
+        and group_result.pool_elements is None
+    ):
+        template_elements = session.execute(
+            select(PoolTemplate.elements).where(
+                PoolTemplate.hash == group_result.pool_template
+            )
+        ).scalar_one()
+    members = group_members(group_result, template_elements)
+    if len(members) > MEMBER_INDEX_MAX_ELEMENTS:
+        logger.debug(
+            f"Group {group_result.id} has {len(members)} elements, "
+            "skipping member index"
+        )
+        return []
+    return [{"value": value, "group_id": group_result.id} for value in members]
+
+
+def insert_member_rows(session: Session, rows: List[dict]):
+    """批量写入成员索引行（已存在的行忽略）"""
+    if rows:
+        session.execute(insert(GroupMember.__table__).on_conflict_do_nothing(), rows)
+
+
+@event.listens_for(Session, "after_flush")
+def index_new_members(session: Session, flush_context):
+    """
+    写入分组结果时，在同一个事务中写入其成员索引
+    同一次flush中的所有新分组（批量创建、合并提交）只执行一次批量写入
+    """
+    rows = []
+    for obj in session.new:
+        if isinstance(obj, GroupResult):
+            rows.extend(member_rows(obj, session))
+    insert_member_rows(session, rows)
+
+
+def build_member_index(engine: Engine, batch_size: int = 500) -> int:
+    """为已有的分组结果建立成员索引，返回处理的分组数量"""
+    indexed = 0
+    last_id = 0
+    while True:
+        with Session(engine) as session:
+            groups = session.exec(
+                select(GroupResult)
+                .where(GroupResult.id > last_id)
+                .order_by(GroupResult.id)
+                .limit(batch_size)
+            ).all()
+            if not groups:
+                return indexed
+            rows = []
+            for group in groups:
+                rows.extend(member_rows(group, session))
+            insert_member_rows(session, rows)
+            session.commit()
+            indexed += len(groups)
+            last_id = groups[-1].id
+
+
+def normalize_member_query(query: str) -> str:
+    """按创建分组时元素池的规范化方式处理查询的元素值"""
+    return unicodedata.normalize("NFKC", query).strip()
+
+
+def search_groups_by_member(
+    session: Session,
+    value: str,
+    limit: int = 20,
+    before_id: Optional[int] = None,
+) -> Tuple[List[Tuple], bool]:
+    """
+    查询包含指定元素的公开分组，按ID倒序
+    通过成员索引的主键(value, group_id)按范围读取，分页使用上一页最后一个ID
+    :return: ((id, group_name, is_public, created_at)列表, 是否还有更多结果)
+    """
+    statement = (
+        select(
+            GroupResult.id,
+            GroupResult.group_name,
+            GroupResult.is_public,
+            GroupResult.created_at,
+        )
+        .join(GroupMember, GroupMember.group_id == GroupResult.id)
+        .where(GroupMember.value == normalize_member_query(value))
+        .order_by(GroupMember.group_id.desc())
+    )
+    if before_id is not None:
+        statement = statement.where(GroupMember.group_id < before_id)
+    rows = session.exec(statement.limit(limit + 1)).all()
+    return list(rows[:limit]), len(rows) > limit
+
+
+if __name__ == "__main__":
+    # 为已有的分组结果建立成员索引：python search.py
+    from models import engine, init_db
+
+    init_db()
+    print(f"Indexed members of {build_member_index(engine)} groups")
@@ -0,0 +1,134 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+
+from attribute_index import (
+    AttributeFilterError,
+    AttributeIndex,
+    FilterClause,
+    IndexedElements,
+    parse_source_expression,
+    select_elements,
+)
+from datasources import LolHeroSource
+from element_group import Element
+
+
+class TestParseSourceExpression(unittest.TestCase):
+    def test_plain_name(self):
+        """测试不带过滤条件的数据源名称"""
+        source_filter = parse_source_expression("英雄联盟英雄数据")
+        self.assertEqual(source_filter.name, "英雄联盟英雄数据")
+        self.assertEqual(source_filter.clauses, ())
+
+    def test_clauses(self):
+        """测试 &、| 与 != 的解析"""
+        source_filter = parse_source_expression(
+            "英雄联盟英雄数据[tags=Mage | Assassin & partype!=Mana]"
+        )
+        self.assertEqual(source_filter.name, "英雄联盟英雄数据")
+        self.assertEqual(
+            source_filter.clauses,
+            (
+                FilterClause("tags", frozenset({"Mage", "Assassin"})),
+                FilterClause("partype", frozenset({"Mana"}), negate=True),
+            ),
+        )
+
+    def test_malformed(self):
+        """测试不合法的表达式"""
+        for expression in (
+            "英雄联盟英雄数据[tags=Mage",
+            "英雄联盟英雄数据[]",
+            "[tags=Mage]",
+            "英雄联盟英雄数据[tags]",
+            "英雄联盟英雄数据[=Mage]",
+            "英雄联盟英雄数据[tags=Mage|]",
+            "英雄联盟英雄数据[tags=Mage&]",
+        ):
+            with self.assertRaises(AttributeFilterError, msg=expression):
+                parse_source_expression(expression)
+
+
+class TestAttributeIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = AttributeIndex.build(
+            [
+                {"tags": ["Mage", "Assassin"], "partype": ["Mana"]},
+                {"tags": ["Tank"], "partype": ["Mana"]},
+                {"tags": ["Assassin"], "partype": ["Energy"]},
+                {"tags": ["Mage"]},
+            ]
+        )
+
+    def select(self, expression):
+        return self.index.select(parse_source_expression(f"s[{expression}]").clauses)
+
+    def test_select(self):
+        """测试按属性选出元素下标"""
+        self.assertEqual(self.select("tags=Mage"), [0, 3])
+        self.assertEqual(self.select("tags=Mage|Tank"), [0, 1, 3])
+        self.assertEqual(self.select("tags=Assassin&partype=Mana"), [0])
+        self.assertEqual(self.select("partype!=Mana"), [2, 3])
+        self.assertEqual(self.select("tags!=Mage|Tank"), [2])
+        self.assertEqual(self.select("tags=Support"), [])
+        self.assertEqual(self.index.select([]), [0, 1, 2, 3])
+
+    def test_unknown_attribute(self):
+        """测试不存在的属性"""
+        with self.assertRaises(AttributeFilterError):
+            self.select("role=Mage")
+
+    def test_postings_roundtrip(self):
+        """测试倒排表导出与重建"""
+        postings = self.index.to_postings()
+        self.assertEqual(postings["tags"]["Mage"], [0, 3])
+        rebuilt = AttributeIndex.from_postings(self.index.size, postings)
+        self.assertEqual(rebuilt.to_postings(), postings)
+        self.assertEqual(rebuilt.summary(), self.index.summary())
+        self.assertEqual(self.index.summary()["partype"], {"Mana": 2, "Energy": 1})
+        with self.assertRaises(ValueError):
+            AttributeIndex.from_postings(2, postings)
+
+    def test_select_elements(self):
+        """测试从附带索引的元素列表中选出元素"""
+        elements = IndexedElements(Element.from_strs("abcd"), self.index)
+        clauses = parse_source_expression("s[tags=Mage]").clauses
+        self.assertEqual(Element.to_str(select_elements(elements, clauses)), ["a", "d"])
+        self.assertIs(select_elements(elements, ()), elements)
+        with self.assertRaises(AttributeFilterError):
+            select_elements(Element.from_strs("abcd"), clauses)
+
+
+class TestChampionAttributes(unittest.TestCase):
+    def test_mapping(self):
+        """测试英雄数据到可过滤属性的映射"""
+        attributes = LolHeroSource.champion_attributes(
+            {
+                "id": "Ahri",
+                "name": "阿狸",
+                "title": "九尾妖狐",
+                "tags": ["Mage", "Assassin"],
+                "partype": "Mana",
+                "info": {"attack": 3, "difficulty": 5},
+            }
+        )
+        self.assertEqual(
+            attributes,
+            {
+                "tags": ["Mage", "Assassin"],
+                "id": ["Ahri"],
+                "partype": ["Mana"],
+                "difficulty": ["5"],
+            },
+        )
+        self.assertEqual(
+            LolHeroSource.champion_attributes({"name": "亚托克斯", "partype": ""}),
+            {"tags": []},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
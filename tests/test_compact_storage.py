@@ -0,0 +1,44 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import unittest
+from compact_storage import decode_groups, encode_groups, zstandard
+
+
+class TestCompactStorage(unittest.TestCase):
+    def test_roundtrip(self):
+        """测试编码后解码结果不变"""
+        groups = [["阿狸 九尾妖狐", "a", ""], [], ["a", "b\x00c", "😀"]]
+        for compression in ("none", "zlib"):
+            self.assertEqual(decode_groups(encode_groups(groups, compression)), groups)
+        self.assertEqual(decode_groups(encode_groups([])), [])
+
+    def test_index_width(self):
+        """测试不同字符串表大小下的下标类型"""
+        for size in (10, 300, 70000):
+            groups = [[str(i) for i in range(size)], ["0"]]
+            self.assertEqual(decode_groups(encode_groups(groups, "none")), groups)
+
+    def test_string_table_dedup(self):
+        """测试重复的字符串只保存一次"""
+        repeated = encode_groups([["很长的名字" * 10] * 100], "none")
+        single = encode_groups([["很长的名字" * 10]], "none")
+        self.assertLess(len(repeated) - len(single), 200)
+
+    def test_invalid(self):
+        """测试无效参数与数据"""
+        with self.assertRaises(ValueError):
+            encode_groups([["a"]], "gzip")
+        with self.assertRaises(ValueError):
+            decode_groups(b"XXXX\x01\x00B")
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_zstd(self):
+        """测试zstd压缩"""
+        groups = [["a", "b"], ["c"]]
+        self.assertEqual(decode_groups(encode_groups(groups, "zstd")), groups)
+
+
+if __name__ == "__main__":
+    unittest.main()
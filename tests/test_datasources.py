@@ -2,14 +2,33 @@ import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import asyncio
+import json
+import struct
+import tempfile
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, Mock
+from attribute_index import AttributeIndex, IndexedElements
 from datasources import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ElementCache,
     ElementSource,
     LolHeroSource,
+    element_cache,
+    fetch_json,
+    get_circuit_breaker_states,
+    read_snapshot,
+    write_snapshot,
     get_all_sources,
     get_source_by_display_name,
     get_elements_from_source,
+    get_elements_by_source,
+    get_elements_by_source_async,
+    get_elements_from_sources,
 )
 from element_group import Element
 from requests import RequestException
@@ -23,7 +42,13 @@ class TestElementSource(unittest.TestCase):
 
 
 class TestLolHeroSource(unittest.TestCase):
-    @patch("datasources.requests.get")
+    def setUp(self):
+        LolHeroSource.breaker().reset()
+        version_patch = patch.object(LolHeroSource, "api_version", "14.24.1")
+        version_patch.start()
+        self.addCleanup(version_patch.stop)
+
+    @patch("datasources.http_session.get")
     def test_get_elements_success(self, mock_get):
         """测试成功获取英雄数据"""
         # 模拟API响应
@@ -42,7 +67,7 @@ class TestLolHeroSource(unittest.TestCase):
         self.assertEqual(elements[0].value, "亚托克斯 暗裔剑魔")
         self.assertEqual(elements[1].value, "阿狸 九尾妖狐")
 
-    @patch("datasources.requests.get")
+    @patch("datasources.http_session.get")
     def test_get_elements_failure(self, mock_get):
         """测试获取英雄数据失败"""
         # 模拟API请求失败
@@ -54,9 +79,297 @@ class TestLolHeroSource(unittest.TestCase):
         # 验证返回空列表
         self.assertEqual(len(elements), 0)
         self.assertIsInstance(elements, list)
+        # 失败后按配置重试
+        self.assertEqual(mock_get.call_count, LolHeroSource.max_retries + 1)
+
+    @patch("datasources.http_session.get")
+    def test_get_elements_timeout(self, mock_get):
+        """测试请求带有超时参数"""
+        mock_get.return_value.json.return_value = {"data": {}}
+        LolHeroSource.get_elements()
+        self.assertEqual(mock_get.call_args.kwargs["timeout"], LolHeroSource.timeout)
+
+    @patch("datasources.get_newest_lol_api_version")
+    def test_resolve_api_version(self, mock_version):
+        """测试未解析版本时在获取数据前同步解析"""
+        mock_version.return_value = "15.1.1"
+        LolHeroSource.api_version = None
+        self.assertEqual(LolHeroSource.resolve_api_version(), "15.1.1")
+        self.assertEqual(LolHeroSource.resolve_api_version(), "15.1.1")
+        mock_version.assert_called_once()
+
+    @patch("datasources.get_newest_lol_api_version")
+    def test_refresh_version_expires_cache(self, mock_version):
+        """测试版本更新后旧版本缓存过期"""
+        element_cache.invalidate()
+        with patch.object(
+            LolHeroSource, "get_elements", return_value=[Element("旧版本英雄")]
+        ), patch.object(element_cache, "snapshot_dir", ""):
+            element_cache.get(LolHeroSource)
+            mock_version.return_value = "14.24.1"
+            LolHeroSource.refresh_version()
+            self.assertEqual(element_cache._entries[LolHeroSource].version, "14.24.1")
+            self.assertGreater(element_cache._entries[LolHeroSource].expires_at, 0)
+            mock_version.return_value = "15.1.1"
+            LolHeroSource.refresh_version()
+            self.assertEqual(LolHeroSource.api_version, "15.1.1")
+            self.assertEqual(element_cache._entries[LolHeroSource].expires_at, 0)
+            # 获取失败时保留当前版本
+            mock_version.return_value = None
+            LolHeroSource.refresh_version()
+            self.assertEqual(LolHeroSource.api_version, "15.1.1")
+        element_cache.invalidate()
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_open_after_threshold(self):
+        """测试连续失败达到阈值后熔断"""
+        breaker = CircuitBreaker("测试", failure_threshold=2, recovery_timeout=60)
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow_request())
+        self.assertEqual(breaker.status()["total_rejected"], 1)
+
+    def test_half_open_probe(self):
+        """测试恢复期后只放行一个探测请求"""
+        breaker = CircuitBreaker("测试", failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    @patch("datasources.http_session.get")
+    def test_fetch_json_fail_fast(self, mock_get):
+        """测试熔断打开后不再发起请求"""
+        mock_get.side_effect = RequestException("API请求失败")
+        breaker = CircuitBreaker("测试", failure_threshold=2, recovery_timeout=60)
+        with self.assertRaises(RequestException):
+            fetch_json("http://example.invalid", breaker, max_retries=5)
+        self.assertEqual(mock_get.call_count, 2)
+        with self.assertRaises(CircuitOpenError):
+            fetch_json("http://example.invalid", breaker)
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch("datasources.http_session.get")
+    def test_retry_budget(self, mock_get):
+        """测试时间预算耗尽后不再重试"""
+        mock_get.side_effect = RequestException("API请求失败")
+        breaker = CircuitBreaker("测试")
+        with self.assertRaises(RequestException):
+            fetch_json("http://example.invalid", breaker, max_retries=3, budget=0)
+        self.assertEqual(mock_get.call_count, 1)
+
+    def test_breaker_states(self):
+        """测试熔断器状态可被监控"""
+        LolHeroSource.breaker().reset()
+        states = get_circuit_breaker_states()
+        self.assertEqual(states["英雄联盟英雄数据"]["state"], CircuitBreaker.CLOSED)
+
+
+class TestElementCache(unittest.TestCase):
+    def make_source(self, ttl=None, delay=0.0):
+        """构造一个记录调用次数的数据源"""
+        calls = []
+
+        def get_elements():
+            calls.append(1)
+            time.sleep(delay)
+            return [Element(f"元素{len(calls)}")]
+
+        source = Mock()
+        source.display_name = "测试数据源"
+        source.cache_ttl = ttl
+        source.get_elements.side_effect = get_elements
+        return source, calls
+
+    def test_cache_hit(self):
+        """测试缓存未过期时不重复获取"""
+        cache = ElementCache(default_ttl=60)
+        source, calls = self.make_source()
+        self.assertEqual(cache.get(source)[0].value, "元素1")
+        self.assertEqual(cache.get(source)[0].value, "元素1")
+        self.assertEqual(len(calls), 1)
+
+    def test_stale_while_revalidate(self):
+        """测试缓存过期后返回旧数据并在后台刷新"""
+        cache = ElementCache()
+        source, calls = self.make_source(ttl=0, delay=0.05)
+        cache.get(source)
+        # 过期后立即返回旧数据，多次访问只触发一次后台刷新
+        self.assertEqual(cache.get(source)[0].value, "元素1")
+        self.assertEqual(cache.get(source)[0].value, "元素1")
+        time.sleep(0.2)
+        self.assertEqual(len(calls), 2)
+        source.cache_ttl = 60
+        cache.invalidate(source)
+        self.assertEqual(cache.get(source)[0].value, "元素3")
+
+    def test_concurrent_miss_single_fetch(self):
+        """测试并发缓存缺失时只获取一次"""
+        cache = ElementCache(default_ttl=60)
+        source, calls = self.make_source(delay=0.1)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get(source)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(r[0].value == "元素1" for r in results))
+
+    def test_failed_refresh_keeps_stale(self):
+        """测试刷新失败时保留旧数据"""
+        cache = ElementCache()
+        source, calls = self.make_source(ttl=0)
+        cache.get(source)
+        source.get_elements.side_effect = lambda: []
+        self.assertEqual(cache.get(source)[0].value, "元素1")
+        time.sleep(0.1)
+        self.assertEqual(cache.get(source)[0].value, "元素1")
+
+    def test_failed_first_fetch(self):
+        """测试首次获取失败时返回空列表"""
+        cache = ElementCache(default_ttl=60)
+        source, calls = self.make_source()
+        source.get_elements.side_effect = RuntimeError("获取失败")
+        self.assertEqual(cache.get(source), [])
+        source.get_elements.side_effect = lambda: []
+        self.assertEqual(cache.get(source), [])
+        self.assertIsNone(cache.get_nowait(source))
+
+    def test_copies_keep_attribute_index(self):
+        """测试返回的副本附带属性索引"""
+        cache = ElementCache(default_ttl=60)
+        source, _ = self.make_source()
+        index = AttributeIndex.build([{"tags": ["Mage"]}])
+        source.get_elements.side_effect = lambda: IndexedElements(
+            [Element("元素")], index
+        )
+        self.assertIsNone(cache.get_nowait(source))
+        for elements in (cache.get(source), cache.get_nowait(source)):
+            self.assertIsInstance(elements, IndexedElements)
+            self.assertIs(elements.attribute_index, index)
+        # 副本互不影响
+        elements.append(Element("其他"))
+        self.assertEqual(len(cache.get(source)), 1)
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "test.snap")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_roundtrip(self):
+        """测试快照写入与读取"""
+        values = ["亚托克斯 暗裔剑魔", "", "Ahri", "阿狸\n九尾妖狐"]
+        write_snapshot(self.path, "14.24.1", values)
+        self.assertEqual(read_snapshot(self.path), ("14.24.1", values, None))
+        postings = {"tags": {"Mage": [0, 3], "Tank": [1]}}
+        write_snapshot(self.path, "14.24.1", values, postings)
+        self.assertEqual(read_snapshot(self.path), ("14.24.1", values, postings))
+
+    def test_read_v1_snapshot(self):
+        """测试读取格式版本1（没有属性倒排表）的快照"""
+        values = ["亚托克斯 暗裔剑魔", "阿狸 九尾妖狐"]
+        version = b"14.24.1"
+        with open(self.path, "wb") as f:
+            f.write(struct.pack("<4sHHI", b"GTES", 1, len(version), len(values)))
+            f.write(version)
+            f.write(struct.pack(f"<{len(values)}I", *(len(v) for v in values)))
+            f.write("".join(values).encode("utf-8"))
+        self.assertEqual(read_snapshot(self.path), ("14.24.1", values, None))
+
+    def test_invalid_snapshot(self):
+        """测试不存在或损坏的快照"""
+        self.assertIsNone(read_snapshot(self.path))
+        with open(self.path, "wb") as f:
+            f.write(b"not a snapshot")
+        self.assertIsNone(read_snapshot(self.path))
+
+    def test_snapshot_keeps_attribute_index(self):
+        """测试快照保存属性索引，预热后仍可按属性过滤"""
+        source = self.make_source("1.0")
+        source.get_elements = classmethod(
+            lambda cls: IndexedElements(
+                Element.from_strs(["a", "b"]),
+                AttributeIndex.build([{"tags": ["Mage"]}, {"tags": ["Tank"]}]),
+            )
+        )
+        ElementCache(default_ttl=60, snapshot_dir=self.tmpdir.name).get(source)
+        warm_cache = ElementCache(default_ttl=60, snapshot_dir=self.tmpdir.name)
+        self.assertTrue(warm_cache.load_snapshot(source))
+        elements = warm_cache.get_nowait(source)
+        self.assertEqual(
+            elements.attribute_index.to_postings(),
+            {"tags": {"Mage": [0], "Tank": [1]}},
+        )
+
+    def make_source(self, version):
+        source = type(
+            "SnapshotSource",
+            (LolHeroSource,),
+            {"display_name": "快照测试", "api_version": version},
+        )
+        source.get_elements = classmethod(lambda cls: [Element(cls.api_version)])
+        return source
+
+    def test_refresh_writes_snapshot(self):
+        """测试成功获取后写入快照，并可用于预热新缓存"""
+        source = self.make_source("1.0")
+        cache = ElementCache(default_ttl=60, snapshot_dir=self.tmpdir.name)
+        cache.get(source)
+        warm_cache = ElementCache(default_ttl=60, snapshot_dir=self.tmpdir.name)
+        source.get_elements = classmethod(lambda cls: [])
+        self.assertTrue(warm_cache.load_snapshot(source))
+        self.assertEqual(warm_cache.get(source)[0].value, "1.0")
+
+    def test_unencodable_snapshot_does_not_block(self):
+        """测试快照写入出现非OSError异常时刷新仍然完成，之后的获取不会阻塞"""
+        source = self.make_source("1.0")
+        source.get_elements = classmethod(lambda cls: [Element("\ud800")])
+        cache = ElementCache(default_ttl=60, snapshot_dir=self.tmpdir.name)
+        self.assertEqual(cache.get(source)[0].value, "\ud800")
+        cache.invalidate(source)
+        self.assertEqual(cache.get(source)[0].value, "\ud800")
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+    def test_refresh_error_resolves_future(self):
+        """测试刷新过程中出现意外异常时等待者仍能获得结果"""
+        source = self.make_source("1.0")
+        cache = ElementCache(default_ttl=60)
+        with patch.object(cache, "_ttl_of", side_effect=RuntimeError("boom")):
+            self.assertEqual(cache.get(source), [])
+        self.assertEqual(cache.get(source)[0].value, "1.0")
+
+    def test_newer_version_invalidates(self):
+        """测试数据版本更新后快照视为过期并触发刷新"""
+        source = self.make_source("1.0")
+        ElementCache(snapshot_dir=self.tmpdir.name).get(source)
+        source.api_version = "2.0"
+        cache = ElementCache(default_ttl=60, snapshot_dir=self.tmpdir.name)
+        cache.load_snapshot(source)
+        # 旧快照立即可用，同时后台刷新为新版本数据
+        self.assertEqual(cache.get(source)[0].value, "1.0")
+        time.sleep(0.1)
+        self.assertEqual(cache.get(source)[0].value, "2.0")
 
 
 class TestDataSourceFunctions(unittest.TestCase):
+    def setUp(self):
+        element_cache.invalidate()
+
     def test_get_all_sources(self):
         """测试获取所有数据源"""
         sources = get_all_sources()
@@ -76,6 +389,7 @@ class TestDataSourceFunctions(unittest.TestCase):
         """测试从数据源获取元素"""
         # 模拟数据源
         mock_source = Mock()
+        mock_source.cache_ttl = None
         mock_source.get_elements.return_value = [Element("测试元素")]
         mock_get_source.return_value = mock_source
 
@@ -89,5 +403,95 @@ class TestDataSourceFunctions(unittest.TestCase):
         self.assertEqual(len(elements), 0)
 
 
+class _StubHandler(BaseHTTPRequestHandler):
+    """模拟ddragon的本地HTTP服务，每个请求延迟一段时间后返回"""
+
+    delay = 0.3
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        name = self.path.split("/")[2]
+        body = json.dumps({"data": {name: {"name": name, "title": "测试英雄"}}}).encode(
+            "utf-8"
+        )
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestConcurrentSources(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        # 继承LolHeroSource而非ElementSource，避免注册为全局数据源
+        cls.sources = {
+            name: type(
+                f"Stub{name}",
+                (LolHeroSource,),
+                {"display_name": name, "base_url": base_url, "api_version": name},
+            )
+            for name in ("stub1", "stub2", "stub3")
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        element_cache.invalidate()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        snapshot_patch = patch.object(element_cache, "snapshot_dir", tmpdir.name)
+        snapshot_patch.start()
+        self.addCleanup(snapshot_patch.stop)
+
+    def test_parallel_fetch_and_merge(self):
+        """测试多个数据源并发获取并按顺序合并"""
+        with patch("datasources.get_source_by_display_name", self.sources.get):
+            start = time.perf_counter()
+            elements = get_elements_from_sources(["stub1", "stub2", "stub3"])
+            elapsed = time.perf_counter() - start
+        self.assertEqual(
+            [e.value for e in elements],
+            ["stub1 测试英雄", "stub2 测试英雄", "stub3 测试英雄"],
+        )
+        # 三个数据源各耗时0.3秒，并发获取总耗时应接近单个数据源
+        self.assertLess(elapsed, 0.3 * 2)
+
+    def test_duplicate_sources_fetched_once(self):
+        """测试重复的数据源只获取一次"""
+        with patch("datasources.get_source_by_display_name", self.sources.get):
+            elements = get_elements_from_sources(["stub1", "stub1"])
+        self.assertEqual([e.value for e in elements], ["stub1 测试英雄"])
+
+    def test_elements_by_source(self):
+        """测试按数据源名称返回各自的元素"""
+        with patch("datasources.get_source_by_display_name", self.sources.get):
+            result = get_elements_by_source(["stub2", "stub1", "stub2"])
+        self.assertEqual(list(result), ["stub2", "stub1"])
+        self.assertEqual([e.value for e in result["stub1"]], ["stub1 测试英雄"])
+
+    def test_elements_by_source_async(self):
+        """测试异步获取：缓存缺失时并发获取，命中时直接返回"""
+        with patch("datasources.get_source_by_display_name", self.sources.get):
+            self.assertIsNone(element_cache.get_nowait(self.sources["stub1"]))
+            start = time.perf_counter()
+            result = asyncio.run(get_elements_by_source_async(["stub1", "stub2"]))
+            self.assertLess(time.perf_counter() - start, 0.3 * 2)
+            self.assertEqual([e.value for e in result["stub2"]], ["stub2 测试英雄"])
+            start = time.perf_counter()
+            result = asyncio.run(get_elements_by_source_async(["stub2", "stub1"]))
+            self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertEqual(list(result), ["stub2", "stub1"])
+
+
 if __name__ == "__main__":
     unittest.main()
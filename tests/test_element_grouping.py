@@ -4,8 +4,21 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import unittest
 
-from element_group import Element, Group
-from element_group import HotElementsCache
+from element_group import (
+    Element,
+    Group,
+    PoolBuilder,
+    _key_sample_numpy,
+    _key_sample_python,
+    choose_shuffle_version,
+    np,
+    reservoir_sample,
+    stable_permutation,
+    stable_sample,
+)
+from element_group import HotElementsCache, HotElementsSketch
+import random
+import threading
 
 
 class TestElement(unittest.TestCase):
@@ -19,6 +32,33 @@ class TestElement(unittest.TestCase):
         """测试无效的Element创建"""
         with self.assertRaises(ValueError):
             Element(123)  # 非字符串输入
+        with self.assertRaises(ValueError):
+            Element.from_strs(["a", ["b"]])
+
+    def test_value_equality(self):
+        """测试Element按值比较并共享同一对象"""
+        self.assertEqual(Element("阿狸"), Element("阿狸"))
+        self.assertIs(Element("阿狸"), Element("阿狸"))
+        self.assertNotEqual(Element("阿狸"), Element("亚索"))
+        self.assertEqual(len({Element("阿狸"), Element("阿狸")}), 1)
+        self.assertFalse(hasattr(Element("阿狸"), "__dict__"))
+
+    def test_from_strs(self):
+        """测试批量创建Element"""
+        elements = Element.from_strs(["a", "b", "a"])
+        self.assertEqual([e.value for e in elements], ["a", "b", "a"])
+        self.assertIs(elements[0], elements[2])
+
+    def test_to_str(self):
+        """测试Element转换为字符串"""
+        a, b, c = Element.from_strs(["a", "b", "c"])
+        self.assertEqual(Element.to_str(a), "a")
+        self.assertEqual(Element.to_str([a, b]), ["a", "b"])
+        self.assertEqual(Element.to_str([[a], [b, [c]], []]), [["a"], ["b", ["c"]], []])
+        with self.assertRaises(ValueError):
+            Element.to_str([a, "b"])
+        with self.assertRaises(ValueError):
+            Element.to_str("a")
 
 
 class TestGroup(unittest.TestCase):
@@ -68,6 +108,210 @@ class TestGroup(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.group.group_elements(mode="size", group_size=0)
 
+        with self.assertRaises(ValueError):
+            self.group.group_elements(engine="invalid_engine")
+
+    def test_python_engine(self):
+        """测试指定纯Python分组"""
+        groups = self.group.group_elements(mode="equal", group_num=3, engine="python")
+        self.assertEqual([len(g) for g in groups], [4, 3, 3])
+        self.assertCountEqual(sum(groups, []), self.elements)
+
+
+class TestSeededGrouping(unittest.TestCase):
+    def test_stable_permutation_golden(self):
+        """测试各版本打乱算法的输出固定不变（修改算法必须递增SHUFFLE_VERSION）"""
+        self.assertEqual(
+            stable_permutation(10, 42, version=1), [8, 3, 6, 5, 4, 0, 9, 2, 1, 7]
+        )
+        self.assertEqual(
+            stable_permutation(10, 42, version=2), [7, 2, 4, 5, 1, 9, 6, 3, 8, 0]
+        )
+        self.assertEqual(
+            stable_permutation(10, 42, version=3), [4, 1, 6, 2, 8, 3, 9, 0, 7, 5]
+        )
+        for version in (1, 2, 3):
+            self.assertEqual(stable_permutation(1, 42, version), [0])
+            self.assertEqual(stable_permutation(0, 42, version), [])
+        with self.assertRaises(ValueError):
+            stable_permutation(10, 42, version=999)
+        with self.assertRaises(ValueError):
+            stable_sample(10, 2, 42, version=999)
+
+    def test_stable_sample(self):
+        """测试抽样结果等于完整排列的前k个"""
+        for version in (1, 2, 3):
+            for n, k in ((0, 0), (1, 1), (10, 3), (100, 100), (5, 8)):
+                self.assertEqual(
+                    stable_sample(n, k, 9, version),
+                    stable_permutation(n, 9, version)[:k],
+                )
+
+    def test_stable_permutation_is_permutation(self):
+        """测试生成的是完整排列"""
+        for version in (1, 2, 3):
+            self.assertEqual(
+                sorted(stable_permutation(1000, 7, version)), list(range(1000))
+            )
+            self.assertNotEqual(
+                stable_permutation(1000, 7, version),
+                stable_permutation(1000, 8, version),
+            )
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_key_sample_numpy_matches_python(self):
+        """测试版本3的NumPy实现与纯Python实现结果完全一致"""
+        for n, k in ((0, 0), (1, 1), (10, 3), (2000, 2000), (3000, 17)):
+            for seed in (0, 42, 2**63 - 1, 2**64 - 1):
+                self.assertEqual(
+                    _key_sample_numpy(n, k, seed), _key_sample_python(n, k, seed)
+                )
+
+    def test_choose_shuffle_version(self):
+        """测试只抽取少量元素时使用版本2，抽取较多元素且安装了NumPy时使用版本3"""
+        self.assertEqual(choose_shuffle_version(100_000, 20), 2)
+        self.assertEqual(choose_shuffle_version(100, 100), 2)
+        self.assertEqual(
+            choose_shuffle_version(100_000, 100_000), 2 if np is None else 3
+        )
+
+    def test_seeded_grouping(self):
+        """测试相同种子分组结果一致，且不受random模块状态影响"""
+        group = Group(Element.from_strs([str(i) for i in range(20)]))
+        first = group.group_elements(mode="size", group_num=3, group_size=4, seed=1)
+        random.seed(123)
+        second = group.group_elements(mode="size", group_num=3, group_size=4, seed=1)
+        self.assertEqual(first, second)
+        self.assertEqual([len(g) for g in first], [4, 4, 4])
+
+
+class TestSampling(unittest.TestCase):
+    def test_size_mode_samples(self):
+        """测试按量分组只抽取需要的元素且不重复"""
+        group = Group(Element.from_strs([str(i) for i in range(1000)]))
+        for engine in ("python", "auto"):
+            groups = group.group_elements(
+                mode="size", group_num=3, group_size=5, engine=engine
+            )
+            self.assertEqual([len(g) for g in groups], [5, 5, 5])
+            self.assertEqual(len(set(sum(groups, []))), 15)
+
+    def test_reservoir_sample(self):
+        """测试蓄水池抽样"""
+        rng = random.Random(1)
+        sample = reservoir_sample(iter(range(10000)), 10, rng)
+        self.assertEqual(len(set(sample)), 10)
+        self.assertTrue(all(0 <= value < 10000 for value in sample))
+        self.assertCountEqual(reservoir_sample(range(3), 5, rng), [0, 1, 2])
+        self.assertEqual(reservoir_sample(range(3), 0, rng), [])
+
+    def test_reservoir_sample_uniform(self):
+        """测试每个元素被抽中的概率相同"""
+        rng = random.Random(2)
+        counts = [0] * 10
+        for _ in range(20000):
+            for value in reservoir_sample(range(10), 3, rng):
+                counts[value] += 1
+        for count in counts:
+            self.assertAlmostEqual(count / 20000, 0.3, delta=0.02)
+
+
+class TestPoolBuilder(unittest.TestCase):
+    def test_normalize_and_dedupe(self):
+        """测试规范化后去重并保留首次出现的顺序"""
+        builder = PoolBuilder()
+        self.assertEqual(builder.add([" 阿狸", "阿狸", "Ａhri", "", "  "]), 2)
+        self.assertEqual(builder.add(["Ahri", "ahri", "x"]), 2)
+        self.assertEqual(builder.pool, ["阿狸", "Ahri", "ahri", "x"])
+        self.assertEqual(builder.dropped, 4)
+
+    def test_casefold(self):
+        """测试忽略大小写去重时保留首次出现的写法"""
+        builder = PoolBuilder(casefold=True)
+        builder.add(["Ahri", "AHRI", "ahri", "Straße", "STRASSE"])
+        self.assertEqual(builder.pool, ["Ahri", "Straße"])
+        self.assertEqual(builder.dropped, 3)
+
+    def test_no_dedupe(self):
+        """测试关闭去重时按原样合并"""
+        builder = PoolBuilder(dedupe=False)
+        self.assertEqual(builder.add([" a", "a", ""]), 3)
+        self.assertEqual(builder.add(iter(["a"])), 1)
+        self.assertEqual(builder.pool, [" a", "a", "", "a"])
+        self.assertEqual(builder.dropped, 0)
+
+
+class TestIterGroups(unittest.TestCase):
+    def setUp(self):
+        self.group = Group(Element.from_strs([str(i) for i in range(20)]))
+
+    def test_same_as_group_elements_with_seed(self):
+        """测试指定种子时逐组生成的结果与group_elements一致"""
+        for kwargs in (
+            dict(mode="equal", group_num=3, seed=9),
+            dict(mode="size", group_num=2, group_size=6, seed=9),
+        ):
+            self.assertEqual(
+                list(self.group.iter_groups(**kwargs)),
+                self.group.group_elements(**kwargs),
+            )
+
+    def test_partition(self):
+        """测试不指定种子与不打乱时的分组结果"""
+        groups = list(self.group.iter_groups(mode="equal", group_num=3))
+        self.assertEqual([len(g) for g in groups], [7, 7, 6])
+        self.assertCountEqual(sum(groups, []), self.group.pool)
+        ordered = list(self.group.iter_groups(group_num=2, randomize=False))
+        self.assertEqual(sum(ordered, []), self.group.pool)
+        self.assertEqual(list(Group().iter_groups()), [])
+
+    def test_lazy(self):
+        """测试逐组生成且参数在调用时立即校验"""
+        groups = self.group.iter_groups(mode="equal", group_num=4, seed=1)
+        self.assertEqual(len(next(groups)), 5)
+        with self.assertRaises(ValueError):
+            self.group.iter_groups(mode="size", group_size=None)
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestNumpyGrouping(unittest.TestCase):
+    def setUp(self):
+        """测试前置准备"""
+        self.elements = Element.from_strs([str(i) for i in range(1000)])
+        self.group = Group(self.elements)
+
+    def test_same_shape_as_python(self):
+        """测试NumPy分组与纯Python分组的结果结构一致"""
+        for kwargs in (
+            dict(mode="equal", group_num=7),
+            dict(mode="size", group_num=3, group_size=100),
+            dict(mode="size", group_num=20, group_size=300),
+        ):
+            python_groups = self.group.group_elements(engine="python", **kwargs)
+            numpy_groups = self.group.group_elements(engine="numpy", **kwargs)
+            self.assertEqual(
+                [len(g) for g in python_groups], [len(g) for g in numpy_groups]
+            )
+
+    def test_elements_preserved(self):
+        """测试分组后元素不重复不遗漏，且原元素池不变"""
+        groups = self.group.group_elements(mode="equal", group_num=3, engine="numpy")
+        self.assertCountEqual(sum(groups, []), self.elements)
+        self.assertEqual(self.group.pool, self.elements)
+        self.assertNotEqual(sum(groups, []), self.elements)
+
+    def test_reproducible_with_seed(self):
+        """测试random.seed可以固定NumPy分组结果"""
+        random.seed(42)
+        first = self.group.group_elements(engine="numpy")
+        random.seed(42)
+        self.assertEqual(first, self.group.group_elements(engine="numpy"))
+
+    def test_auto_engine(self):
+        """测试自动选择分组算法"""
+        self.assertTrue(self.group._use_numpy("auto"))
+        self.assertFalse(Group(self.elements[:10])._use_numpy("auto"))
+
 
 class TestHotElementsCache(unittest.TestCase):
     def setUp(self):
@@ -141,5 +385,80 @@ class TestHotElementsCache(unittest.TestCase):
         self.assertIn(self.elements[2], hot_elements)
 
 
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestHotElementsSketch(unittest.TestCase):
+    def setUp(self):
+        """测试前置准备"""
+        self.clock = FakeClock()
+        self.sketch = HotElementsSketch(capacity=3, half_life=10, clock=self.clock)
+
+    def test_rank_by_frequency(self):
+        """测试按出现频率排序"""
+        self.sketch.add_elements(Element.from_strs(["a", "b", "b", "c", "c", "c"]))
+        self.assertEqual(
+            Element.to_str(self.sketch.get_hot_elements()), ["c", "b", "a"]
+        )
+        self.assertEqual(Element.to_str(self.sketch.get_hot_elements(k=1)), ["c"])
+
+    def test_time_decay(self):
+        """测试旧的出现随时间衰减"""
+        self.sketch.add_element(Element("旧"), count=3)
+        self.clock.now = 20  # 两个半衰期后，3次衰减为0.75次
+        self.sketch.add_element(Element("新"))
+        scores = dict(self.sketch.get_hot_scores())
+        self.assertEqual(Element.to_str(self.sketch.get_hot_elements()), ["新", "旧"])
+        self.assertAlmostEqual(scores[Element("旧")], 0.75)
+        self.assertAlmostEqual(scores[Element("新")], 1.0)
+
+    def test_rescale(self):
+        """测试长时间运行后权重重新归一化"""
+        self.sketch.add_element(Element("a"))
+        self.clock.now = 10 * 100
+        self.sketch.add_element(Element("b"))
+        scores = dict(self.sketch.get_hot_scores())
+        self.assertAlmostEqual(scores[Element("b")], 1.0)
+        self.assertLess(scores[Element("a")], 1e-20)
+
+    def test_bounded_memory(self):
+        """测试计数器数量有上限且高频元素不会被挤出"""
+        for i in range(1000):
+            self.sketch.add_element(Element("热点"))
+            self.sketch.add_element(Element(f"冷门{i}"))
+        self.assertLessEqual(len(self.sketch._counters), 2 * self.sketch.capacity)
+        self.assertEqual(self.sketch.get_hot_elements(k=1), [Element("热点")])
+
+    def test_thread_safety(self):
+        """测试多线程并发更新"""
+        sketch = HotElementsSketch(capacity=10)
+        threads = [
+            threading.Thread(
+                target=lambda: [sketch.add_element(Element("x")) for _ in range(1000)]
+            )
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertAlmostEqual(sketch.get_hot_scores(k=1)[0][1], 8000, delta=1)
+
+    def test_invalid(self):
+        """测试无效参数"""
+        with self.assertRaises(ValueError):
+            HotElementsSketch(capacity=0)
+        with self.assertRaises(TypeError):
+            self.sketch.add_element("a")
+        self.sketch.add_element(Element("a"))
+        self.sketch.clear()
+        self.assertEqual(self.sketch.get_hot_elements(), [])
+
+
 if __name__ == "__main__":
     unittest.main()
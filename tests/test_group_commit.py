@@ -0,0 +1,73 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tempfile
+import threading
+import unittest
+from sqlmodel import Session, SQLModel, select
+from group_commit import GroupCommitQueue
+from models import GroupResult, create_db_engine
+
+
+class TestGroupCommitQueue(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.engine = create_db_engine(
+            f"sqlite:///{os.path.join(tmpdir.name, 'test.db')}"
+        )
+        self.addCleanup(self.engine.dispose)
+        SQLModel.metadata.create_all(self.engine)
+        self.queue = GroupCommitQueue(self.engine, max_batch=16, max_delay=0.01)
+
+    def test_sync_write_without_thread(self):
+        """测试后台线程未运行时直接写入"""
+        row = GroupResult(group_name="同步")
+        self.assertEqual(self.queue.insert(row), row.id)
+        self.assertEqual(self.queue.commits, 1)
+
+    def test_concurrent_group_commit(self):
+        """测试并发提交的行合并写入，并各自得到分配的ID"""
+        self.queue.start()
+        ids = {}
+
+        def create(i):
+            ids[i] = self.queue.insert(GroupResult(group_name=f"分组{i}"), timeout=5)
+
+        threads = [threading.Thread(target=create, args=(i,)) for i in range(40)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.queue.stop()
+        self.assertEqual(len(set(ids.values())), 40)
+        self.assertLess(self.queue.commits, 40)
+        self.assertEqual(self.queue.rows, 40)
+        with Session(self.engine) as session:
+            for i, group_id in ids.items():
+                self.assertEqual(
+                    session.get(GroupResult, group_id).group_name, f"分组{i}"
+                )
+
+    def test_failed_row_isolated(self):
+        """测试批量写入失败时只有出错的行得到异常"""
+        existing = GroupResult(group_name="已存在")
+        self.queue.insert(existing)
+        self.queue.start()
+        futures = [
+            self.queue.submit(GroupResult(group_name="正常1")),
+            self.queue.submit(GroupResult(id=existing.id, group_name="重复ID")),
+            self.queue.submit(GroupResult(group_name="正常2")),
+        ]
+        self.queue.stop()
+        self.assertIsInstance(futures[0].result(), int)
+        with self.assertRaises(Exception):
+            futures[1].result()
+        self.assertIsInstance(futures[2].result(), int)
+        with Session(self.engine) as session:
+            self.assertEqual(len(session.exec(select(GroupResult)).all()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
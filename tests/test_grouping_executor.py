@@ -0,0 +1,88 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import asyncio
+import unittest
+import anyio.to_thread
+from fastapi.concurrency import run_in_threadpool
+from element_group import Element, Group
+from grouping_executor import GroupingScheduler
+
+
+class TestGroupingScheduler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.scheduler = GroupingScheduler(
+            process_threshold=100, max_workers=1, max_concurrency=1
+        )
+        cls.pool = Element.from_strs([f"成员{i}" for i in range(500)])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.scheduler.shutdown()
+
+    def group(self, elements, **kwargs):
+        return asyncio.run(self.scheduler.group_elements(elements, **kwargs))
+
+    def test_inline_small_jobs(self):
+        """测试元素数量小于阈值时在当前进程中分组"""
+        inline_total = self.scheduler.status()["inline_total"]
+        result = self.group(self.pool[:10], group_num=3)
+        self.assertEqual(
+            sorted(sum(result, [])), sorted(Element.to_str(self.pool[:10]))
+        )
+        self.assertEqual(self.scheduler.status()["inline_total"], inline_total + 1)
+
+    def test_offloaded_result_matches_inline(self):
+        """测试进程池分组与当前进程分组的结果一致"""
+        for kwargs in (
+            dict(mode="equal", group_num=7, seed=42),
+            dict(mode="size", group_num=3, group_size=50, seed=7),
+        ):
+            expected = Element.to_str(Group(self.pool).group_elements(**kwargs))
+            self.assertEqual(self.group(self.pool, **kwargs), expected)
+        status = self.scheduler.status()
+        self.assertGreaterEqual(status["offloaded_total"], 2)
+        self.assertEqual((status["queued"], status["running"]), (0, 0))
+
+    def test_offloaded_without_seed(self):
+        """测试不指定种子时进程池分组结果为元素池的一个划分"""
+        result = self.group(self.pool, group_num=4)
+        self.assertEqual([len(group) for group in result], [125] * 4)
+        self.assertEqual(sorted(sum(result, [])), sorted(Element.to_str(self.pool)))
+
+    def test_invalid_params(self):
+        """测试分组参数在提交进程池前校验"""
+        with self.assertRaises(ValueError):
+            self.group(self.pool, mode="size", group_size=None)
+
+    def test_queue_does_not_block_threads(self):
+        """测试超出并发上限的任务在事件循环中排队，排队期间线程池仍可执行其他任务"""
+
+        async def run():
+            limiter = anyio.to_thread.current_default_thread_limiter()
+            limiter.total_tokens = 1
+            jobs = [
+                asyncio.ensure_future(
+                    self.scheduler.group_elements(self.pool, group_num=2, seed=i)
+                )
+                for i in range(4)
+            ]
+            await asyncio.sleep(0)
+            queued = self.scheduler.status()["queued"]
+            # 唯一的线程池线程未被排队的任务占用
+            await asyncio.wait_for(run_in_threadpool(lambda: None), timeout=5)
+            results = await asyncio.gather(*jobs)
+            return queued, results
+
+        queued, results = asyncio.run(run())
+        self.assertEqual(queued, 3)
+        self.assertEqual(len(results), 4)
+        status = self.scheduler.status()
+        self.assertGreaterEqual(status["max_queued"], 3)
+        self.assertEqual((status["queued"], status["running"]), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tempfile
+import unittest
+from unittest.mock import patch
+from sqlmodel import SQLModel, Session, create_engine, select
+from element_group import Element, HotElementsSketch
+from hot_elements import HotElementsRecorder
+from models import HotElementStat
+
+
+class TestHotElementsRecorder(unittest.TestCase):
+    def setUp(self):
+        """测试前置准备：两个进程共用同一个数据库文件"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(self.tmpdir.name, 'test.db')}"
+        self.engine = create_engine(url)
+        SQLModel.metadata.create_all(self.engine)
+        self.workers = [
+            HotElementsRecorder(HotElementsSketch(capacity=10), self.engine)
+            for _ in range(2)
+        ]
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def stats(self):
+        with Session(self.engine) as session:
+            rows = session.exec(select(HotElementStat)).all()
+            return {row.value: row.score for row in rows}
+
+    def test_record_is_buffered(self):
+        """测试记录时只更新内存，不写数据库"""
+        self.workers[0].record(Element.from_strs(["a", "b"]))
+        self.assertEqual(self.stats(), {})
+        self.assertEqual(len(self.workers[0].sketch.get_hot_elements()), 2)
+        self.workers[0].flush()
+        self.assertEqual(self.stats(), {"a": 1.0, "b": 1.0})
+
+    def test_aggregate_across_workers(self):
+        """测试多个进程的统计汇总"""
+        self.workers[0].record(Element.from_strs(["a", "b"]))
+        self.workers[1].record(Element.from_strs(["b", "c", "c"]))
+        for worker in self.workers:
+            worker.flush()
+        stats = self.stats()
+        self.assertEqual(set(stats), {"a", "b", "c"})
+        self.assertAlmostEqual(stats["b"], 2.0, places=3)
+        self.assertAlmostEqual(stats["c"], 2.0, places=3)
+        self.workers[0].load()
+        scores = dict(self.workers[0].sketch.get_hot_scores())
+        self.assertAlmostEqual(scores[Element("b")], 2.0, places=3)
+        self.assertAlmostEqual(scores[Element("c")], 2.0, places=3)
+
+    def test_load_keeps_pending(self):
+        """测试刷新本地统计时保留尚未写入的缓冲"""
+        self.workers[1].record([Element("a")])
+        self.workers[1].flush()
+        self.workers[0].record([Element("b")])
+        self.workers[0].load()
+        self.assertEqual(
+            set(self.workers[0].sketch.get_hot_elements()), {Element("a"), Element("b")}
+        )
+
+    def test_restore_on_boot(self):
+        """测试重启后从数据库恢复统计"""
+        self.workers[0].record([Element("a")] * 3)
+        self.workers[0].stop()
+        restarted = HotElementsRecorder(HotElementsSketch(capacity=10), self.engine)
+        restarted.load()
+        self.assertEqual(restarted.sketch.get_hot_elements(), [Element("a")])
+
+    def test_decay_and_prune(self):
+        """测试数据库中的统计随时间衰减并清理"""
+        half_life = self.workers[0].sketch.half_life
+        with patch("hot_elements.time.time", return_value=1000.0):
+            self.workers[0].record([Element("a")] * 4)
+            self.workers[0].flush()
+        with patch("hot_elements.time.time", return_value=1000.0 + half_life):
+            self.workers[0].record([Element("a")])
+            self.workers[0].flush()
+        self.assertAlmostEqual(self.stats()["a"], 3.0)
+        with patch("hot_elements.time.time", return_value=1000.0 + 20 * half_life):
+            self.workers[0].record([Element("b")])
+            self.workers[0].flush()
+        self.assertEqual(self.stats(), {"b": 1.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tempfile
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+import datasources
+import main
+import models
+
+
+class TestApi(unittest.TestCase):
+    """接口测试，所有使用数据库的模块改为使用临时数据库"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        engine = models.create_db_engine(
+            f"sqlite:///{os.path.join(cls.tmpdir.name, 'test.db')}"
+        )
+        cls.patches = [
+            patch.object(models, "engine", engine),
+            patch.object(main, "engine", engine),
+            patch.object(main.group_commit_queue, "engine", engine),
+            patch.object(main.hot_element_recorder, "engine", engine),
+            patch.object(main.pool_template_store, "engine", engine),
+            patch.object(datasources.element_cache, "snapshot_dir", None),
+        ]
+        for patcher in cls.patches:
+            patcher.start()
+        cls.engine = engine
+        cls.client = TestClient(main.app)
+        cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+        for patcher in reversed(cls.patches):
+            patcher.stop()
+        cls.engine.dispose()
+        cls.tmpdir.cleanup()
+
+    def create(self, **kwargs):
+        params = dict(group_name="测试", source_elements=list("abcdef"))
+        params.update(kwargs)
+        response = self.client.post("/group_result", json=params).json()
+        self.assertTrue(response["success"], response)
+        return response["data"]
+
+    def test_latest_groups_datetime_format(self):
+        """测试缓存中新创建的分组与数据库中查询到的分组时间格式一致"""
+        main.latest_groups_cache.invalidate()
+        self.create()
+        self.client.get("/latest_groups")
+        self.create()
+        groups = self.client.get("/latest_groups").json()["data"]["groups"]
+        self.assertGreaterEqual(len(groups), 2)
+        self.assertTrue(all("+" not in g["created_at"] for g in groups))
+        self.assertTrue(all(not g["created_at"].endswith("Z") for g in groups))
+
+    def test_reroll_uses_built_pool(self):
+        """测试重新分组使用规范化去重后的元素池，而不是原始的source_elements"""
+        with patch.object(main, "GROUP_STORAGE_MODE", "full"):
+            parent = self.create(
+                source_elements=["a", "a", " b", "c", "d", "e"],
+                group_mode="size",
+                group_size=2,
+                group_count=2,
+            )
+            self.assertEqual(parent["dropped_elements"], 1)
+            for seed in range(5):
+                response = self.client.post(
+                    f"/group_result/{parent['id']}/reroll",
+                    json={"group_count": 3, "seed": seed},
+                ).json()
+                self.assertTrue(response["success"], response)
+                child = response["data"]
+                values = sum(child["group_result"], [])
+                self.assertEqual(len(values), len(set(values)))
+                self.assertTrue(set(values) <= {"a", "b", "c", "d", "e"})
+                self.assertEqual(child["parent_id"], parent["id"])
+                self.assertEqual(child["group_count"], 3)
+        fetched = self.client.get(
+            "/group_result", params={"group_id": child["id"]}
+        ).json()["data"]
+        self.assertEqual(fetched["group_result"], child["group_result"])
+        self.assertEqual(fetched["parent_id"], parent["id"])
+
+    def test_reroll_equal_mode(self):
+        """测试均等分组重新分组后包含原分组的所有元素"""
+        parent = self.create(group_count=2)
+        child = self.client.post(f"/group_result/{parent['id']}/reroll").json()["data"]
+        self.assertEqual(child["group_count"], 2)
+        self.assertCountEqual(sum(child["group_result"], []), list("abcdef"))
+
+    def test_reroll_params(self):
+        """测试重新分组的参数校验、密码与不存在的分组"""
+        parent = self.create(is_public=False, private_password="pw")
+        url = f"/group_result/{parent['id']}/reroll"
+        for params in ({"group_count": 0}, {"group_size": 0}):
+            self.assertEqual(
+                self.client.post(url, json=dict(params, password="pw")).status_code,
+                422,
+            )
+        self.assertFalse(self.client.post(url).json()["success"])
+        response = self.client.post(url, json={"password": "pw"}).json()
+        self.assertTrue(response["success"])
+        self.assertFalse(response["data"]["is_public"])
+        self.assertFalse(
+            self.client.post("/group_result/999999/reroll").json()["success"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tempfile
+import unittest
+from sqlalchemy import inspect, text
+from sqlmodel import Session, SQLModel, create_engine
+from compact_storage import encode_groups
+from element_group import Element, Group
+from models import (
+    GroupMode,
+    GroupResult,
+    create_db_engine,
+    migrate_db,
+    pack_existing_results,
+)
+
+
+class TestGroupResult(unittest.TestCase):
+    def make_result(self, **kwargs):
+        params = dict(
+            group_name="测试",
+            group_mode=GroupMode.SIZE,
+            group_size=2,
+            group_count=2,
+            source_elements=[str(i) for i in range(10)],
+        )
+        params.update(kwargs)
+        return GroupResult(**params)
+
+    def test_stored_result(self):
+        """测试完整保存的分组结果直接返回"""
+        row = self.make_result(group_result=[["1"], ["2"]], seed=1)
+        self.assertEqual(row.resolve_group_result(), [["1"], ["2"]])
+
+    def test_recompute_by_seed(self):
+        """测试按种子保存的分组结果重新计算"""
+        pool = Element.from_strs([str(i) for i in range(10)])
+        expected = Element.to_str(
+            Group(pool).group_elements(
+                mode="size", group_num=2, group_size=2, seed=5, shuffle_version=1
+            )
+        )
+        row = self.make_result(seed=5, shuffle_version=1)
+        self.assertEqual(row.resolve_group_result(), expected)
+
+    def test_packed_result(self):
+        """测试紧凑格式保存的分组结果"""
+        row = self.make_result(group_result_packed=encode_groups([["a"], ["b"]]))
+        self.assertEqual(row.resolve_group_result(), [["a"], ["b"]])
+
+    def test_recompute_with_pool_elements(self):
+        """测试元素池与source_elements不同时使用pool_elements重新计算"""
+        row = self.make_result(
+            source_elements=["a"], pool_elements=["a", "b", "c", "d"], seed=5
+        )
+        self.assertCountEqual(sum(row.resolve_group_result(), []), ["a", "b", "c", "d"])
+
+    def test_iter_group_result(self):
+        """测试逐组获取的结果与完整结果一致"""
+        for row in (
+            self.make_result(seed=5, shuffle_version=1),
+            self.make_result(group_result=[["1"], ["2"]]),
+            self.make_result(group_result_packed=encode_groups([["a"], ["b"]])),
+        ):
+            self.assertEqual(list(row.iter_group_result()), row.resolve_group_result())
+
+    def test_stored_pool(self):
+        """测试还原重新分组使用的元素池"""
+        # 保存了元素池时在任何存储方式下都优先使用
+        row = self.make_result(source_elements=["a"], pool_elements=["a", "b"], seed=5)
+        self.assertEqual(row.stored_pool(), ["a", "b"])
+        row = self.make_result(
+            group_result=[["a", "b"], ["c", "d"]],
+            data_source=["英雄联盟英雄数据"],
+            pool_elements=["a", "b", "c", "d", "e"],
+        )
+        self.assertEqual(row.stored_pool(), ["a", "b", "c", "d", "e"])
+        row = self.make_result(
+            group_mode=GroupMode.EQUAL, group_result=[["b", "c"], ["a"]]
+        )
+        self.assertEqual(row.stored_pool(), ["b", "c", "a"])
+        # 旧版本的按量分组结果按默认方式规范化声明的元素池
+        row = self.make_result(
+            source_elements=["a", "a", " b", "c"], group_result=[["a"], ["c"]]
+        )
+        self.assertEqual(row.stored_pool(), ["a", "b", "c"])
+        row.data_source = ["英雄联盟英雄数据"]
+        self.assertIsNone(row.stored_pool())
+
+
+class TestMigrateDb(unittest.TestCase):
+    def test_add_missing_columns(self):
+        """测试为旧表补充新增的列"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine = create_engine(f"sqlite:///{os.path.join(tmpdir, 'test.db')}")
+            with engine.begin() as conn:
+                conn.execute(
+                    text(
+                        "CREATE TABLE groupresult (id INTEGER PRIMARY KEY, "
+                        "group_name VARCHAR NOT NULL)"
+                    )
+                )
+            SQLModel.metadata.create_all(engine)
+            migrate_db(engine)
+            columns = {c["name"] for c in inspect(engine).get_columns("groupresult")}
+            self.assertTrue({"seed", "shuffle_version", "pool_elements"} <= columns)
+            engine.dispose()
+
+
+class TestPackExistingResults(unittest.TestCase):
+    def test_pack(self):
+        """测试将已有的JSON分组结果迁移为紧凑格式"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            engine = create_engine(f"sqlite:///{os.path.join(tmpdir, 'test.db')}")
+            SQLModel.metadata.create_all(engine)
+            results = [[[f"{i}-a"], [f"{i}-b"]] for i in range(5)]
+            with Session(engine) as session:
+                for result in results:
+                    session.add(GroupResult(group_name="测试", group_result=result))
+                session.add(GroupResult(group_name="按种子保存", seed=1))
+                session.commit()
+            self.assertEqual(pack_existing_results(engine, batch_size=2), 5)
+            self.assertEqual(pack_existing_results(engine, batch_size=2), 0)
+            with Session(engine) as session:
+                rows = [session.get(GroupResult, i + 1) for i in range(5)]
+                self.assertTrue(all(row.group_result == [] for row in rows))
+                self.assertEqual([row.resolve_group_result() for row in rows], results)
+            engine.dispose()
+
+
+class TestCreateDbEngine(unittest.TestCase):
+    def query_pragmas(self, engine):
+        with engine.connect() as conn:
+            return (
+                conn.execute(text("PRAGMA journal_mode")).scalar(),
+                conn.execute(text("PRAGMA busy_timeout")).scalar(),
+            )
+
+    def test_performance_profile(self):
+        """测试performance配置为SQLite文件数据库启用WAL与busy_timeout"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            url = f"sqlite:///{os.path.join(tmpdir, 'test.db')}"
+            engine = create_db_engine(url, profile="performance")
+            self.assertEqual(self.query_pragmas(engine), ("wal", 5000))
+            engine.dispose()
+            engine = create_db_engine(url.replace("test", "default"), profile="default")
+            self.assertEqual(self.query_pragmas(engine)[0], "delete")
+            engine.dispose()
+
+    def test_memory_database(self):
+        """测试内存数据库不应用performance配置"""
+        engine = create_db_engine("sqlite://", profile="performance")
+        self.assertEqual(self.query_pragmas(engine)[0], "memory")
+
+
+if __name__ == "__main__":
+    unittest.main()
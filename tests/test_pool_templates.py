@@ -0,0 +1,105 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import hashlib
+import tempfile
+import unittest
+from sqlmodel import Session, SQLModel, func, select
+from models import GroupMode, GroupResult, PoolTemplate, create_db_engine
+from pool_templates import PoolTemplateNotFoundError, PoolTemplateStore, pool_hash
+from search import group_members
+
+
+class TestPoolTemplateStore(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.engine = create_db_engine(
+            f"sqlite:///{os.path.join(tmpdir.name, 'test.db')}"
+        )
+        self.addCleanup(self.engine.dispose)
+        SQLModel.metadata.create_all(self.engine)
+        self.store = PoolTemplateStore(self.engine, max_elements=5)
+
+    def count_rows(self):
+        with Session(self.engine) as session:
+            return session.exec(select(func.count()).select_from(PoolTemplate)).one()
+
+    def test_pool_hash(self):
+        """测试内容哈希与文档描述的计算方式一致"""
+        expected = hashlib.sha256('["阿狸","盖伦"]'.encode("utf-8")).hexdigest()
+        self.assertEqual(pool_hash(["阿狸", "盖伦"]), expected)
+        self.assertNotEqual(pool_hash(["盖伦", "阿狸"]), expected)
+
+    def test_put_dedupe(self):
+        """测试相同内容只保存一份"""
+        first = self.store.put(["a", "b"])
+        self.assertEqual(PoolTemplateStore(self.engine).put(["a", "b"]), first)
+        self.assertEqual(self.count_rows(), 1)
+        self.store.put(["b", "a"])
+        self.assertEqual(self.count_rows(), 2)
+
+    def test_get(self):
+        """测试从缓存与数据库读取模板"""
+        template_hash = self.store.put(["a", "b", "c"])
+        self.assertEqual(self.store.get(template_hash), ("a", "b", "c"))
+        self.assertEqual(
+            PoolTemplateStore(self.engine).get(template_hash), ("a", "b", "c")
+        )
+        with self.assertRaises(PoolTemplateNotFoundError):
+            self.store.get(pool_hash(["x"]))
+
+    def test_bounded_cache(self):
+        """测试缓存的元素总数不超过上限"""
+        first = self.store.put(["a", "b", "c"])
+        self.store.put(["d", "e"])
+        self.assertEqual(self.store._cached_elements, 5)
+        self.store.put(["f"])
+        self.assertNotIn(first, self.store._cache)
+        self.assertLessEqual(self.store._cached_elements, 5)
+        # 超过上限的模板不缓存，但仍可读取
+        large = self.store.put([str(i) for i in range(6)])
+        self.assertNotIn(large, self.store._cache)
+        self.assertEqual(len(self.store.get(large)), 6)
+        self.assertEqual(self.store.get(first), ("a", "b", "c"))
+
+
+class TestTemplateGroupResult(unittest.TestCase):
+    def make_row(self, **kwargs):
+        return GroupResult(
+            group_name="模板",
+            group_mode=GroupMode.EQUAL,
+            group_count=2,
+            seed=3,
+            shuffle_version=2,
+            pool_template=pool_hash(["a", "b", "c"]),
+            **kwargs,
+        )
+
+    def test_base_pool(self):
+        """测试声明的元素池为模板元素加上source_elements"""
+        row = self.make_row(source_elements=["d"])
+        self.assertEqual(row.base_pool(("a", "b", "c")), ["a", "b", "c", "d"])
+        with self.assertRaises(ValueError):
+            row.base_pool()
+
+    def test_recompute(self):
+        """测试按种子保存的结果通过模板元素重新计算"""
+        row = self.make_row()
+        plain = GroupResult(
+            group_name="模板",
+            group_mode=GroupMode.EQUAL,
+            group_count=2,
+            seed=3,
+            shuffle_version=2,
+            source_elements=["a", "b", "c"],
+        )
+        self.assertEqual(
+            row.resolve_group_result(("a", "b", "c")), plain.resolve_group_result()
+        )
+        self.assertEqual(group_members(row, ("a", "b", "c")), ["a", "b", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
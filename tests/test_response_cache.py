@@ -0,0 +1,107 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import time
+import unittest
+from response_cache import CachedResult, LatestGroupsCache, ResultCache
+
+
+class TestLatestGroupsCache(unittest.TestCase):
+    def setUp(self):
+        """测试前置准备"""
+        self.cache = LatestGroupsCache(size=3, ttl=60, key=int)
+
+    def test_miss_before_set(self):
+        """测试未写入时缓存未命中"""
+        self.assertIsNone(self.cache.get(2))
+
+    def test_set_and_get(self):
+        """测试写入后按limit返回"""
+        self.assertTrue(self.cache.set([3, 2, 1, 0], self.cache.version))
+        self.assertEqual(self.cache.get(2), [3, 2])
+        self.assertEqual(self.cache.get(3), [3, 2, 1])
+        self.assertIsNone(self.cache.get(4))  # 超过缓存容量
+
+    def test_push(self):
+        """测试新分组原地插入最前面"""
+        self.cache.set([3, 2, 1], self.cache.version)
+        self.cache.push(4)
+        self.assertEqual(self.cache.get(3), [4, 3, 2])
+
+    def test_push_out_of_order(self):
+        """测试并发创建时较早的ID后插入仍保持倒序，重复ID不会插入"""
+        self.cache.set([5, 2], self.cache.version)
+        self.cache.push(3)
+        self.assertEqual(self.cache.get(3), [5, 3, 2])
+        self.cache.push(5)
+        self.cache.push(3)
+        self.assertEqual(self.cache.get(3), [5, 3, 2])
+        self.cache.push(1)  # 比缓存中所有分组都旧，超出容量
+        self.assertEqual(self.cache.get(3), [5, 3, 2])
+        self.cache.push(4)
+        self.assertEqual(self.cache.get(3), [5, 4, 3])
+
+    def test_stale_set_rejected(self):
+        """测试查询期间有新分组时放弃写入旧结果"""
+        version = self.cache.version
+        self.cache.push(4)
+        self.assertFalse(self.cache.set([3, 2, 1], version))
+        self.assertIsNone(self.cache.get(1))
+
+    def test_ttl(self):
+        """测试缓存过期"""
+        cache = LatestGroupsCache(size=3, ttl=0.05, key=int)
+        cache.set([1], cache.version)
+        self.assertEqual(cache.get(1), [1])
+        time.sleep(0.1)
+        self.assertIsNone(cache.get(1))
+
+    def test_invalidate(self):
+        """测试缓存失效"""
+        self.cache.set([1], self.cache.version)
+        self.cache.invalidate()
+        self.assertIsNone(self.cache.get(1))
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        """测试前置准备"""
+        self.cache = ResultCache(max_size=2)
+
+    def test_lru_eviction(self):
+        """测试超过容量时淘汰最久未访问的结果"""
+        for i in range(3):
+            if i == 2:
+                self.cache.get(0)  # 访问0，使1成为最久未访问
+            self.cache.put(i, CachedResult(True, None, b"{}"))
+        self.assertIsNotNone(self.cache.get(0))
+        self.assertIsNone(self.cache.get(1))
+        self.assertIsNotNone(self.cache.get(2))
+
+    def test_etag(self):
+        """测试相同响应体的ETag相同"""
+        a = CachedResult(True, None, b'{"a":1}')
+        b = CachedResult(True, None, b'{"a":1}')
+        c = CachedResult(True, None, b'{"a":2}')
+        self.assertEqual(a.etag, b.etag)
+        self.assertNotEqual(a.etag, c.etag)
+        self.assertTrue(a.etag.startswith('"'))
+
+    def test_password_check(self):
+        """测试私有结果的密码校验"""
+        self.assertTrue(CachedResult(True, None, b"{}").check_password(None))
+        private = CachedResult(False, "密码", b"{}")
+        self.assertTrue(private.check_password("密码"))
+        self.assertFalse(private.check_password("错误"))
+        self.assertFalse(private.check_password(None))
+
+    def test_invalidate(self):
+        """测试缓存失效"""
+        self.cache.put(1, CachedResult(True, None, b"{}"))
+        self.cache.invalidate(1)
+        self.assertIsNone(self.cache.get(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tempfile
+import unittest
+from sqlmodel import SQLModel, Session, create_engine, delete
+from models import GroupMember, GroupMode, GroupResult
+from search import (
+    build_member_index,
+    group_members,
+    init_search_index,
+    search_groups_by_member,
+    search_groups_by_name,
+)
+
+
+class TestSearchGroups(unittest.TestCase):
+    def setUp(self):
+        """测试前置准备：已有数据后再建立索引，验证对存量数据的索引"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(self.tmpdir.name, 'test.db')}"
+        self.engine = create_engine(url)
+        SQLModel.metadata.create_all(self.engine)
+        self.add_groups(["周末篮球分组", "篮球赛第一轮", "英雄联盟五黑"])
+        self.assertTrue(init_search_index(self.engine))
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def add_groups(self, names, is_public=True):
+        with Session(self.engine) as session:
+            for name in names:
+                session.add(
+                    GroupResult(
+                        group_name=name,
+                        group_mode=GroupMode.EQUAL,
+                        is_public=is_public,
+                        private_password=None if is_public else "123456",
+                        source_elements=["a", "b"],
+                        group_result=[["a"], ["b"]],
+                    )
+                )
+            session.commit()
+
+    def search(self, query, **kwargs):
+        with Session(self.engine) as session:
+            rows, has_more = search_groups_by_name(session, query, **kwargs)
+        return [row.group_name for row in rows], has_more
+
+    def test_fts_search(self):
+        """测试全文索引搜索，新插入的数据同步进索引"""
+        self.add_groups(["篮球友谊赛"])
+        names, has_more = self.search("篮球赛")
+        self.assertEqual(set(names), {"篮球赛第一轮"})
+        self.assertFalse(has_more)
+        names, _ = self.search("篮球友谊")
+        self.assertEqual(names, ["篮球友谊赛"])
+
+    def test_short_query(self):
+        """测试少于3个字符的查询"""
+        names, _ = self.search("篮球")
+        self.assertEqual(names, ["篮球赛第一轮", "周末篮球分组"])
+
+    def test_special_characters(self):
+        """测试查询中的FTS语法字符不会导致错误"""
+        self.assertEqual(self.search('篮球" OR "英雄')[0], [])
+
+    def test_pagination(self):
+        """测试分页"""
+        self.add_groups([f"篮球分组{i}" for i in range(5)])
+        names, has_more = self.search("篮球分组", limit=4)
+        self.assertEqual(len(names), 4)
+        self.assertTrue(has_more)
+        rest, has_more = self.search("篮球分组", limit=4, offset=4)
+        self.assertEqual(len(rest), 2)
+        self.assertFalse(has_more)
+        self.assertEqual(
+            set(names) | set(rest),
+            {"周末篮球分组"} | {f"篮球分组{i}" for i in range(5)},
+        )
+
+    def test_public_only(self):
+        """测试只搜索公开分组"""
+        self.add_groups(["私有篮球分组"], is_public=False)
+        names, _ = self.search("篮球分组")
+        self.assertIn("私有篮球分组", names)
+        names, _ = self.search("篮球分组", public_only=True)
+        self.assertNotIn("私有篮球分组", names)
+
+
+class TestMemberIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(self.tmpdir.name, 'test.db')}"
+        self.engine = create_engine(url)
+        SQLModel.metadata.create_all(self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmpdir.cleanup()
+
+    def add_group(self, name, group_result, is_public=True, **kwargs):
+        with Session(self.engine) as session:
+            row = GroupResult(
+                group_name=name,
+                group_mode=GroupMode.EQUAL,
+                is_public=is_public,
+                private_password=None if is_public else "123456",
+                group_result=group_result,
+                **kwargs,
+            )
+            session.add(row)
+            session.commit()
+            return row.id
+
+    def search(self, value, **kwargs):
+        with Session(self.engine) as session:
+            rows, has_more = search_groups_by_member(session, value, **kwargs)
+        return [row.id for row in rows], has_more
+
+    def test_indexed_on_insert(self):
+        """测试写入分组结果时同步写入成员索引，私有分组不写入"""
+        first = self.add_group("第一轮", [["阿狸", "盖伦"], ["劫"]])
+        second = self.add_group("第二轮", [["阿狸"], ["拉克丝"]])
+        self.add_group("私有", [["阿狸"], ["劫"]], is_public=False)
+        self.assertEqual(self.search("阿狸"), ([second, first], False))
+        self.assertEqual(self.search(" 劫"), ([first], False))
+        self.assertEqual(self.search("提莫"), ([], False))
+
+    def test_pagination(self):
+        """测试按ID倒序分页"""
+        ids = [self.add_group(f"分组{i}", [["阿狸"], [str(i)]]) for i in range(5)]
+        page, has_more = self.search("阿狸", limit=3)
+        self.assertEqual(page, ids[::-1][:3])
+        self.assertTrue(has_more)
+        rest, has_more = self.search("阿狸", limit=3, before_id=page[-1])
+        self.assertEqual(rest, ids[::-1][3:])
+        self.assertFalse(has_more)
+
+    def test_seed_storage(self):
+        """测试按种子保存的分组结果的成员"""
+        row = GroupResult(
+            group_name="种子",
+            group_mode=GroupMode.SIZE,
+            group_size=2,
+            group_count=2,
+            source_elements=[str(i) for i in range(10)],
+            seed=1,
+            shuffle_version=2,
+        )
+        self.assertEqual(
+            group_members(row), sum([list(g) for g in row.iter_group_result()], [])
+        )
+        self.assertEqual(len(group_members(row)), 4)
+        row.group_mode = GroupMode.EQUAL
+        self.assertEqual(group_members(row), [str(i) for i in range(10)])
+
+    def test_build_member_index(self):
+        """测试为已有数据建立成员索引"""
+        group_id = self.add_group("已有", [["阿狸"], ["劫"]])
+        with Session(self.engine) as session:
+            session.exec(delete(GroupMember))
+            session.commit()
+        self.assertEqual(self.search("阿狸"), ([], False))
+        self.assertEqual(build_member_index(self.engine), 1)
+        self.assertEqual(self.search("阿狸"), ([group_id], False))
+        # 重复执行不会重复写入
+        self.assertEqual(build_member_index(self.engine), 1)
+        self.assertEqual(self.search("阿狸"), ([group_id], False))
+
+
+if __name__ == "__main__":
+    unittest.main()